@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Start-up time budget check.
+
+Measures, in fresh interpreters, how long it takes to import the CLI, to
+bring up the first GUI window and to re-import the main.py launcher (as
+every spawned extraction worker does), and exits non-zero when the median
+exceeds the budget. Run from the repository root:
+
+    python benchmarks/startup.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Snippets run in a fresh interpreter; each exits as soon as the stage is reached
+PROBES = {
+    'cli': "import cli\n",
+    # Spawned extraction workers re-import the launched script
+    'launcher': "import runpy\nrunpy.run_path('main.py', run_name='__mp_main__')\n",
+    'gui': (
+        "from PyQt6.QtWidgets import QApplication\n"
+        "app = QApplication([])\n"
+        "import main_window\n"
+        "window = main_window.ComfyUIPromptExtractorUI()\n"
+        "window.show()\n"
+        "app.processEvents()\n"
+    ),
+}
+
+# Milliseconds, median of the runs
+DEFAULT_BUDGETS = {
+    'cli': 300,
+    'launcher': 100,
+    'gui': 1000,
+}
+
+# Modules that must not be loaded by the given probe
+FORBIDDEN_MODULES = {
+    'cli': ['PyQt6', 'translators', 'PIL', 'pyarrow'],
+    'launcher': ['PyQt6', 'main_window', 'translators', 'PIL', 'pyarrow'],
+    'gui': ['translators', 'PIL', 'pyperclip', 'pyarrow'],
+}
+
+
+def time_probe(name: str) -> float:
+    check = "".join(
+        f"assert {module!r} not in sys.modules, '{module} imported at start-up'\n"
+        for module in FORBIDDEN_MODULES[name]
+    )
+    code = PROBES[name] + "import sys\n" + check
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check start-up time against a budget.")
+    parser.add_argument('--runs', type=int, default=5, help="runs per probe (default: 5)")
+    parser.add_argument('--probe', choices=sorted(PROBES), action='append',
+                        help="probe to run (default: all)")
+    for name, budget in DEFAULT_BUDGETS.items():
+        parser.add_argument(f'--{name}-budget', type=float, default=budget,
+                            help=f"{name} budget in ms (default: {budget})")
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.probe or sorted(PROBES):
+        try:
+            timings = [time_probe(name) for _ in range(args.runs)]
+        except subprocess.CalledProcessError:
+            print(f"{name}: FAILED (probe raised, see above)")
+            failed = True
+            continue
+
+        median = statistics.median(timings)
+        budget = getattr(args, f'{name}_budget')
+        status = "ok" if median <= budget else "OVER BUDGET"
+        failed |= median > budget
+        print(f"{name}: median {median:.0f} ms, min {min(timings):.0f} ms, budget {budget:.0f} ms - {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
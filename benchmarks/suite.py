@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Hot path benchmark suite.
+
+Generates a reproducible synthetic corpus (ComfyUI workflows of ordinary
+and very large size, A1111 parameters, zTXt/iTXt variants, files without
+metadata and corrupt files) and times, each stage in a fresh interpreter:
+
+    extract     PromptExtractor.extract() per file, in Auto mode
+    scan        the folder scanner (latency = gap between files found)
+    render      streaming the results into the GUI up to on_extraction_finished()
+                (offscreen; latency = time spent per result batch)
+    translate   translate_prompts() with the mock backend (latency = time
+                until each prompt's translation arrives)
+
+For every stage it reports throughput, p50/p99 latency and peak RSS, and
+compares them with a stored baseline. Run from the repository root:
+
+    python benchmarks/suite.py --save-baseline     # on the reference revision
+    python benchmarks/suite.py                     # later; exits 1 on a regression
+
+The baseline is machine specific: record it on the machine that runs the
+comparison, with the same corpus options.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import zlib
+import random
+import shutil
+import struct
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic import comfyui_metadata  # noqa: E402
+
+STAGES = ('extract', 'scan', 'render', 'translate')
+# Unit of the items each stage processes
+STAGE_UNITS = {'extract': 'files', 'scan': 'files', 'render': 'files', 'translate': 'prompts'}
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Smaller increases are noise, whatever the tolerance
+NOISE_FLOOR = {'p99_ms': 0.1, 'peak_rss_mb': 5.0}
+# Bump when the corpus generator changes, so old baselines are not compared
+CORPUS_VERSION = 1
+
+# Share of each kind of file in the corpus
+CORPUS_MIX = {
+    'comfyui': 40,
+    'comfyui-huge': 3,
+    'comfyui-ztxt': 10,
+    'parameters': 22,
+    'parameters-itxt': 10,
+    'a1111': 5,
+    'no-metadata': 4,
+    'corrupt': 6,
+}
+# Nodes in the ordinary and the very large ComfyUI graphs
+SMALL_GRAPH_NODES = 12
+HUGE_GRAPH_NODES = 1500
+# Files per generated folder, and folders per parent folder
+FILES_PER_FOLDER = 100
+FOLDERS_PER_PARENT = 10
+IMAGE_SIZE = 64
+
+WORDS = (
+    "masterpiece best quality detailed portrait landscape city night rain neon cyberpunk forest river "
+    "mountain castle dragon knight girl boy cat dog sunset sunrise cinematic lighting volumetric fog "
+    "watercolor oil painting sketch anime realistic photo bokeh depth field wide angle close up red "
+    "blue green golden silver hair eyes dress armor sword flowers snow desert ocean sky clouds stars"
+).split()
+CJK_WORDS = ["杰作", "最佳质量", "风景", "城市", "夜晚", "下雨", "森林", "少女", "猫", "樱花"]
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Options a corpus folder was generated with
+CORPUS_INFO = "corpus.json"
+
+
+# Corpus
+
+def png_chunk(cid: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + cid + data + struct.pack('>I', zlib.crc32(data, zlib.crc32(cid)))
+
+
+def text_chunk(kind: str, key: str, value: str) -> bytes:
+    if kind == 'tEXt':
+        return png_chunk(b'tEXt', key.encode('latin-1') + b'\0' + value.encode('latin-1', 'replace'))
+    if kind == 'zTXt':
+        return png_chunk(b'zTXt', key.encode('latin-1') + b'\0\0' + zlib.compress(value.encode('latin-1', 'replace')))
+    # Compressed iTXt with empty language and translated keyword
+    return png_chunk(b'iTXt', key.encode('latin-1') + b'\0\1\0\0\0' + zlib.compress(value.encode('utf-8')))
+
+
+def png_bytes(chunks: List[bytes], seed: int) -> bytes:
+    """A small valid RGB image carrying the given chunks before its pixel data"""
+    row = bytes([0]) + bytes((seed + x) & 0xff for x in range(IMAGE_SIZE * 3))
+    ihdr = struct.pack('>IIBBBBB', IMAGE_SIZE, IMAGE_SIZE, 8, 2, 0, 0, 0)
+    return (PNG_SIGNATURE + png_chunk(b'IHDR', ihdr) + b''.join(chunks)
+            + png_chunk(b'IDAT', zlib.compress(row * IMAGE_SIZE)) + png_chunk(b'IEND', b''))
+
+
+def corpus_file(kind: str, number: int, positive: str, rng: random.Random) -> bytes:
+    negative = "negative, blurry, lowres, bad anatomy, watermark"
+    settings = f"Steps: 30, Sampler: Euler a, CFG scale: 7, Seed: {rng.randrange(1 << 32)}, Size: 512x768"
+    if kind.startswith('comfyui'):
+        nodes = HUGE_GRAPH_NODES if kind == 'comfyui-huge' else SMALL_GRAPH_NODES
+        chunk_type = 'zTXt' if kind == 'comfyui-ztxt' else 'tEXt'
+        encoders = {1: ('Positive Prompt', positive), 2: ('Negative Prompt', negative)}
+        metadata = comfyui_metadata(nodes, encoders, rng)
+        return png_bytes([text_chunk(chunk_type, key, value) for key, value in metadata.items()], number)
+    if kind == 'parameters':
+        value = f"Positive prompt: {positive}\nNegative prompt: {negative}\n{settings}"
+        return png_bytes([text_chunk('tEXt', 'parameters', value)], number)
+    if kind == 'parameters-itxt':
+        positive = positive + ", " + ", ".join(rng.sample(CJK_WORDS, 3))
+        value = f"Positive prompt: {positive}\nNegative prompt: {negative}\n{settings}"
+        return png_bytes([text_chunk('iTXt', 'parameters', value)], number)
+    if kind == 'a1111':
+        # The plain A1111 layout, which only the PNG properties fallback could match
+        return png_bytes([text_chunk('tEXt', 'parameters', f"{positive}\nNegative prompt: {negative}\n{settings}")],
+                         number)
+    if kind == 'no-metadata':
+        return png_bytes([], number)
+
+    # Corrupt files, in turn: truncated, bad CRC, not a PNG, empty
+    valid = png_bytes([text_chunk('tEXt', 'parameters', f"Positive prompt: {positive}")], number)
+    # A byte of the text chunk's data, after the signature, IHDR and the chunk header
+    offset = len(PNG_SIGNATURE) + 25 + 8 + 4
+    variant = number % 4
+    if variant == 0:
+        return valid[:offset]
+    if variant == 1:
+        return valid[:offset] + bytes([valid[offset] ^ 0xff]) + valid[offset + 1:]
+    if variant == 2:
+        return bytes(rng.randrange(256) for _ in range(512))
+    return b''
+
+
+def corpus_options(file_count: int, seed: int) -> Dict[str, Any]:
+    return {'version': CORPUS_VERSION, 'files': file_count, 'seed': seed, 'mix': CORPUS_MIX}
+
+
+def generate_corpus(directory: str, file_count: int, seed: int):
+    """Write file_count PNGs (plus a few sidecar files) in nested folders"""
+    os.makedirs(directory)
+    with open(os.path.join(directory, CORPUS_INFO), 'w', encoding='utf-8') as f:
+        json.dump(corpus_options(file_count, seed), f)
+    rng = random.Random(seed)
+    # Seed sweeps repeat prompts, so a quarter as many distinct prompts as files
+    prompts = [", ".join(rng.sample(WORDS, rng.randint(6, 30))) for _ in range(max(1, file_count // 4))]
+    kinds = rng.choices(list(CORPUS_MIX), weights=list(CORPUS_MIX.values()), k=file_count)
+    for number, kind in enumerate(kinds):
+        folder_number = number // FILES_PER_FOLDER
+        folder = os.path.join(directory, f"batch_{folder_number // FOLDERS_PER_PARENT:03d}",
+                              f"run_{folder_number:04d}")
+        if number % FILES_PER_FOLDER == 0:
+            os.makedirs(folder, exist_ok=True)
+            # Files the scanner has to skip
+            with open(os.path.join(folder, "settings.json"), 'w') as f:
+                f.write("{}")
+        with open(os.path.join(folder, f"{number:06d}_{kind}.png"), 'wb') as f:
+            f.write(corpus_file(kind, number, rng.choice(prompts), rng))
+
+
+def corpus_files(directory: str) -> List[str]:
+    from scanner import iter_files
+
+    return sorted(iter_files([directory]))
+
+
+# Stages, each run in a fresh interpreter by run_stage()
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measurement(items: int, seconds: List[float], samples: List[float], **extra) -> Dict[str, Any]:
+    """Summary of a stage: items per run, median run time and latency percentiles in ms"""
+    median = statistics.median(seconds)
+    p50 = percentile(samples, 0.50)
+    p99 = percentile(samples, 0.99)
+    return {
+        'items': items,
+        'seconds': median,
+        'rate': items / median if median > 0 else None,
+        'p50_ms': p50 * 1000 if p50 is not None else None,
+        'p99_ms': p99 * 1000 if p99 is not None else None,
+        **extra,
+    }
+
+
+def bench_extract(files: List[str], repeat: int) -> Dict[str, Any]:
+    from extractor import PromptExtractor
+
+    prompt_extractor = PromptExtractor()
+    seconds = []
+    samples = []
+    for _ in range(repeat):
+        samples = []
+        start = time.perf_counter()
+        for file_path in files:
+            file_start = time.perf_counter()
+            prompt_extractor.extract_isolated(file_path, "Auto")
+            samples.append(time.perf_counter() - file_start)
+        seconds.append(time.perf_counter() - start)
+    return measurement(len(files), seconds, samples)
+
+
+def bench_scan(directory: str, repeat: int) -> Dict[str, Any]:
+    from scanner import iter_files
+
+    seconds = []
+    samples = []
+    found = 0
+    for _ in range(repeat):
+        samples = []
+        start = last = time.perf_counter()
+        found = 0
+        for _file_path in iter_files([directory]):
+            now = time.perf_counter()
+            samples.append(now - last)
+            last = now
+            found += 1
+        seconds.append(time.perf_counter() - start)
+    return measurement(found, seconds, samples)
+
+
+def bench_render(files: List[str], repeat: int) -> Dict[str, Any]:
+    """Replay pre-extracted results through the GUI's streaming and finishing code"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QEventLoop
+
+    app = QApplication.instance() or QApplication([])
+    import main_window
+    from extractor import PromptExtractor
+
+    prompt_extractor = PromptExtractor()
+    results = {file_path: prompt_extractor.extract_isolated(file_path, "Auto") for file_path in files}
+
+    class ReplayThread(main_window.ExtractionThread):
+        """Emits the stored results in the batches a real extraction would"""
+
+        def run(self):
+            batch = []
+            for index, file_path in enumerate(self.file_paths):
+                batch.append((self.batch_index(index), results[file_path]))
+                if len(batch) >= self.BATCH_SIZE:
+                    self.batch_ready.emit(self.generation, batch, index + 1, len(self.file_paths))
+                    batch = []
+            if batch:
+                self.batch_ready.emit(self.generation, batch, len(self.file_paths), len(self.file_paths))
+            self.finished.emit(self.generation, len(self.file_paths), self.file_paths)
+
+    main_window.ExtractionThread = ReplayThread
+    window = main_window.ComfyUIPromptExtractorUI()
+    window.mode_combo.setCurrentText("Auto")
+
+    loop = QEventLoop()
+    samples = []
+    finish_seconds = []
+    on_batch = window.on_extraction_batch
+    on_finished = window.on_extraction_finished
+
+    def timed_batch(*args):
+        start = time.perf_counter()
+        on_batch(*args)
+        samples.append(time.perf_counter() - start)
+
+    def timed_finished(*args):
+        start = time.perf_counter()
+        on_finished(*args)
+        finish_seconds.append(time.perf_counter() - start)
+        loop.quit()
+
+    # process_files() connects the instance attributes
+    window.on_extraction_batch = timed_batch
+    window.on_extraction_finished = timed_finished
+
+    seconds = []
+    for _ in range(repeat):
+        samples.clear()
+        start = time.perf_counter()
+        window.process_files(list(files))
+        loop.exec()
+        seconds.append(time.perf_counter() - start)
+        window.extraction_thread.wait()
+    prompts = len(window.all_prompt_texts)
+    window.close()
+    return measurement(len(files), seconds, samples,
+                       finish_ms=statistics.median(finish_seconds) * 1000, prompts=prompts)
+
+
+def bench_translate(files: List[str], repeat: int, latency: float) -> Dict[str, Any]:
+    import threading
+    from extractor import PromptExtractor
+    from translation import MockBackend, translate_prompts
+
+    prompt_extractor = PromptExtractor()
+    prompts = [prompt['text'] for file_path in files
+               for prompt in prompt_extractor.extract_isolated(file_path, "Auto")['positive_prompts']]
+
+    seconds = []
+    samples = []
+    for _ in range(repeat):
+        arrivals: Dict[int, float] = {}
+        lock = threading.Lock()
+        start = time.perf_counter()
+
+        def on_progress(updates):
+            now = time.perf_counter() - start
+            with lock:
+                for index in updates:
+                    arrivals.setdefault(index, now)
+
+        # A fresh backend per run, so the mock's attempt counters start over
+        backend = MockBackend(latency=latency)
+        translate_prompts(prompts, backend, "en", "zh", on_progress=on_progress)
+        seconds.append(time.perf_counter() - start)
+        samples = list(arrivals.values())
+    return measurement(len(prompts), seconds, samples, distinct=len(set(prompts)))
+
+
+def run_stage_here(stage: str, args) -> Dict[str, Any]:
+    """Body of a stage subprocess"""
+    if stage == 'scan':
+        result = bench_scan(args.corpus, args.repeat)
+    else:
+        files = corpus_files(args.corpus)
+        if stage == 'extract':
+            result = bench_extract(files, args.repeat)
+        elif stage == 'render':
+            result = bench_render(files, args.repeat)
+        else:
+            result = bench_translate(files, args.repeat, args.mock_latency)
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run_stage(stage: str, corpus: str, args, cache_dir: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    # Keep the GUI's caches and search index away from the user's
+    env['XDG_CACHE_HOME'] = cache_dir
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    command = [sys.executable, os.path.abspath(__file__), '--child', '--stage', stage, '--corpus', corpus,
+               '--repeat', str(args.repeat), '--mock-latency', str(args.mock_latency)]
+    completed = subprocess.run(command, cwd=REPO_ROOT, env=env, check=True, stdout=subprocess.PIPE, text=True)
+    # The result is the last line; the application may print warnings before it
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# Reporting
+
+def format_value(value: Optional[float], digits: int = 0) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def compare(stage: str, current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return the regressions of a stage against its baseline"""
+    regressions = []
+    if current.get('rate') and baseline.get('rate') and current['rate'] < baseline['rate'] * (1 - tolerance):
+        regressions.append(f"{STAGE_UNITS[stage]}/s {baseline['rate']:.0f} -> {current['rate']:.0f}")
+    for key, label in (('p99_ms', 'p99'), ('peak_rss_mb', 'peak RSS')):
+        if (current.get(key) and baseline.get(key) and current[key] > baseline[key] * (1 + tolerance)
+                and current[key] - baseline[key] > NOISE_FLOOR[key]):
+            regressions.append(f"{label} {baseline[key]:.2f} -> {current[key]:.2f}")
+    return regressions
+
+
+def change(current: Optional[float], baseline: Optional[float]) -> str:
+    if not current or not baseline:
+        return ""
+    return f"{(current / baseline - 1) * 100:+.0f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extraction, scanning, rendering and translation "
+                                                 "hot paths on a synthetic corpus.")
+    parser.add_argument('--files', type=int, default=2000, help="files in the corpus (default: 2000)")
+    parser.add_argument('--seed', type=int, default=1, help="corpus random seed (default: 1)")
+    parser.add_argument('--corpus', help="corpus folder; generated if missing and kept (default: a temporary folder)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage (default: 3)")
+    parser.add_argument('--stage', choices=STAGES, action='append', help="stage to run (default: all)")
+    parser.add_argument('--mock-latency', type=float, default=0.0,
+                        help="seconds per mock translation request (default: 0, measures overhead only)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown or growth against the baseline (default: 0.25)")
+    parser.add_argument('--json', metavar='FILE', help="also write the results to a JSON file")
+    # Set in the stage subprocesses
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_stage_here(args.stage[0], args)))
+        return
+
+    temp_dir = tempfile.mkdtemp(prefix="prompt-extractor-bench-")
+    try:
+        corpus = args.corpus or os.path.join(temp_dir, "corpus")
+        if os.path.isdir(corpus):
+            try:
+                with open(os.path.join(corpus, CORPUS_INFO), encoding='utf-8') as f:
+                    options = json.load(f)
+            except (OSError, ValueError):
+                parser.error(f"{corpus} is not a corpus generated by this script")
+            if options != corpus_options(args.files, args.seed):
+                print(f"Note: using {corpus} as generated ({options['files']} files, seed {options['seed']})")
+        else:
+            start = time.perf_counter()
+            generate_corpus(corpus, args.files, args.seed)
+            options = corpus_options(args.files, args.seed)
+            print(f"Generated {args.files} files in {corpus} ({time.perf_counter() - start:.1f} s)")
+        cache_dir = os.path.join(temp_dir, "cache")
+
+        results = {}
+        for stage in args.stage or STAGES:
+            try:
+                results[stage] = run_stage(stage, corpus, args, cache_dir)
+            except subprocess.CalledProcessError:
+                print(f"{stage}: FAILED (see above)")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    report = {
+        'corpus': options,
+        'repeat': args.repeat,
+        'mock_latency': args.mock_latency,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'stages': results,
+    }
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('corpus') != report['corpus'] or baseline.get('mock_latency') != args.mock_latency:
+            print(f"Note: {args.baseline} was recorded with other corpus options; not comparing")
+            baseline = None
+
+    print(f"\n{'stage':10} {'items':>7} {'rate':>14} {'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8}  vs baseline")
+    regressions = []
+    for stage, result in results.items():
+        base = (baseline or {}).get('stages', {}).get(stage)
+        versus = ""
+        if base:
+            versus = f"rate {change(result['rate'], base['rate'])}, p99 {change(result['p99_ms'], base['p99_ms'])}"
+            regressions += [f"{stage}: {text}" for text in compare(stage, result, base, args.tolerance)]
+        rate = f"{format_value(result['rate'])} {STAGE_UNITS[stage]}/s"
+        print(f"{stage:10} {result['items']:7} {rate:>14} {format_value(result['p50_ms'], 3):>8} "
+              f"{format_value(result['p99_ms'], 3):>8} {format_value(result['peak_rss_mb']):>8}  {versus}")
+    if 'render' in results:
+        print(f"\nrender: {results['render']['finish_ms']:.1f} ms in on_extraction_finished, "
+              f"{results['render']['prompts']} prompts")
+    if 'translate' in results:
+        print(f"translate: {results['translate']['distinct']} distinct prompts")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif baseline is None:
+        print("\nNo baseline to compare with; record one with --save-baseline")
+    elif regressions:
+        print(f"\nREGRESSIONS (tolerance {args.tolerance:.0%}):")
+        for text in regressions:
+            print(f"  {text}")
+    else:
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    failed = len(results) < len(args.stage or STAGES) or bool(regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
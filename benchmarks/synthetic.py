@@ -0,0 +1,54 @@
+"""
+Synthetic ComfyUI metadata for the benchmarks.
+
+comfyui_metadata() builds the workflow and prompt chunks of a graph with
+the layout, links and widget values ComfyUI writes, so the parsers do the
+same work as on real renders. It is shared by suite.py (corpus files) and
+workflow_parse.py (large graphs).
+"""
+
+import json
+import random
+from typing import Dict, Tuple
+
+FILLER_NODE_TYPES = ('KSampler', 'VAEDecode', 'LoraLoader', 'CheckpointLoaderSimple')
+
+
+def comfyui_metadata(node_count: int, encoders: Dict[int, Tuple[str, str]], rng: random.Random,
+                     group_count: int = 0) -> Dict[str, str]:
+    """workflow and prompt chunks of a graph with nodes 1..node_count.
+
+    encoders maps node ids to the (title, text) of CLIPTextEncode nodes;
+    every other node is a filler node with sampler-like widgets. The graph
+    only depends on the arguments and the state of rng.
+    """
+    nodes = []
+    prompt = {}
+    for node_id in range(1, node_count + 1):
+        if node_id in encoders:
+            node_type = 'CLIPTextEncode'
+            title, text = encoders[node_id]
+            widgets = [text]
+            prompt[str(node_id)] = {'class_type': node_type, 'inputs': {'text': text, 'clip': ['4', 1]}}
+        else:
+            node_type = rng.choice(FILLER_NODE_TYPES)
+            title = f"{node_type} {node_id}"
+            widgets = [rng.randrange(1 << 48), 'randomize', 30, 7.5, 'euler', 'normal', 1.0]
+            prompt[str(node_id)] = {'class_type': node_type, 'inputs': {'seed': widgets[0], 'steps': 30}}
+        nodes.append({
+            'id': node_id, 'type': node_type, 'title': title,
+            'pos': [rng.uniform(0, 4000), rng.uniform(0, 3000)], 'size': [400, 262], 'flags': {},
+            'order': node_id, 'mode': 0,
+            'inputs': [{'name': 'model', 'type': 'MODEL', 'link': node_id * 2}],
+            'outputs': [{'name': 'LATENT', 'type': 'LATENT', 'links': [node_id * 2 + 1], 'slot_index': 0}],
+            'properties': {'Node name for S&R': node_type},
+            'widgets_values': widgets,
+        })
+    workflow = {
+        'last_node_id': node_count, 'last_link_id': node_count * 2, 'nodes': nodes,
+        'links': [[link, link // 2, 0, link // 2 + 1, 0, 'LATENT'] for link in range(node_count * 2)],
+        'groups': [{'title': f"Group {g}", 'bounding': [g * 100, 0, 800, 600], 'color': '#3f789e'}
+                   for g in range(group_count)],
+        'config': {}, 'extra': {}, 'version': 0.4,
+    }
+    return {'workflow': json.dumps(workflow), 'prompt': json.dumps(prompt)}
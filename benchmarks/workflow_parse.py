@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+ComfyUI metadata parsing benchmark.
+
+Compares PromptExtractor.comfyui_prompts() against the previous path,
+which always parsed the workflow (and, without results, the prompt) chunk
+with the json module. Uses the metadata of the given PNG files, or a
+synthetic large graph when none are given. Run from the repository root:
+
+    python benchmarks/workflow_parse.py renders/*.png
+    python benchmarks/workflow_parse.py --nodes 400
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extractor  # noqa: E402
+from extractor import PromptExtractor  # noqa: E402
+from synthetic import comfyui_metadata  # noqa: E402
+
+
+def synthetic_metadata(node_count: int):
+    """Text chunks of a large workflow with layout, links, groups and UI state"""
+    # Every 25th node is a text encoder, alternately positive and negative
+    encoders = {node_id: ('Positive Prompt' if node_id % 50 == 0 else 'Negative Prompt',
+                          f"masterpiece, best quality, scene {node_id}, " + "detailed background, " * 20)
+                for node_id in range(25, node_count + 1, 25)}
+    return comfyui_metadata(node_count, encoders, random.Random(node_count), group_count=node_count // 20)
+
+
+def reference_prompts(prompt_extractor: PromptExtractor, metadata):
+    """The previous extraction path: full json.loads of each chunk"""
+    prompts = []
+    processed_nodes = set()
+    if 'workflow' in metadata:
+        prompts.extend(prompt_extractor.extract_positive_from_workflow(
+            json.loads(metadata['workflow']), processed_nodes))
+    if not prompts and 'prompt' in metadata:
+        prompts.extend(prompt_extractor.extract_positive_from_prompt_data(
+            json.loads(metadata['prompt']), processed_nodes))
+    return prompts
+
+
+def time_path(function, samples, repeat: int) -> float:
+    """Median seconds to run function over all samples"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for metadata in samples:
+            function(metadata)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ComfyUI metadata parsing.")
+    parser.add_argument('files', nargs='*', help="PNG files to take metadata from")
+    parser.add_argument('--nodes', type=int, default=300, help="nodes in the synthetic graph (default: 300)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per path (default: 5)")
+    args = parser.parse_args()
+
+    prompt_extractor = PromptExtractor()
+    if args.files:
+        samples = []
+        for file_path in args.files:
+            try:
+                metadata = prompt_extractor.read_metadata(file_path)[2]
+            except Exception as e:
+                print(f"Skipping {file_path}: {e}")
+                continue
+            if 'workflow' in metadata or 'prompt' in metadata:
+                samples.append(metadata)
+        if not samples:
+            print("No ComfyUI metadata found in the given files")
+            sys.exit(1)
+    else:
+        samples = [synthetic_metadata(args.nodes)] * 20
+
+    chunk_bytes = sum(len(metadata.get('workflow', '')) + len(metadata.get('prompt', '')) for metadata in samples)
+    print(f"{len(samples)} samples, {chunk_bytes / len(samples) / 1024:.0f} KB of JSON each on average")
+
+    for metadata in samples:
+        if prompt_extractor.comfyui_prompts(metadata) != reference_prompts(prompt_extractor, metadata):
+            print("MISMATCH: fast path results differ from the reference path")
+            sys.exit(1)
+
+    extractor.loads_json('{}')  # imports orjson if it is installed
+    if not extractor._orjson:
+        print("orjson is not installed; only the chunk pre-checks apply")
+    paths = [
+        ('json.loads (previous)', lambda metadata: reference_prompts(prompt_extractor, metadata)),
+        ('orjson' if extractor._orjson else 'current', prompt_extractor.comfyui_prompts),
+    ]
+
+    baseline = None
+    for name, function in paths:
+        seconds = time_path(function, samples, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:22} {seconds / len(samples) * 1e6:9.0f} us/file "
+              f"{chunk_bytes / seconds / 1e6:8.0f} MB/s  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
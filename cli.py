@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+ComfyUI Prompt Extractor - headless command line interface.
+
+Extracts positive prompts without a display: accepts files, folders and
+glob patterns and streams JSON Lines, CSV, Parquet or plain text (see
+export.py). This module must not import PyQt6.
+"""
+
+import os
+import sys
+import glob
+import argparse
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import profiling
+from export import WRITERS, HAS_PYARROW, result_record, format_for_path, open_output
+from extractor import ParallelExtractor
+from result_cache import ResultCache, extract_with_cache
+from scanner import iter_files, matches, DEFAULT_INCLUDE, DEFAULT_SCAN_WORKERS
+from search_index import SearchIndex, BackgroundIndexer, DEFAULT_SEARCH_LIMIT
+
+CLI_MODES = {
+    "comfyui": "ComfyUI",
+    "parameters": "Parameters",
+    "auto": "Auto",
+}
+
+
+def expand_inputs(inputs: List[str], include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = (),
+                  max_depth: Optional[int] = None, follow_symlinks: bool = False,
+                  workers: int = DEFAULT_SCAN_WORKERS) -> Iterator[str]:
+    """Lazily expand files, folders (recursively) and glob patterns into PNG paths"""
+    roots = []
+    for item in inputs:
+        if os.path.exists(item):
+            roots.append(item)
+        else:
+            for match in sorted(glob.glob(item, recursive=True)):
+                if os.path.isdir(match) or (os.path.isfile(match)
+                                            and matches(os.path.basename(match), match, include)):
+                    roots.append(match)
+
+    seen = set()
+    for file_path in iter_files(roots, include, exclude, max_depth, follow_symlinks, workers):
+        if file_path not in seen:
+            seen.add(file_path)
+            yield file_path
+
+
+# Results handed to the search indexer at a time
+INDEX_BATCH = 200
+
+
+def iter_results(file_paths: Iterable[str], mode: str, engine: ParallelExtractor,
+                 cache: Optional[ResultCache]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (path, result) in input order, streaming as soon as a prefix is ready.
+
+    file_paths may be lazy; extraction runs while it is still being expanded.
+    """
+    found: List[str] = []
+
+    def record():
+        for file_path in file_paths:
+            found.append(file_path)
+            yield file_path
+
+    pending: Dict[int, Dict[str, Any]] = {}
+    next_index = 0
+    for index, result in extract_with_cache(cache, engine, record(), mode):
+        pending[index] = result
+        while next_index in pending:
+            yield found[next_index], pending.pop(next_index)
+            next_index += 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Extract positive prompts from ComfyUI / A1111 PNG files without a GUI."
+    )
+    parser.add_argument('inputs', nargs='*', help="PNG files, folders (searched recursively) or glob patterns")
+    parser.add_argument('-m', '--mode', choices=sorted(CLI_MODES), default='auto',
+                        help="extraction mode (default: auto)")
+    parser.add_argument('-f', '--format', choices=sorted(WRITERS),
+                        help="output format (default: from the --output extension, otherwise jsonl); "
+                             "parquet needs pyarrow and --output")
+    parser.add_argument('-o', '--output', help="output file (default: stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=0,
+                        help="worker processes, 0 = one per CPU core (default: 0)")
+    parser.add_argument('--chunk-size', type=int, default=32,
+                        help="files per worker task (default: 32)")
+    parser.add_argument('--cache', action='store_true',
+                        help="use the persistent extraction cache")
+    parser.add_argument('--include', action='append', metavar='PATTERN',
+                        help="only scan files matching this glob pattern, ignoring case "
+                             "(repeatable, default: *.png)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                        help="skip files and folders matching this glob pattern (repeatable)")
+    parser.add_argument('--max-depth', type=int, help="maximum folder depth to scan (0 = given folders only)")
+    parser.add_argument('--follow-symlinks', action='store_true', help="descend into symlinked folders")
+    parser.add_argument('--scan-workers', type=int, default=DEFAULT_SCAN_WORKERS,
+                        help=f"threads listing folders in parallel (default: {DEFAULT_SCAN_WORKERS})")
+    parser.add_argument('--index', action='store_true',
+                        help="add the extracted prompts to the persistent search index")
+    parser.add_argument('--search', metavar='QUERY',
+                        help="print indexed prompts matching QUERY (path and prompt, tab-separated) instead of "
+                             "extracting, e.g. 'cyberpunk rain -blurry'")
+    parser.add_argument('--limit', type=int, default=DEFAULT_SEARCH_LIMIT,
+                        help=f"maximum number of search matches (default: {DEFAULT_SEARCH_LIMIT})")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="record per-stage timings and counters, write them to FILE as JSON "
+                             "and print them to stderr")
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help="write a cProfile dump of the main thread to FILE (view with python -m pstats); "
+                             "use -j 1 without --cache to include the extraction")
+    parser.add_argument('-q', '--quiet', action='store_true', help="do not print a summary to stderr")
+    return parser
+
+
+def search(query: str, limit: int) -> int:
+    index = SearchIndex()
+    try:
+        hits = index.search(query, limit)
+    finally:
+        index.close()
+    for hit in hits:
+        print(f"{hit.path}\t{' '.join(hit.text.split())}")
+    return 0 if hits else 1
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.search is not None:
+        return search(args.search, args.limit)
+    if not args.inputs:
+        parser.error("the following arguments are required: inputs")
+
+    # Checked before anything is opened, since parser.error() exits
+    export_format = args.format or (args.output and format_for_path(args.output)) or 'jsonl'
+    if export_format == 'parquet' and not (HAS_PYARROW and args.output):
+        parser.error("parquet output needs pyarrow (pip install pyarrow) and --output")
+
+    file_paths = expand_inputs(args.inputs, args.include or DEFAULT_INCLUDE, args.exclude,
+                               args.max_depth, args.follow_symlinks, args.scan_workers)
+
+    mode = CLI_MODES[args.mode]
+    engine = ParallelExtractor(workers=args.workers or None, chunk_size=args.chunk_size)
+    cache = ResultCache() if args.cache else None
+    indexer = BackgroundIndexer(SearchIndex()) if args.index else None
+
+    out = open_output(args.output, export_format) if args.output else sys.stdout
+    writer = WRITERS[export_format](out)
+
+    profile = profiling.start() if args.profile else None
+    profiler = None
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    files = 0
+    files_with_prompts = 0
+    total_prompts = 0
+    errors = 0
+    index_batch = []
+    try:
+        for file_path, result in iter_results(file_paths, mode, engine, cache):
+            files += 1
+            if indexer is not None:
+                index_batch.append((file_path, result))
+                if len(index_batch) >= INDEX_BATCH:
+                    indexer.submit(index_batch)
+                    index_batch = []
+            with profiling.timer('write output'):
+                record = result_record(file_path, result)
+                writer.write(record)
+            if record['prompts']:
+                files_with_prompts += 1
+                total_prompts += len(record['prompts'])
+            if 'error' in record:
+                errors += 1
+                if not args.quiet:
+                    print(f"{file_path}: {record['error']['type']}: {record['error']['message']}", file=sys.stderr)
+        writer.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if cache is not None:
+            cache.close()
+        if indexer is not None:
+            indexer.submit(index_batch)
+            indexer.close()
+            indexer.index.close()
+        # Written for interrupted runs too
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+        if profile is not None:
+            profiling.stop()
+            profile.write_json(args.profile)
+            if not args.quiet:
+                print(profile.report(), file=sys.stderr)
+
+    if not files:
+        print("No PNG files found", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(f"Files processed: {files}, with prompts: {files_with_prompts}, "
+              f"prompts: {total_prompts}, errors: {errors}", file=sys.stderr)
+    return 0
+
+
+def main():
+    """Command line entry point"""
+    try:
+        sys.exit(run())
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except BrokenPipeError:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Structured export of extraction results.
+
+Writers for JSON Lines, CSV, Parquet and a plain text listing, shared by
+the command line and the GUI. Every writer takes one record per file (see
+result_record()) and writes it out as it arrives; Parquet buffers at most
+one row group. Exports therefore never need the whole result set in
+memory. This module must not import PyQt6, and pyarrow is only imported
+when a Parquet file is written.
+"""
+
+import os
+import csv
+import json
+import importlib.util
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# Columns of the row-per-prompt formats (CSV and Parquet). A "translated"
+# column follows "text" when a translation is exported.
+CSV_FIELDS = [
+    'path', 'filename', 'width', 'height', 'method',
+    'node_id', 'node_type', 'title', 'source', 'text', 'error'
+]
+
+# Rows buffered per Parquet row group
+PARQUET_ROW_GROUP = 50000
+
+
+def result_record(file_path: str, result: Dict[str, Any],
+                  translations: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Flatten a PromptExtractor result into one JSON-friendly record.
+
+    translations, if given, holds the translated text of each prompt.
+    """
+    file_info = result.get('file_info', {})
+    size = file_info.get('size')
+    prompts = result.get('positive_prompts', [])
+    record = {
+        'path': file_path,
+        'filename': file_info.get('filename', os.path.basename(file_path)),
+        'size': list(size) if size else None,
+        'mode': file_info.get('mode'),
+        'method': result.get('extraction_method', 'unknown'),
+        'prompts': [
+            {
+                'text': prompt['text'],
+                'node_id': prompt.get('node_id'),
+                'node_type': prompt.get('node_type', prompt.get('class_type')),
+                'title': prompt.get('title'),
+                'source': prompt.get('source'),
+            }
+            for prompt in prompts
+        ],
+    }
+    if translations is not None:
+        for prompt, translated in zip(record['prompts'], translations):
+            prompt['translated'] = translated
+    if 'error' in result:
+        record['error'] = result['error']
+    return record
+
+
+def row_fields(translated: bool = False) -> List[str]:
+    if not translated:
+        return CSV_FIELDS
+    position = CSV_FIELDS.index('text') + 1
+    return CSV_FIELDS[:position] + ['translated'] + CSV_FIELDS[position:]
+
+
+def record_rows(record: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """One row per prompt; a file without prompts gives a single row without prompt fields"""
+    size = record['size'] or (None, None)
+    error = record.get('error')
+    base = {
+        'path': record['path'],
+        'filename': record['filename'],
+        'width': size[0],
+        'height': size[1],
+        'method': record['method'],
+        'error': f"{error['type']}: {error['message']}" if error else None,
+    }
+    for prompt in record['prompts'] or [{}]:
+        row = dict(base)
+        for key in ('node_id', 'node_type', 'title', 'source', 'text', 'translated'):
+            row[key] = prompt.get(key)
+        yield row
+
+
+class JSONLWriter:
+    binary = False
+
+    def __init__(self, out: TextIO, translated: bool = False):
+        self.out = out
+
+    def write(self, record: Dict[str, Any]):
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        pass
+
+
+class CSVWriter:
+    """One row per prompt; files without prompts get a single empty row"""
+
+    binary = False
+
+    def __init__(self, out: TextIO, translated: bool = False):
+        self.writer = csv.DictWriter(out, fieldnames=row_fields(translated), extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, record: Dict[str, Any]):
+        # None is written as an empty field
+        self.writer.writerows(record_rows(record))
+
+    def close(self):
+        pass
+
+
+class TextWriter:
+    """Human-readable prompt listing, one block per file with prompts"""
+
+    binary = False
+
+    def __init__(self, out: TextIO, translated: bool = False):
+        self.out = out
+        self.translated = translated
+        self.first = True
+
+    def write(self, record: Dict[str, Any]):
+        if not record['prompts']:
+            return
+        if not self.first:
+            self.out.write("\n" + "=" * 60 + "\n\n")
+        self.first = False
+        self.out.write(f"=== {record['filename']} [{record['method']}] ===\n")
+        for j, prompt in enumerate(record['prompts'], 1):
+            if len(record['prompts']) > 1:
+                self.out.write(f"\nPrompt {j} - {prompt.get('title') or 'Untitled'}:\n")
+                self.out.write("-" * 40 + "\n")
+            self.out.write(f"{prompt['translated'] if self.translated else prompt['text']}\n")
+
+    def close(self):
+        pass
+
+
+class ParquetWriter:
+    """Columnar rows like CSV, written one row group at a time; requires pyarrow"""
+
+    binary = True
+
+    def __init__(self, out, translated: bool = False):
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pyarrow = pyarrow
+        fields = row_fields(translated)
+        self.schema = pyarrow.schema([
+            (name, pyarrow.int32() if name in ('width', 'height') else pyarrow.string())
+            for name in fields
+        ])
+        self.columns: Dict[str, list] = {name: [] for name in fields}
+        self.text_columns = [name for name in fields if name not in ('width', 'height')]
+        self.rows = 0
+        self.writer = pyarrow.parquet.ParquetWriter(out, self.schema, compression='zstd')
+
+    def write(self, record: Dict[str, Any]):
+        for row in record_rows(record):
+            # Node ids are numbers in some workflows, and odd metadata can hold other types
+            for name in self.text_columns:
+                value = row[name]
+                if value is not None and not isinstance(value, str):
+                    row[name] = str(value)
+            for name, column in self.columns.items():
+                column.append(row[name])
+            self.rows += 1
+        if self.rows >= PARQUET_ROW_GROUP:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        self.writer.write_table(self.pyarrow.table(self.columns, schema=self.schema))
+        for column in self.columns.values():
+            column.clear()
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+WRITERS = {
+    'jsonl': JSONLWriter,
+    'csv': CSVWriter,
+    'txt': TextWriter,
+    'parquet': ParquetWriter,
+}
+
+# Format of an output file, by extension
+EXTENSIONS = {
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.csv': 'csv',
+    '.txt': 'txt',
+    '.parquet': 'parquet',
+}
+
+
+def available_formats() -> List[str]:
+    return [name for name in WRITERS if name != 'parquet' or HAS_PYARROW]
+
+
+def format_for_path(file_path: str) -> Optional[str]:
+    return EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+
+
+def open_output(file_path: str, export_format: str):
+    """Open an output file in the mode its writer needs"""
+    if WRITERS[export_format].binary:
+        return open(file_path, 'wb')
+    return open(file_path, 'w', encoding='utf-8', newline='')
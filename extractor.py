@@ -0,0 +1,711 @@
+"""
+Prompt extraction engine.
+
+Holds the PromptExtractor logic shared by the GUI and by worker processes,
+so it must not import PyQt6.
+"""
+
+import os
+import sys
+import json
+import zlib
+import queue
+import threading
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import profiling
+from png_metadata import read_png_metadata, PNGFormatError
+from result_cache import FileKey, file_key
+from metadata_cache import FileMetadata, MetadataCache, ParsedMetadata
+
+
+# Extraction modes as shown in the UI, and the method name they report
+MODES = ("ComfyUI", "Parameters", "Auto")
+MODE_METHODS = {"ComfyUI": 'comfyui', "Parameters": 'parameters', "Auto": 'auto'}
+# Methods whose prompts parse_metadata() keeps; Auto takes the first that finds any
+PARSED_METHODS = ('comfyui', 'parameters')
+
+# Node types the ComfyUI extractors look for. The JSON encoders ComfyUI uses
+# never escape ASCII letters, so a chunk not containing these cannot match.
+WORKFLOW_MARKER = 'CLIPText'        # any case, see extract_positive_from_workflow()
+PROMPT_MARKER = 'CLIPTextEncode'    # exact class_type, see extract_positive_from_prompt_data()
+
+# Drops queued work items on pool shutdown (Python 3.9+; older versions
+# rely on the futures cancelled before it)
+_CANCEL_FUTURES = {'cancel_futures': True} if sys.version_info >= (3, 9) else {}
+
+# orjson module once loaded, False if it is not installed
+_orjson = None
+
+
+def loads_json(text: str) -> Any:
+    """json.loads(), using the much faster orjson when it is installed.
+
+    The results only differ for integers beyond 64 bits, which orjson reads
+    as floats; no value the extractors report can be that large.
+    """
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson as _orjson
+        except ImportError:
+            _orjson = False
+    if _orjson:
+        try:
+            return _orjson.loads(text)
+        except _orjson.JSONDecodeError:
+            # orjson is stricter (e.g. NaN written by Python's json.dumps);
+            # the json module decides and reports the error
+            pass
+    return json.loads(text)
+
+
+def may_contain(chunk: Any, marker: str, ignore_case: bool = False) -> bool:
+    """False only if chunk is text that cannot contain marker, so it need not be parsed"""
+    if not isinstance(chunk, str) or marker in chunk:
+        return True
+    # Lower-casing a large chunk costs more than the exact search, so it comes second
+    return ignore_case and marker.lower() in chunk.lower()
+
+
+def error_result(file_path: str, mode: str, exc: BaseException) -> Dict[str, Any]:
+    """Build a result dict recording a per-file extraction failure"""
+    cause = exc.__cause__ or exc
+    return {
+        'file_info': {
+            'filename': os.path.basename(file_path)
+        },
+        'positive_prompts': [],
+        'extraction_method': MODE_METHODS.get(mode, 'unknown'),
+        'error': {
+            'type': type(cause).__name__,
+            'message': str(exc)
+        }
+    }
+
+
+class PromptExtractor:
+    """Core extraction logic"""
+
+    ENGINES = ("raw", "pil")
+
+    def __init__(self, engine: str = "raw"):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown metadata engine: {engine}")
+        self.engine = engine
+
+    def read_metadata(self, file_path: str) -> FileMetadata:
+        """Return (size, mode, text metadata) for a PNG file.
+
+        The raw chunk reader is used by default; PIL is kept as a fallback
+        for files the raw reader cannot handle.
+        """
+        with profiling.timer('read metadata'):
+            if self.engine == "raw":
+                try:
+                    png = read_png_metadata(file_path)
+                    return png.size, png.mode, png.info
+                except (PNGFormatError, zlib.error):
+                    pass
+
+            profiling.count('PIL reads')
+            from PIL import Image
+
+            with Image.open(file_path) as img:
+                if img.format != 'PNG':
+                    raise ValueError(f"File is not a PNG: {img.format}")
+                return img.size, img.mode, img.info
+    
+    def extract(self, file_path: str, mode: str, file_metadata: Optional[FileMetadata] = None) -> Dict[str, Any]:
+        """Extract positive prompts using one of MODES.
+
+        file_metadata, as returned by read_metadata(), avoids reading the file.
+        """
+        if mode == "ComfyUI":
+            return self.extract_positive_prompts_comfyui(file_path, file_metadata)
+        if mode == "Auto":
+            return self.extract_positive_prompts_auto(file_path, file_metadata)
+        return self.extract_positive_prompts_parameters(file_path, file_metadata)
+
+    def extract_isolated(self, file_path: str, mode: str,
+                         file_metadata: Optional[FileMetadata] = None) -> Dict[str, Any]:
+        """Like extract(), but return an error record instead of raising"""
+        try:
+            return self.extract(file_path, mode, file_metadata)
+        except Exception as e:
+            return error_result(file_path, mode, e)
+
+    def read_result(self, file_path: str, method: str,
+                    file_metadata: Optional[FileMetadata] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Read a file once (unless file_metadata is given) and return (empty result dict, text metadata)"""
+        if file_metadata is None:
+            try:
+                file_metadata = self.read_metadata(file_path)
+            except Exception as e:
+                raise Exception(f"Error reading PNG file: {e}") from e
+        size, image_mode, metadata = file_metadata
+        result = {
+            'file_info': {
+                'filename': os.path.basename(file_path),
+                'size': size,
+                'mode': image_mode
+            },
+            'positive_prompts': [],
+            'extraction_method': method
+        }
+        return result, metadata
+
+    def parse_metadata(self, file_metadata: FileMetadata) -> ParsedMetadata:
+        """Return (size, image mode, {method: prompts}) for every method in PARSED_METHODS.
+
+        This is all parsed_result() needs to build the result of any mode.
+        """
+        size, image_mode, metadata = file_metadata
+        prompts = {'comfyui': self.comfyui_prompts(metadata), 'parameters': self.parameters_prompts(metadata)}
+        return size, image_mode, prompts
+
+    def parsed_result(self, file_path: str, mode: str, parsed: ParsedMetadata) -> Dict[str, Any]:
+        """The result extract() returns for a file, built from its parse_metadata() output"""
+        size, image_mode, prompts = parsed
+        if mode == "ComfyUI":
+            method = 'comfyui'
+        elif mode == "Auto":
+            method = next((method for method in PARSED_METHODS if prompts[method]), 'auto')
+        else:
+            method = 'parameters'
+        return {
+            'file_info': {
+                'filename': os.path.basename(file_path),
+                'size': size,
+                'mode': image_mode
+            },
+            # Copied, so the cached list is never shared with a result
+            'positive_prompts': list(prompts.get(method, [])),
+            'extraction_method': method
+        }
+
+    def extract_positive_prompts_comfyui(self, file_path: str,
+                                         file_metadata: Optional[FileMetadata] = None) -> Dict[str, Any]:
+        """Extract positive prompts using ComfyUI metadata (workflow/prompt)"""
+        result, metadata = self.read_result(file_path, 'comfyui', file_metadata)
+        result['positive_prompts'] = self.comfyui_prompts(metadata)
+        return result
+
+    def extract_positive_prompts_parameters(self, file_path: str,
+                                            file_metadata: Optional[FileMetadata] = None) -> Dict[str, Any]:
+        """Extract positive prompt using Parameters metadata and direct PNG properties"""
+        result, metadata = self.read_result(file_path, 'parameters', file_metadata)
+        result['positive_prompts'] = self.parameters_prompts(metadata)
+        return result
+
+    def extract_positive_prompts_auto(self, file_path: str,
+                                      file_metadata: Optional[FileMetadata] = None) -> Dict[str, Any]:
+        """Read the metadata once and try ComfyUI, then Parameters extraction.
+
+        extraction_method records the method that found prompts, or 'auto'
+        if neither did.
+        """
+        result, metadata = self.read_result(file_path, 'auto', file_metadata)
+        for method, extract in (('comfyui', self.comfyui_prompts), ('parameters', self.parameters_prompts)):
+            prompts = extract(metadata)
+            if prompts:
+                result['positive_prompts'] = prompts
+                result['extraction_method'] = method
+                break
+        return result
+
+    def comfyui_prompts(self, metadata: Dict[str, Any]) -> List[Dict]:
+        """Positive prompts from the workflow, or failing that the prompt metadata"""
+        prompts = []
+        processed_nodes = set()
+
+        try:
+            # Try workflow first; skip parsing graphs without text encoders
+            workflow = metadata.get('workflow')
+            if workflow is not None and may_contain(workflow, WORKFLOW_MARKER, ignore_case=True):
+                try:
+                    with profiling.timer('parse JSON'):
+                        workflow_data = loads_json(workflow)
+                    profiling.count('JSON bytes parsed', len(workflow))
+                    with profiling.timer('find prompts'):
+                        prompts.extend(self.extract_positive_from_workflow(workflow_data, processed_nodes))
+                except json.JSONDecodeError as e:
+                    print(f"Warning: Could not parse workflow JSON: {e}")
+            elif workflow is not None:
+                profiling.count('JSON chunks skipped')
+
+            # Then prompt data if none found
+            prompt = metadata.get('prompt')
+            if not prompts and prompt is not None and may_contain(prompt, PROMPT_MARKER):
+                try:
+                    with profiling.timer('parse JSON'):
+                        prompt_data = loads_json(prompt)
+                    profiling.count('JSON bytes parsed', len(prompt))
+                    with profiling.timer('find prompts'):
+                        prompts.extend(self.extract_positive_from_prompt_data(prompt_data, processed_nodes))
+                except json.JSONDecodeError as e:
+                    print(f"Warning: Could not parse prompt JSON: {e}")
+            elif not prompts and prompt is not None:
+                profiling.count('JSON chunks skipped')
+        except Exception as e:
+            raise Exception(f"Error reading PNG file: {e}") from e
+
+        return prompts
+
+    def parameters_prompts(self, metadata: Dict[str, Any]) -> List[Dict]:
+        """Positive prompt from the parameters metadata, or failing that PNG properties"""
+        # First, try the parameters extraction
+        with profiling.timer('find prompts'):
+            prompt_text = self.extract_positive_from_parameters_strict(metadata)
+        if prompt_text:
+            return [{
+                'text': prompt_text,
+                'node_id': 'parameters',
+                'node_type': 'parameters',
+                'title': 'Parameters',
+                'source': 'parameters'
+            }]
+
+        # If original method fails, try PNG properties as fallback
+        with profiling.timer('find prompts'):
+            prompt_text = self.extract_positive_from_png_properties(metadata)
+        if prompt_text:
+            return [{
+                'text': prompt_text,
+                'node_id': 'png_properties',
+                'node_type': 'png_properties',
+                'title': 'PNG Properties',
+                'source': 'png_properties'
+            }]
+
+        return []
+
+    def extract_positive_from_workflow(self, workflow_data: Dict, processed_nodes: set) -> List[Dict]:
+        """Extract positive prompts from workflow nodes"""
+        positive_prompts = []
+        nodes = workflow_data.get('nodes', [])
+
+        for node in nodes:
+            node_id = node.get('id')
+            node_type = node.get('type', '')
+            title = node.get('title', '').lower()
+
+            if node_id in processed_nodes:
+                continue
+
+            if (node_type == 'CLIPTextEncode' or
+                'cliptext' in node_type.lower() or
+                node.get('properties', {}).get('Node name for S&R') == 'CLIPTextEncode'):
+
+                widgets_values = node.get('widgets_values', [])
+
+                if widgets_values and len(widgets_values) > 0:
+                    prompt_text = widgets_values[0]
+
+                    is_positive = (
+                        'positive' in title or
+                        'pos' in title or
+                        (title == '' and isinstance(prompt_text, str) and prompt_text.strip() != '' and 'negative' not in prompt_text.lower()[:50]) or
+                        (title == 'untitled' and isinstance(prompt_text, str) and prompt_text.strip() != '' and 'negative' not in prompt_text.lower()[:50])
+                    )
+
+                    is_negative = (
+                        'negative' in title or
+                        'neg' in title or
+                        (isinstance(prompt_text, str) and (prompt_text.strip() == '' or prompt_text.lower().strip().startswith('negative')))
+                    )
+
+                    if isinstance(prompt_text, list):
+                        prompt_text = '\n'.join(str(x) for x in prompt_text)
+
+                    if is_positive and not is_negative and isinstance(prompt_text, (str, int, float)):
+                        prompt_info = {
+                            'text': str(prompt_text),
+                            'node_id': node_id,
+                            'node_type': node_type,
+                            'title': node.get('title', 'Untitled'),
+                            'source': 'workflow'
+                        }
+
+                        positive_prompts.append(prompt_info)
+                        processed_nodes.add(node_id)
+
+        return positive_prompts
+
+    def extract_positive_from_prompt_data(self, prompt_data: Dict, processed_nodes: set) -> List[Dict]:
+        """Extract positive prompts from prompt data structure"""
+        positive_prompts = []
+
+        for key, value in prompt_data.items():
+            if isinstance(value, dict):
+                class_type = value.get('class_type', '')
+
+                if key in processed_nodes:
+                    continue
+
+                if class_type == 'CLIPTextEncode':
+                    inputs = value.get('inputs', {})
+
+                    text_content = None
+                    if 'text' in inputs:
+                        text_content = inputs['text']
+                    elif 'prompt' in inputs:
+                        text_content = inputs['prompt']
+
+                    if text_content is None:
+                        continue
+                    if isinstance(text_content, list):
+                        text_content = '\n'.join(str(i) for i in text_content)
+                    elif not isinstance(text_content, str):
+                        text_content = str(text_content)
+
+                    if text_content.strip():
+                        is_negative = (
+                            'negative' in text_content.lower()[:50]
+                        )
+
+                        if not is_negative:
+                            prompt_info = {
+                                'text': text_content,
+                                'node_id': key,
+                                'class_type': class_type,
+                                'title': f"Node {key}",
+                                'source': 'prompt_data'
+                            }
+
+                            positive_prompts.append(prompt_info)
+                            processed_nodes.add(key)
+
+        return positive_prompts
+
+    def extract_positive_from_png_properties(self, metadata: Dict) -> Optional[str]:
+        """Extract positive prompt directly from PNG properties"""
+        try:
+            possible_keys = [
+                'Positive prompt',
+                'positive prompt', 
+                'Positive Prompt',
+                'positive_prompt'
+            ]
+            
+            for key in possible_keys:
+                if key in metadata:
+                    value = metadata[key]
+                    
+                    if isinstance(value, bytes):
+                        try:
+                            value = value.decode('utf-8', errors='ignore')
+                        except Exception:
+                            value = str(value)
+                    elif not isinstance(value, str):
+                        value = str(value)
+                    
+                    if value and value.strip():
+                        result = value.strip()
+                        if ((result.startswith('"') and result.endswith('"')) or 
+                            (result.startswith("'") and result.endswith("'"))):
+                            result = result[1:-1]
+                        return result
+            
+            return None
+            
+        except Exception as e:
+            print(f"PNG properties extractor error: {e}")
+            return None
+
+    def extract_positive_from_parameters_strict(self, metadata: Dict) -> Optional[str]:
+        """Extract from parameters metadata with robust type handling"""
+        try:
+            if 'parameters' not in metadata:
+                return None
+
+            parameters_data = metadata['parameters']
+
+            if isinstance(parameters_data, bytes):
+                try:
+                    parameters_data = parameters_data.decode('utf-8', errors='ignore')
+                except Exception:
+                    parameters_data = str(parameters_data)
+            elif isinstance(parameters_data, (list, dict)):
+                parameters_data = json.dumps(parameters_data, ensure_ascii=False)
+            elif not isinstance(parameters_data, str):
+                parameters_data = str(parameters_data)
+
+            # Try JSON first
+            try:
+                parsed_params = json.loads(parameters_data)
+                if isinstance(parsed_params, dict):
+                    possible_keys = [
+                        'Positive prompt',
+                        'positive prompt',
+                        'Positive Prompt',
+                        'positive_prompt',
+                        'prompt',
+                        'Prompt'
+                    ]
+                    for key in possible_keys:
+                        if key in parsed_params:
+                            value = parsed_params[key]
+                            if isinstance(value, list):
+                                return '\n'.join(str(v) for v in value)
+                            return str(value) if value is not None else None
+            except json.JSONDecodeError:
+                pass
+
+            # Parse text format
+            lines = parameters_data.split('\n')
+            for i, line in enumerate(lines):
+                line_stripped_lower = line.strip().lower()
+                if line_stripped_lower.startswith('positive prompt:'):
+                    prompt_text = line.split(':', 1)[1].strip() if ':' in line else ''
+                    j = i + 1
+                    prompt_lines = [prompt_text] if prompt_text else []
+                    while j < len(lines):
+                        next_line = lines[j]
+                        nl = next_line.strip().lower()
+                        if ':' in nl and any(param in nl for param in
+                                             ['negative prompt', 'steps', 'sampler', 'cfg scale', 'seed', 'size', 'model', 'clip skip']):
+                            break
+                        prompt_lines.append(next_line.rstrip())
+                        j += 1
+
+                    full_prompt = '\n'.join(prompt_lines).rstrip()
+                    out_lines = full_prompt.splitlines()
+                    k = 0
+                    while k < len(out_lines) and out_lines[k].strip() == '':
+                        k += 1
+                    return '\n'.join(out_lines[k:]) if k < len(out_lines) else None
+
+            return None
+
+        except Exception as e:
+            print(f"Parameters extractor error: {e}")
+            return None
+
+
+# (index, result, file key, parsed metadata); the last two are only set when metadata is kept
+ExtractedFile = Tuple[int, Dict[str, Any], Optional[FileKey], Optional[ParsedMetadata]]
+
+
+def _extract_file(extractor: PromptExtractor, index: int, file_path: str, mode: str,
+                  keep_metadata: bool) -> ExtractedFile:
+    if not keep_metadata:
+        return index, extractor.extract_isolated(file_path, mode), None, None
+    # Stat before reading, so a file changed meanwhile is not cached under its new identity
+    key = file_key(file_path)
+    try:
+        file_metadata = extractor.read_metadata(file_path)
+        parsed = extractor.parse_metadata(file_metadata)
+    except Exception:
+        # extract_isolated() reads it again if needed and records the error
+        return index, extractor.extract_isolated(file_path, mode), None, None
+    return index, extractor.parsed_result(file_path, mode, parsed), key, parsed
+
+
+def _extract_chunk(chunk: List[Tuple[int, str]], mode: str, engine: str, keep_metadata: bool = False,
+                   profile: bool = False) -> Tuple[List[ExtractedFile], Optional[Dict[str, Any]]]:
+    """Worker entry point: extract a chunk of (index, path).
+
+    Returns the extracted files and, if profile is set, the profile of the chunk.
+    With keep_metadata, each file also comes with its parsed metadata, which
+    is small next to the text chunks it was parsed from.
+    """
+    if profile:
+        profiling.start()
+    extractor = PromptExtractor(engine)
+    extracted = [_extract_file(extractor, index, file_path, mode, keep_metadata)
+                 for index, file_path in chunk]
+    return extracted, profiling.stop().as_dict() if profile else None
+
+
+class ParallelExtractor:
+    """Process-pool extraction engine for large batches"""
+
+    # Below this many files the pool start-up cost outweighs the speed-up
+    MIN_PARALLEL_FILES = 256
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 32, engine: str = "raw",
+                 metadata_cache: Optional[MetadataCache] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.engine = engine
+        # Files found here are parsed without being read again
+        self.metadata_cache = metadata_cache
+        self.cancelled = False
+        # Chunks submitted and not finished yet; finished ones are dropped at
+        # once so their results are not kept beyond the metadata cache
+        self._futures = set()
+
+    def use_pool(self, file_count: int) -> bool:
+        return self.workers > 1 and file_count >= self.MIN_PARALLEL_FILES
+
+    def cancel(self):
+        """Stop yielding results and drop queued chunks (callable from any thread)"""
+        self.cancelled = True
+        for future in list(self._futures):
+            future.cancel()
+
+    def cached_metadata(self, file_path: str) -> Optional[ParsedMetadata]:
+        """Parsed metadata of an unchanged file read earlier, or None"""
+        if self.metadata_cache is None:
+            return None
+        key = file_key(file_path)
+        parsed = self.metadata_cache.get(key) if key is not None else None
+        if parsed is not None:
+            profiling.count('metadata cache hits')
+        return parsed
+
+    def extract_cached(self, extractor: PromptExtractor, index: int, file_path: str,
+                       mode: str) -> Optional[ExtractedFile]:
+        """Extract a file from its cached parsed metadata, or return None if it is not cached"""
+        parsed = self.cached_metadata(file_path)
+        if parsed is None:
+            return None
+        return index, extractor.parsed_result(file_path, mode, parsed), None, None
+
+    def remember(self, extracted: List[ExtractedFile]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Cache the metadata parsed for extracted files and yield (index, result)"""
+        for index, result, key, parsed in extracted:
+            if key is not None and parsed is not None:
+                self.metadata_cache.put(key, parsed)
+            profiling.count('files extracted')
+            if 'error' in result:
+                profiling.count('extraction errors')
+            yield index, result
+
+    def iter_unordered(self, file_paths: Iterable[str], mode: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (index, result) pairs in completion order.
+
+        file_paths may be a lazy iterable such as a directory scan; indices
+        follow its iteration order and extraction starts before it is exhausted.
+        Files with cached metadata are extracted in this process without being
+        read or parsed; the pool is only started for enough uncached files.
+        """
+        extractor = PromptExtractor(self.engine)
+        indexed = enumerate(file_paths)
+        keep_metadata = self.metadata_cache is not None
+        head = []
+        for index, file_path in indexed:
+            if self.cancelled:
+                return
+            extracted = self.extract_cached(extractor, index, file_path, mode)
+            if extracted is not None:
+                yield from self.remember([extracted])
+                continue
+            head.append((index, file_path))
+            if len(head) >= self.MIN_PARALLEL_FILES:
+                break
+        if not self.use_pool(len(head)):
+            for index, file_path in head:
+                if self.cancelled:
+                    return
+                yield from self.remember([_extract_file(extractor, index, file_path, mode, keep_metadata)])
+            for index, file_path in indexed:
+                if self.cancelled:
+                    return
+                extracted = self.extract_cached(extractor, index, file_path, mode)
+                if extracted is None:
+                    extracted = _extract_file(extractor, index, file_path, mode, keep_metadata)
+                yield from self.remember([extracted])
+            return
+
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Chunks of uncached files are submitted by a feeder thread as paths
+        # arrive; completed futures, lists of files extracted from cached
+        # metadata and finally the number of chunks come back through done.
+        done: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+
+        # spawn keeps workers independent of the Qt threads in the parent
+        context = multiprocessing.get_context("spawn")
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+        def finished(future):
+            self._futures.discard(future)
+            done.put(future)
+
+        def feed():
+            submitted = 0
+
+            def submit(chunk):
+                nonlocal submitted
+                future = pool.submit(_extract_chunk, chunk, mode, self.engine, keep_metadata,
+                                     profiling.active() is not None)
+                self._futures.add(future)
+                future.add_done_callback(finished)
+                submitted += 1
+
+            try:
+                for start in range(0, len(head), self.chunk_size):
+                    submit(head[start:start + self.chunk_size])
+                chunk = []
+                cached = []
+                for index, file_path in indexed:
+                    if self.cancelled or stop.is_set():
+                        return
+                    extracted = self.extract_cached(extractor, index, file_path, mode)
+                    if extracted is not None:
+                        cached.append(extracted)
+                        if len(cached) >= self.chunk_size:
+                            done.put(cached)
+                            cached = []
+                        continue
+                    chunk.append((index, file_path))
+                    if len(chunk) >= self.chunk_size:
+                        submit(chunk)
+                        chunk = []
+                if self.cancelled or stop.is_set():
+                    return
+                if chunk:
+                    submit(chunk)
+                if cached:
+                    done.put(cached)
+            except BaseException as e:
+                done.put(e)
+            finally:
+                done.put(submitted)
+
+        feeder = threading.Thread(target=feed, name="extract-feeder", daemon=True)
+        feeder.start()
+        try:
+            received = 0
+            total = None
+            while total is None or received < total:
+                item = done.get()
+                if isinstance(item, int):
+                    total = item
+                    continue
+                if isinstance(item, BaseException):
+                    raise item
+                if self.cancelled:
+                    return
+                if isinstance(item, list):
+                    yield from self.remember(item)
+                    continue
+                received += 1
+                if item.cancelled():
+                    continue
+                extracted, chunk_profile = item.result()
+                profiling.merge(chunk_profile)
+                yield from self.remember(extracted)
+        finally:
+            # The feeder may be blocked on a lazy input; it exits on its next path
+            stop.set()
+            for future in list(self._futures):
+                future.cancel()
+            self._futures.clear()
+            if self.cancelled:
+                # Return at once with the queued chunks dropped, instead of
+                # waiting for them while a pre-empting job starts its own pool
+                pool.shutdown(wait=False, **_CANCEL_FUTURES)
+            else:
+                pool.shutdown()
+
+    def extract_all(self, file_paths: Sequence[str], mode: str) -> List[Dict[str, Any]]:
+        """Extract every file and return results in input order"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(file_paths)
+        for index, result in self.iter_unordered(file_paths, mode):
+            results[index] = result
+        return results
@@ -0,0 +1,1724 @@
+"""
+ComfyUI Prompt Extractor v3.0 - KDE Native Edition
+Main window of the GUI; started by main.py.
+"""
+
+import sys
+import os
+import importlib.util
+import threading
+import time
+from datetime import datetime
+
+from PyQt6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QPushButton, QLabel, QTextEdit, QComboBox, QTabWidget,
+    QFileDialog, QMessageBox, QStatusBar,
+    QGroupBox, QProgressBar, QFrame, QSpinBox, QCheckBox
+)
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QAction, QDragEnterEvent, QDropEvent, QIcon, QTextCursor, QFontDatabase
+
+import profiling
+from export import WRITERS, HAS_PYARROW, format_for_path, open_output
+from extractor import PromptExtractor, ParallelExtractor, MODES
+from result_cache import open_default_cache, extract_with_cache
+from metadata_cache import MetadataCache
+from prompt_groups import PromptGrouper, PromptSnapshot
+from search_index import BackgroundIndexer, open_default_index
+from search_view import SearchView
+from rendering import ORIGINAL
+from results_view import ResultsView
+from thumbnail_grid import ThumbnailGrid
+from thumbnails import ThumbnailLoader
+from scanner import DirectoryScanner, iter_files, matches, DEFAULT_INCLUDE
+from watcher import FolderWatcher
+from translation import (
+    open_default_translation_cache, translate_prompts, create_backend,
+    TranslationCancelled, MockBackend, TRANSLATORS_ENGINES
+)
+
+# PIL, pyperclip and translators are imported on first use to keep start-up
+# fast; translators in particular is slow to import and prints warnings.
+HAS_TRANSLATORS_PACKAGE = importlib.util.find_spec("translators") is not None
+
+# Setting this (e.g. to "latency=0.5,failure_rate=0.05") adds the offline
+# "mock" translator engine, for testing the translation pipeline without network.
+MOCK_TRANSLATOR_SPEC = os.environ.get("PROMPT_EXTRACTOR_MOCK_TRANSLATOR")
+
+HAS_TRANSLATOR = HAS_TRANSLATORS_PACKAGE or MOCK_TRANSLATOR_SPEC is not None
+
+# Save dialog filters and the format each one writes; "txt" is the human-readable report
+SAVE_FILTERS = {
+    "Text report (*.txt)": 'txt',
+    "JSON Lines (*.jsonl)": 'jsonl',
+    "CSV (*.csv)": 'csv',
+    "Parquet (*.parquet)": 'parquet',
+}
+
+# Largest prompt groups listed in the Summary tab, and the characters of text shown for each
+SUMMARY_GROUPS = 100
+GROUP_PREVIEW_CHARS = 120
+
+
+class ExtractionThread(QThread):
+    """Thread for extracting prompts from files"""
+    # generation, number of files processed, paths of the processed files
+    finished = pyqtSignal(int, int, list)
+    batch_ready = pyqtSignal(int, list, int, int)
+    # generation, newly found paths; only for lazy inputs such as a folder scan
+    files_found = pyqtSignal(int, list)
+    error = pyqtSignal(int, str)
+    
+    # Partial results are flushed every BATCH_SIZE files or BATCH_INTERVAL seconds
+    BATCH_SIZE = 200
+    BATCH_INTERVAL = 0.1
+    
+    def __init__(self, generation, file_paths, mode, engine, cache=None, indices=None, indexer=None):
+        super().__init__()
+        self.generation = generation
+        # A list is extracted as is; any other iterable is scanned while extracting
+        self.lazy = not isinstance(file_paths, list)
+        self.source = file_paths
+        self.file_paths = [] if self.lazy else file_paths
+        # Batch index of each of file_paths in batch_ready, for jobs that extend
+        # or update a batch; by default files are numbered from 0
+        self.indices = indices
+        self.mode = mode
+        self.engine = engine
+        self.cache = cache
+        # Receives (path, result) batches for the prompt search index
+        self.indexer = indexer
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+        self.engine.cancel()
+    
+    def record_paths(self):
+        """Pass paths through from the lazy source, remembering each one"""
+        for file_path in self.source:
+            self.file_paths.append(file_path)
+            yield file_path
+    
+    def batch_index(self, index):
+        return index if self.indices is None else self.indices[index]
+    
+    def announce_files(self):
+        """Emit the paths found since the last call; returns the number found so far"""
+        found = len(self.file_paths)
+        if self.lazy and found > self.announced:
+            self.files_found.emit(self.generation, self.file_paths[self.announced:found])
+            self.announced = found
+        return found
+    
+    def run(self):
+        try:
+            # Results are handed to the UI in batches and not kept here
+            processed = bytearray(len(self.file_paths))
+            self.announced = 0
+            done = 0
+            batch = []
+            index_batch = []
+            last_emit = 0.0
+            
+            inputs = self.record_paths() if self.lazy else self.file_paths
+            stream = extract_with_cache(self.cache, self.engine, inputs, self.mode)
+            try:
+                for index, result in stream:
+                    if self.cancelled:
+                        break
+                    if index >= len(processed):
+                        processed.extend(bytes(len(self.file_paths) - len(processed)))
+                    processed[index] = 1
+                    batch.append((self.batch_index(index), result))
+                    if self.indexer is not None:
+                        index_batch.append((self.file_paths[index], result))
+                    done += 1
+                    
+                    now = time.monotonic()
+                    if len(batch) >= self.BATCH_SIZE or now - last_emit >= self.BATCH_INTERVAL:
+                        # Paths are announced before any result that refers to them
+                        total = self.announce_files()
+                        self.batch_ready.emit(self.generation, batch, done, total)
+                        batch = []
+                        last_emit = now
+                        if self.indexer is not None:
+                            self.indexer.submit(index_batch)
+                            index_batch = []
+            finally:
+                stream.close()
+            
+            total = self.announce_files()
+            if batch:
+                self.batch_ready.emit(self.generation, batch, done, total)
+            if self.indexer is not None:
+                self.indexer.submit(index_batch)
+            
+            if self.cancelled:
+                kept = [path for path, flag in zip(self.file_paths, processed) if flag]
+                self.finished.emit(self.generation, done, kept)
+            else:
+                self.finished.emit(self.generation, done, self.file_paths)
+        except Exception as e:
+            self.error.emit(self.generation, str(e))
+
+
+class ExtractionScheduler:
+    """Runs one extraction job at a time, pre-empting the previous one.
+    
+    Every job gets a new generation ID; signals from older generations are
+    stale and must be ignored by the receiver.
+    """
+    
+    def __init__(self, indexer=None):
+        self.generation = 0
+        self.current = None
+        self.retired = []
+        # Every job feeds its results to the search index, if there is one
+        self.indexer = indexer
+    
+    def submit(self, file_paths, mode, engine, cache=None, indices=None):
+        self.preempt()
+        self.generation += 1
+        self.current = ExtractionThread(self.generation, file_paths, mode, engine, cache, indices,
+                                        self.indexer)
+        return self.current
+    
+    def preempt(self):
+        """Cancel the running job, keeping a reference until its thread exits"""
+        self.retired = [thread for thread in self.retired if thread.isRunning()]
+        if self.current is not None and self.current.isRunning():
+            self.current.cancel()
+            self.retired.append(self.current)
+    
+    def invalidate(self):
+        """Cancel the running job and drop all of its pending results"""
+        self.preempt()
+        self.generation += 1
+        self.current = None
+    
+    def is_current(self, generation):
+        return generation == self.generation
+    
+    def shutdown(self):
+        self.preempt()
+        for thread in self.retired:
+            thread.wait()
+
+
+class TranslationThread(QThread):
+    """Thread for translating prompts"""
+    # Emitted at most every PARTIAL_INTERVAL seconds with {prompt index: translation}
+    partial = pyqtSignal(dict)
+    finished = pyqtSignal(list, str, dict)
+    cancelled = pyqtSignal()
+    error = pyqtSignal(str)
+    
+    PARTIAL_INTERVAL = 0.1
+    
+    def __init__(self, prompts, from_lang, to_lang, direction, backend, cache=None, targets=None,
+                 extends_layer=False):
+        super().__init__()
+        self.prompts = prompts
+        # Segments each prompt is applied to; by default prompt i is segment i
+        self.targets = targets
+        # Only fills in the missing segments of an existing layer, which is kept if this stops early
+        self.extends_layer = extends_layer
+        self.from_lang = from_lang
+        self.to_lang = to_lang
+        self.direction = direction
+        self.backend = backend
+        self.cache = cache
+        self.cancel_event = threading.Event()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._last_emit = 0.0
+    
+    def cancel(self):
+        self.cancel_event.set()
+    
+    def on_progress(self, updates):
+        """Collect translations from worker threads and emit them in batches"""
+        with self._pending_lock:
+            self._pending.update(updates)
+            now = time.monotonic()
+            if now - self._last_emit < self.PARTIAL_INTERVAL:
+                return
+            pending, self._pending = self._pending, {}
+            self._last_emit = now
+        self.partial.emit(pending)
+    
+    def run(self):
+        try:
+            translated_prompts, stats = translate_prompts(
+                self.prompts, self.backend, self.from_lang, self.to_lang,
+                cache=self.cache, cancel_event=self.cancel_event, on_progress=self.on_progress
+            )
+            self.finished.emit(translated_prompts, self.direction, stats)
+        except TranslationCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class GroupingThread(QThread):
+    """Thread bringing a PromptGrouper up to date with a snapshot of the results.
+    
+    The grouper must not be used elsewhere until the thread has finished.
+    """
+    ready = pyqtSignal(list)
+    
+    def __init__(self, grouper, snapshot, resync=False):
+        super().__init__()
+        self.grouper = grouper
+        self.snapshot = snapshot
+        # Prompts were replaced in place since the last run (see PromptGrouper.resync)
+        self.resync = resync
+    
+    def run(self):
+        if self.resync:
+            self.grouper.resync(self.snapshot)
+        self.ready.emit(self.grouper.groups(self.snapshot))
+
+
+class DropFrame(QFrame):
+    """Frame that accepts drag and drop"""
+    filesDropped = pyqtSignal(list)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAcceptDrops(True)
+        self.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Sunken)
+        self.setLineWidth(2)
+        
+        layout = QVBoxLayout()
+        self.label = QLabel("Drag & Drop PNG file(s) or folder here")
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.label.setStyleSheet("color: gray; font-size: 11pt;")
+        layout.addWidget(self.label)
+        self.setLayout(layout)
+        
+        self.setMinimumHeight(100)
+    
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+            self.setStyleSheet("background-color: #d0f0d0;")
+            self.label.setText("Drop PNG file(s) or folder here!")
+            self.label.setStyleSheet("color: #006600; font-size: 11pt; font-weight: bold;")
+    
+    def dragLeaveEvent(self, event):
+        self.setStyleSheet("")
+        self.label.setText("Drag & Drop PNG file(s) or folder here")
+        self.label.setStyleSheet("color: gray; font-size: 11pt;")
+    
+    def dropEvent(self, event: QDropEvent):
+        files = []
+        for url in event.mimeData().urls():
+            files.append(url.toLocalFile())
+        
+        self.filesDropped.emit(files)
+        
+        self.setStyleSheet("")
+        self.label.setText("Drag & Drop PNG file(s) or folder here")
+        self.label.setStyleSheet("color: gray; font-size: 11pt;")
+
+
+class ComfyUIPromptExtractorUI(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        
+        self.setWindowTitle("ComfyUI Prompt Extractor v3.0")
+        self.setGeometry(100, 100, 1000, 800)
+        
+        # Set window icon
+        icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icon.png")
+        if os.path.exists(icon_path):
+            self.setWindowIcon(QIcon(icon_path))
+        
+        # Data storage
+        self.current_files = []
+        self.stream_results = []
+        self.stream_next_index = 0
+        self.stream_files_with_prompts = 0
+        self.stream_errors = []
+        # True while the running extraction only adds files to the current batch
+        self.incremental_run = False
+        # Whether the Summary tab lists the prompt groups of the batch
+        self.summary_has_groups = False
+        # Translation layers that only hold the translations of group representatives
+        self.grouped_translations = set()
+        # Stage timings of the last batch recorded with "Record Performance Data"
+        self.profile = None
+        
+        # Watch folder
+        self.folder_watcher = FolderWatcher(self)
+        self.folder_watcher.files_ready.connect(self.on_watched_files)
+        self.watch_queue = []
+        # (folder, DirectoryScanner) of a watched folder whose first scan is still running
+        self.pending_watch = None
+        
+        # Extractor
+        self.extractor = PromptExtractor()
+        self.result_cache = open_default_cache()
+        # Prompts parsed from files this session, so re-runs neither re-read nor re-parse them
+        self.metadata_cache = MetadataCache()
+        # Duplicate and near-duplicate prompts of the batch, for "Group duplicates",
+        # grouped in the background as results arrive
+        self.prompt_grouper = PromptGrouper()
+        self.grouping_thread = None
+        # Grouping threads of earlier batches, kept until they exit
+        self.retired_grouping_threads = []
+        # Groups of the current results, None while they are out of date
+        self.groups = None
+        # The results changed while the grouping thread was running
+        self.grouping_stale = False
+        self.grouping_resync = False
+        self.search_index = open_default_index()
+        self.search_indexer = BackgroundIndexer(self.search_index) if self.search_index is not None else None
+        self.translation_cache = open_default_translation_cache() if HAS_TRANSLATORS_PACKAGE else None
+        
+        # Threads
+        self.extraction_scheduler = ExtractionScheduler(self.search_indexer)
+        self.extraction_thread = None
+        self.translation_thread = None
+        
+        # Thumbnail
+        self.thumbnail_path = None
+        self.thumbnail_loader = ThumbnailLoader(parent=self)
+        self.thumbnail_loader.ready.connect(self.show_thumbnail)
+        self.thumbnail_loader.failed.connect(self.on_thumbnail_failed)
+        
+        # Setup UI
+        self.setup_ui()
+        
+        # Keyboard shortcuts
+        self.setup_shortcuts()
+    
+    @property
+    def document(self):
+        return self.results_view.document
+    
+    @property
+    def all_prompt_texts(self):
+        """Prompt texts currently shown (original or translated)"""
+        return self.document.texts
+    
+    def prompt_groups(self):
+        """Groups of identical and near-identical prompts in the batch.
+        
+        Waits for the grouping thread, and finishes the grouping here, if
+        it is not up to date yet.
+        """
+        if self.groups is None:
+            with profiling.timer('group prompts'):
+                thread = self.grouping_thread
+                if thread is not None:
+                    # Its result is already out of date; the grouper is caught up below
+                    self.grouping_thread = None
+                    thread.wait()
+                store = self.document.store
+                if self.grouping_resync:
+                    self.prompt_grouper.resync(store)
+                    self.grouping_resync = False
+                self.grouping_stale = False
+                self.groups = self.prompt_grouper.groups(store)
+        return self.groups
+    
+    def regroup(self, resync=False):
+        """Bring the prompt groups up to date in the background after the results changed"""
+        self.groups = None
+        self.grouping_resync = self.grouping_resync or resync
+        if not self.group_check.isChecked():
+            return
+        if self.grouping_thread is not None:
+            # Started again with the latest results when it finishes
+            self.grouping_stale = True
+            return
+        self.grouping_stale = False
+        self.grouping_thread = GroupingThread(
+            self.prompt_grouper, PromptSnapshot.of(self.document.store), self.grouping_resync
+        )
+        self.grouping_resync = False
+        self.grouping_thread.ready.connect(self.on_groups_ready)
+        self.grouping_thread.start()
+    
+    def reset_grouping(self):
+        """Drop the groups of the previous batch, leaving a running grouping thread to exit on its own"""
+        if self.grouping_thread is not None:
+            self.retired_grouping_threads.append(self.grouping_thread)
+        self.retired_grouping_threads = [thread for thread in self.retired_grouping_threads if thread.isRunning()]
+        self.grouping_thread = None
+        self.prompt_grouper = PromptGrouper()
+        self.groups = None
+        self.grouping_stale = False
+        self.grouping_resync = False
+    
+    def on_groups_ready(self, groups):
+        # Threads dropped by prompt_groups() or reset_grouping() are out of date
+        if self.grouping_thread is None or self.sender() is not self.grouping_thread:
+            return
+        self.grouping_thread.wait()
+        self.grouping_thread = None
+        if self.grouping_stale:
+            self.regroup()
+            return
+        self.groups = groups
+        extracting = self.extraction_thread is not None and self.extraction_thread.isRunning()
+        if not extracting and self.group_check.isChecked() and groups and not self.summary_has_groups:
+            self.show_group_summary(groups)
+            self.status_bar.showMessage(f"✓ {len(self.all_prompt_texts)} prompts in {len(groups)} groups")
+    
+    @property
+    def is_translated(self):
+        return self.document.direction is not None
+    
+    @property
+    def current_translation_direction(self):
+        return self.document.direction
+    
+    def setup_ui(self):
+        # Menu bar
+        menubar = self.menuBar()
+        
+        # File menu
+        file_menu = menubar.addMenu("File")
+        
+        open_file_action = QAction("Open File(s)...", self)
+        open_file_action.setShortcut("Ctrl+O")
+        open_file_action.triggered.connect(self.browse_file)
+        file_menu.addAction(open_file_action)
+        
+        open_folder_action = QAction("Open Folder...", self)
+        open_folder_action.triggered.connect(self.browse_folder)
+        file_menu.addAction(open_folder_action)
+        
+        self.watch_folder_action = QAction("Watch Folder...", self)
+        self.watch_folder_action.triggered.connect(self.watch_folder)
+        file_menu.addAction(self.watch_folder_action)
+        
+        self.stop_watching_action = QAction("Stop Watching", self)
+        self.stop_watching_action.triggered.connect(self.stop_watching)
+        self.stop_watching_action.setEnabled(False)
+        file_menu.addAction(self.stop_watching_action)
+        
+        file_menu.addSeparator()
+        
+        save_action = QAction("Save to File...", self)
+        save_action.setShortcut("Ctrl+S")
+        save_action.triggered.connect(self.save_to_file)
+        file_menu.addAction(save_action)
+        
+        file_menu.addSeparator()
+        
+        rebuild_cache_action = QAction("Rebuild Extraction Cache", self)
+        rebuild_cache_action.triggered.connect(self.rebuild_cache)
+        file_menu.addAction(rebuild_cache_action)
+        
+        clear_index_action = QAction("Clear Search Index", self)
+        clear_index_action.triggered.connect(self.clear_search_index)
+        file_menu.addAction(clear_index_action)
+        
+        file_menu.addSeparator()
+        
+        self.record_profile_action = QAction("Record Performance Data", self)
+        self.record_profile_action.setCheckable(True)
+        self.record_profile_action.toggled.connect(self.on_record_profile_toggled)
+        file_menu.addAction(self.record_profile_action)
+        
+        self.export_profile_action = QAction("Export Performance Data...", self)
+        self.export_profile_action.triggered.connect(self.export_profile)
+        self.export_profile_action.setEnabled(False)
+        file_menu.addAction(self.export_profile_action)
+        
+        file_menu.addSeparator()
+        
+        exit_action = QAction("Exit", self)
+        exit_action.setShortcut("Ctrl+Q")
+        exit_action.triggered.connect(self.close)
+        file_menu.addAction(exit_action)
+        
+        # Edit menu
+        edit_menu = menubar.addMenu("Edit")
+        
+        copy_all_action = QAction("Copy All Prompts", self)
+        copy_all_action.setShortcut("Ctrl+C")
+        copy_all_action.triggered.connect(self.copy_to_clipboard)
+        edit_menu.addAction(copy_all_action)
+        
+        copy_first_action = QAction("Copy First Prompt", self)
+        copy_first_action.triggered.connect(self.copy_first_prompt)
+        edit_menu.addAction(copy_first_action)
+        
+        clear_action = QAction("Clear Results", self)
+        clear_action.setShortcut("Ctrl+L")
+        clear_action.triggered.connect(self.clear_results)
+        edit_menu.addAction(clear_action)
+        
+        # Help menu
+        help_menu = menubar.addMenu("Help")
+        
+        about_action = QAction("About", self)
+        about_action.triggered.connect(self.show_about)
+        help_menu.addAction(about_action)
+        
+        # Central widget
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        main_layout = QVBoxLayout()
+        central_widget.setLayout(main_layout)
+        
+        # Control frame
+        control_group = QGroupBox("Settings")
+        control_layout = QHBoxLayout()
+        
+        control_layout.addWidget(QLabel("Mode:"))
+        
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(MODES)
+        self.mode_combo.setToolTip("Auto reads each file once and uses ComfyUI metadata, falling back to parameters")
+        self.mode_combo.currentTextChanged.connect(self.on_mode_changed)
+        control_layout.addWidget(self.mode_combo)
+        
+        control_layout.addWidget(QLabel("(Ctrl+E to cycle)"))
+        
+        control_layout.addSpacing(20)
+        
+        control_layout.addWidget(QLabel("Workers:"))
+        
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(0, 256)
+        self.workers_spin.setSpecialValueText("Auto")
+        self.workers_spin.setToolTip("Worker processes for large batches (Auto = one per CPU core)")
+        control_layout.addWidget(self.workers_spin)
+        
+        control_layout.addSpacing(20)
+        
+        self.group_check = QCheckBox("Group duplicates")
+        self.group_check.setToolTip("Collapse identical and near-identical prompts (e.g. seed sweeps) "
+                                    "when copying, saving and translating, and list them in the Summary")
+        self.group_check.toggled.connect(self.on_group_toggled)
+        control_layout.addWidget(self.group_check)
+        
+        control_layout.addSpacing(20)
+        
+        if HAS_TRANSLATOR:
+            control_layout.addWidget(QLabel("Translator:"))
+            
+            self.translator_combo = QComboBox()
+            if HAS_TRANSLATORS_PACKAGE:
+                self.translator_combo.addItems(TRANSLATORS_ENGINES)
+            if MOCK_TRANSLATOR_SPEC is not None:
+                self.translator_combo.addItem(MockBackend.name)
+            control_layout.addWidget(self.translator_combo)
+        
+        control_layout.addStretch()
+        control_group.setLayout(control_layout)
+        main_layout.addWidget(control_group)
+        
+        # Drop zone and file selection
+        file_layout = QHBoxLayout()
+        
+        # Drop zone
+        self.drop_frame = DropFrame()
+        self.drop_frame.filesDropped.connect(self.load_files)
+        file_layout.addWidget(self.drop_frame, 2)
+        
+        # File buttons and thumbnail
+        button_layout = QVBoxLayout()
+        
+        self.browse_file_btn = QPushButton("Browse File(s)...")
+        self.browse_file_btn.clicked.connect(self.browse_file)
+        button_layout.addWidget(self.browse_file_btn)
+        
+        self.browse_folder_btn = QPushButton("Browse Folder...")
+        self.browse_folder_btn.clicked.connect(self.browse_folder)
+        button_layout.addWidget(self.browse_folder_btn)
+        
+        # Thumbnail
+        self.thumbnail_group = QGroupBox("Preview")
+        thumbnail_layout = QVBoxLayout()
+        
+        self.thumbnail_label = QLabel()
+        self.thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.thumbnail_label.setMinimumSize(240, 240)
+        thumbnail_layout.addWidget(self.thumbnail_label)
+        
+        self.thumbnail_info_label = QLabel()
+        self.thumbnail_info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        thumbnail_layout.addWidget(self.thumbnail_info_label)
+        
+        self.thumbnail_group.setLayout(thumbnail_layout)
+        self.thumbnail_group.hide()
+        button_layout.addWidget(self.thumbnail_group)
+        
+        button_layout.addStretch()
+        
+        file_layout.addLayout(button_layout, 1)
+        main_layout.addLayout(file_layout)
+        
+        # Tabs
+        self.tabs = QTabWidget()
+        
+        # Prompts tab
+        self.results_view = ResultsView()
+        self.tabs.addTab(self.results_view, "Extracted Prompts")
+        
+        # Thumbnails tab
+        self.thumbnail_grid = ThumbnailGrid(self.thumbnail_loader, self.document)
+        self.thumbnail_grid.prompt_activated.connect(self.show_prompt)
+        self.tabs.addTab(self.thumbnail_grid, "Thumbnails")
+        
+        # Summary tab
+        self.summary_text = QTextEdit()
+        self.summary_text.setReadOnly(True)
+        self.tabs.addTab(self.summary_text, "Summary")
+        
+        # Search tab
+        self.search_view = SearchView(self.search_index)
+        self.search_view.hit_activated.connect(self.show_search_hit)
+        self.tabs.addTab(self.search_view, "Search")
+        
+        # Performance tab
+        self.performance_text = QTextEdit()
+        self.performance_text.setReadOnly(True)
+        self.performance_text.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.performance_text.setPlaceholderText(
+            "Turn on File > Record Performance Data, then extract files to see where the time goes"
+        )
+        self.tabs.addTab(self.performance_text, "Performance")
+        # Thumbnails and indexing keep adding to the profile after a batch
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        
+        main_layout.addWidget(self.tabs)
+        
+        # Progress bar
+        progress_layout = QHBoxLayout()
+        
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)  # Indeterminate
+        self.progress.hide()
+        progress_layout.addWidget(self.progress)
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_current_job)
+        self.cancel_btn.hide()
+        progress_layout.addWidget(self.cancel_btn)
+        
+        main_layout.addLayout(progress_layout)
+        
+        # Action buttons
+        button_layout = QHBoxLayout()
+        
+        if HAS_TRANSLATOR:
+            self.translate_cn_btn = QPushButton("Translate to CN")
+            self.translate_cn_btn.clicked.connect(self.translate_to_chinese)
+            self.translate_cn_btn.setEnabled(False)
+            button_layout.addWidget(self.translate_cn_btn)
+            
+            self.translate_en_btn = QPushButton("Translate to EN")
+            self.translate_en_btn.clicked.connect(self.translate_to_english)
+            self.translate_en_btn.setEnabled(False)
+            button_layout.addWidget(self.translate_en_btn)
+            
+            self.restore_btn = QPushButton("Restore Original")
+            self.restore_btn.clicked.connect(self.restore_original)
+            self.restore_btn.setEnabled(False)
+            button_layout.addWidget(self.restore_btn)
+        
+        button_layout.addStretch()
+        
+        self.copy_all_btn = QPushButton("Copy All Prompts")
+        self.copy_all_btn.clicked.connect(self.copy_to_clipboard)
+        self.copy_all_btn.setEnabled(False)
+        button_layout.addWidget(self.copy_all_btn)
+        
+        self.copy_first_btn = QPushButton("Copy First Prompt")
+        self.copy_first_btn.clicked.connect(self.copy_first_prompt)
+        self.copy_first_btn.setEnabled(False)
+        button_layout.addWidget(self.copy_first_btn)
+        
+        self.save_btn = QPushButton("Save to File")
+        self.save_btn.clicked.connect(self.save_to_file)
+        self.save_btn.setEnabled(False)
+        button_layout.addWidget(self.save_btn)
+        
+        self.clear_btn = QPushButton("Clear")
+        self.clear_btn.clicked.connect(self.clear_results)
+        button_layout.addWidget(self.clear_btn)
+        
+        main_layout.addLayout(button_layout)
+        
+        # Status bar
+        self.status_bar = QStatusBar()
+        self.setStatusBar(self.status_bar)
+        self.status_bar.showMessage("Ready")
+    
+    def setup_shortcuts(self):
+        # Ctrl+E to cycle modes
+        from PyQt6.QtGui import QShortcut, QKeySequence
+        toggle_shortcut = QShortcut(QKeySequence("Ctrl+E"), self)
+        toggle_shortcut.activated.connect(self.toggle_mode_and_rerun)
+    
+    def on_mode_changed(self, mode):
+        if self.current_files:
+            self.process_files(self.current_files)
+    
+    def on_group_toggled(self, checked):
+        if not checked or not self.all_prompt_texts:
+            return
+        if self.groups is None:
+            # The summary is shown when the grouping thread is done
+            self.regroup()
+            if not self.cancel_btn.isVisible():
+                self.status_bar.showMessage(f"Grouping {len(self.all_prompt_texts)} prompts...")
+        elif not self.cancel_btn.isVisible():
+            self.show_group_summary(self.groups)
+            self.status_bar.showMessage(f"✓ {len(self.all_prompt_texts)} prompts in {len(self.groups)} groups")
+    
+    def show_group_summary(self, groups):
+        """Append the largest groups of duplicate prompts to the Summary tab"""
+        if self.summary_has_groups:
+            return
+        self.summary_has_groups = True
+        
+        repeated = sorted((group for group in groups if len(group.segments) > 1),
+                          key=lambda group: len(group.segments), reverse=True)
+        summary_text = f"\nPROMPT GROUPS: {len(self.all_prompt_texts)} prompts in {len(groups)} groups\n"
+        summary_text += "-" * 30 + "\n"
+        if not repeated:
+            summary_text += "No duplicate prompts found\n"
+        for group in repeated[:SUMMARY_GROUPS]:
+            file_count = len(self.document.group_files(group))
+            files = f"{file_count} files" if file_count > 1 else "1 file"
+            preview = self.document.segment_preview(group.representative, GROUP_PREVIEW_CHARS)
+            summary_text += f"• {self.document.group_header(group)} in {files}: {preview}\n"
+        if len(repeated) > SUMMARY_GROUPS:
+            summary_text += f"... and {len(repeated) - SUMMARY_GROUPS} more groups with duplicates\n"
+        self.append_text(self.summary_text, summary_text)
+    
+    def toggle_mode_and_rerun(self):
+        new_index = (self.mode_combo.currentIndex() + 1) % self.mode_combo.count()
+        self.mode_combo.setCurrentIndex(new_index)
+    
+    def rebuild_cache(self):
+        if self.result_cache is None:
+            QMessageBox.warning(self, "Warning", "The extraction cache is not available")
+            return
+        
+        self.result_cache.rebuild()
+        self.metadata_cache.clear()
+        self.status_bar.showMessage("✓ Extraction cache cleared")
+        
+        if self.current_files:
+            self.process_files(self.current_files)
+    
+    def clear_search_index(self):
+        if self.search_index is None:
+            QMessageBox.warning(self, "Warning", "The search index is not available")
+            return
+        
+        self.search_index.clear()
+        self.search_view.refresh()
+        self.status_bar.showMessage("✓ Search index cleared")
+    
+    def on_record_profile_toggled(self, checked):
+        if checked:
+            self.status_bar.showMessage("Performance data is recorded from the next extraction")
+        else:
+            profiling.stop()
+    
+    def on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.performance_text:
+            self.show_profile()
+    
+    def show_profile(self):
+        if self.profile is not None:
+            self.performance_text.setPlainText(self.profile.report())
+    
+    def export_profile(self):
+        if self.profile is None:
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Performance Data",
+            "performance.json",
+            "JSON (*.json)"
+        )
+        if file_path:
+            try:
+                self.profile.write_json(file_path)
+                self.status_bar.showMessage(f"✓ Saved performance data to {os.path.basename(file_path)}")
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to save file:\n{e}")
+    
+    def browse_file(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Select ComfyUI PNG File(s)",
+            "",
+            "PNG files (*.png);;All files (*.*)"
+        )
+        if file_paths:
+            self.load_files(file_paths)
+    
+    def browse_folder(self):
+        folder_path = QFileDialog.getExistingDirectory(
+            self,
+            "Select Folder with ComfyUI PNG Files"
+        )
+        if folder_path:
+            self.load_files([folder_path])
+    
+    def load_files(self, file_paths):
+        self.stop_watching()
+        
+        # Filter for PNG files; folders are scanned while extraction runs
+        folders = [file_path for file_path in file_paths if os.path.isdir(file_path)]
+        valid_files = [
+            file_path for file_path in file_paths
+            if os.path.isfile(file_path) and matches(os.path.basename(file_path), file_path, DEFAULT_INCLUDE)
+        ]
+        
+        if folders:
+            self.process_files(iter_files(valid_files + folders))
+        elif valid_files:
+            self.process_files(valid_files)
+        else:
+            QMessageBox.warning(self, "Warning", "No valid PNG files found")
+    
+    def watch_folder(self):
+        folder_path = QFileDialog.getExistingDirectory(
+            self,
+            "Select Folder to Watch for New PNG Files"
+        )
+        if folder_path:
+            self.start_watching(folder_path)
+    
+    def start_watching(self, folder_path):
+        """Extract a folder, then keep extracting PNGs that appear in it"""
+        self.stop_watching()
+        # The extraction thread lists the folder once; the same scan seeds the
+        # watcher when it is done (see start_pending_watch)
+        scanner = DirectoryScanner(snapshot=True)
+        self.process_files(scanner.iter_files([folder_path]))
+        self.pending_watch = (folder_path, scanner)
+        self.stop_watching_action.setEnabled(True)
+        self.setWindowTitle(f"ComfyUI Prompt Extractor v3.0 - watching {folder_path}")
+    
+    def start_pending_watch(self):
+        """Start watching a folder once its first scan has finished"""
+        folder_path, scanner = self.pending_watch
+        if not scanner.complete:
+            # Cancelled before the whole folder was listed
+            self.stop_watching()
+            return
+        self.pending_watch = None
+        self.folder_watcher.start(folder_path, scanner.file_states, scanner.folder_mtimes)
+    
+    def stop_watching(self):
+        if not self.folder_watcher.active and self.pending_watch is None:
+            return
+        self.pending_watch = None
+        self.folder_watcher.stop()
+        self.watch_queue = []
+        self.stop_watching_action.setEnabled(False)
+        self.setWindowTitle("ComfyUI Prompt Extractor v3.0")
+    
+    def on_watched_files(self, file_paths):
+        self.watch_queue.extend(file_paths)
+        if self.extraction_thread is None or not self.extraction_thread.isRunning():
+            self.extract_watch_queue()
+    
+    def resume_watch_queue(self):
+        """Extract the watch updates that were held back during a translation"""
+        # The translation thread may still be returning from run()
+        self.translation_thread.wait()
+        if self.extraction_thread is None or not self.extraction_thread.isRunning():
+            self.extract_watch_queue()
+    
+    def extract_watch_queue(self):
+        """Extract only the new or changed files; new ones are appended, changed ones replaced in place"""
+        # New or replaced results would shift the segments a running translation writes to
+        if self.translation_thread is not None and self.translation_thread.isRunning():
+            return
+        file_paths = list(dict.fromkeys(self.watch_queue))
+        self.watch_queue = []
+        if not file_paths:
+            return
+        
+        # Changed files get fresh thumbnails
+        for file_path in file_paths:
+            self.thumbnail_loader.invalidate(file_path)
+        
+        rows = self.thumbnail_grid.grid_model.rows
+        changed = [file_path for file_path in file_paths if file_path in rows]
+        new_files = [file_path for file_path in file_paths if file_path not in rows]
+        first_new = len(self.stream_results)
+        indices = [rows[file_path] for file_path in changed] + list(range(first_new, first_new + len(new_files)))
+        
+        self.current_files = self.current_files + new_files
+        self.document.file_count = len(self.current_files)
+        self.stream_results.extend([None] * len(new_files))
+        self.thumbnail_grid.reload_files(changed)
+        self.thumbnail_grid.append_files(new_files)
+        self.incremental_run = True
+        
+        # Translations start again when the new results are in
+        if HAS_TRANSLATOR:
+            self.translate_cn_btn.setEnabled(False)
+            self.translate_en_btn.setEnabled(False)
+        
+        self.status_bar.showMessage(f"Extracting {len(file_paths)} new or changed files...")
+        mode = self.mode_combo.currentText()
+        engine = ParallelExtractor(workers=self.workers_spin.value() or None, metadata_cache=self.metadata_cache)
+        self.extraction_thread = self.extraction_scheduler.submit(
+            changed + new_files, mode, engine, self.result_cache, indices
+        )
+        self.extraction_thread.finished.connect(self.on_extraction_finished)
+        self.extraction_thread.batch_ready.connect(self.on_extraction_batch)
+        self.extraction_thread.error.connect(self.on_extraction_error)
+        self.extraction_thread.start()
+    
+    def process_files(self, file_paths):
+        """Extract a list of files, or the files of a lazy folder scan as they are found"""
+        scanning = not isinstance(file_paths, list)
+        self.current_files = [] if scanning else file_paths
+        self.incremental_run = False
+        self.thumbnail_grid.set_files(self.current_files)
+        
+        # Update thumbnail
+        if len(self.current_files) == 1:
+            self.update_thumbnail(self.current_files[0])
+        else:
+            self.thumbnail_path = None
+            self.thumbnail_group.hide()
+            self.thumbnail_info_label.setText(f"{len(self.current_files)} PNG files selected")
+        
+        # Reset streamed display and translation layers
+        self.results_view.clear()
+        self.document.file_count = len(self.current_files)
+        self.summary_text.clear()
+        self.reset_grouping()
+        self.summary_has_groups = False
+        self.stream_results = [None] * len(self.current_files)
+        self.stream_next_index = 0
+        self.stream_files_with_prompts = 0
+        self.stream_errors = []
+        
+        if self.record_profile_action.isChecked():
+            self.profile = profiling.start()
+            self.export_profile_action.setEnabled(True)
+            self.performance_text.setPlainText("Recording...")
+        
+        # Start extraction
+        self.status_bar.showMessage("Scanning..." if scanning else "Processing...")
+        self.progress.setRange(0, len(self.current_files))
+        self.progress.setValue(0)
+        self.progress.show()
+        self.cancel_btn.show()
+        self.disable_buttons()
+        
+        mode = self.mode_combo.currentText()
+        engine = ParallelExtractor(workers=self.workers_spin.value() or None, metadata_cache=self.metadata_cache)
+        self.extraction_thread = self.extraction_scheduler.submit(file_paths, mode, engine, self.result_cache)
+        self.extraction_thread.finished.connect(self.on_extraction_finished)
+        self.extraction_thread.files_found.connect(self.on_files_found)
+        self.extraction_thread.batch_ready.connect(self.on_extraction_batch)
+        self.extraction_thread.error.connect(self.on_extraction_error)
+        self.extraction_thread.start()
+    
+    def cancel_current_job(self):
+        if self.extraction_thread is not None and self.extraction_thread.isRunning():
+            self.extraction_thread.cancel()
+            self.status_bar.showMessage("Cancelling...")
+        elif self.translation_thread is not None and self.translation_thread.isRunning():
+            self.translation_thread.cancel()
+            self.status_bar.showMessage("Cancelling translation...")
+    
+    def update_thumbnail(self, image_path):
+        """Show the preview of a single file once its thumbnail is loaded"""
+        self.thumbnail_path = image_path
+        entry = self.thumbnail_loader.request(image_path)
+        if entry is not None:
+            self.show_thumbnail(image_path, *entry)
+    
+    def show_thumbnail(self, image_path, pixmap, original_size):
+        if image_path != self.thumbnail_path:
+            return
+        self.thumbnail_label.setPixmap(pixmap.scaled(
+            240, 240, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        ))
+        self.thumbnail_info_label.setText(f"{original_size[0]}×{original_size[1]}\n{os.path.basename(image_path)}")
+        self.thumbnail_group.show()
+    
+    def on_thumbnail_failed(self, image_path, error_message):
+        if image_path != self.thumbnail_path:
+            return
+        print(f"Error creating thumbnail: {error_message}")
+        self.thumbnail_group.hide()
+    
+    def append_stream_results(self, flush_all=False):
+        """Show the contiguous prefix of streamed results (or everything left)"""
+        total = len(self.stream_results)
+        new_results = []
+        summary_parts = []
+        
+        index = self.stream_next_index
+        position = self.document.store.file_count
+        while index < total:
+            result = self.stream_results[index]
+            if result is None:
+                if not flush_all:
+                    break
+                index += 1
+                continue
+            # The document keeps its own compact copy; release the dict
+            self.stream_results[index] = None
+            
+            if 'error' in result:
+                self.stream_errors.append(result)
+            
+            # Files without prompts are kept too, for the structured export
+            new_results.append((self.current_files[index], result))
+            self.thumbnail_grid.grid_model.link_result(index, position)
+            position += 1
+            prompts = result.get('positive_prompts', [])
+            if prompts:
+                self.stream_files_with_prompts += 1
+                
+                filename = result.get('file_info', {}).get('filename', 'Unknown')
+                method = result.get('extraction_method', 'unknown')
+                summary_parts.append(f"• {filename} ({len(prompts)} prompts) [{method}]\n")
+            index += 1
+        self.stream_next_index = index
+        
+        if new_results:
+            self.results_view.model.add_results(new_results)
+            self.regroup()
+            if not self.results_view.prompt_view.currentIndex().isValid():
+                self.results_view.prompt_view.setCurrentIndex(self.results_view.model.index(0))
+        if summary_parts:
+            self.append_text(self.summary_text, "".join(summary_parts))
+    
+    def replace_stream_result(self, index, result):
+        """Show the new result of a file that was already shown, in place of the old one"""
+        file_path = self.current_files[index]
+        grid_model = self.thumbnail_grid.grid_model
+        store = self.document.store
+        position = grid_model.positions[index]
+        prompts = result.get('positive_prompts', [])
+        if position < 0:
+            # Skipped when its batch was cancelled; added at the end instead
+            grid_model.link_result(index, store.file_count)
+            self.results_view.model.add_results([(file_path, result)])
+            if prompts:
+                self.stream_files_with_prompts += 1
+            self.regroup()
+        else:
+            self.stream_files_with_prompts += bool(prompts) - bool(store.file_prompt_count[position])
+            self.results_view.model.replace_result(position, file_path, result)
+            # Later segments may have moved, so the grouping is refreshed too
+            self.regroup(resync=True)
+        
+        if not self.results_view.prompt_view.currentIndex().isValid():
+            self.results_view.prompt_view.setCurrentIndex(self.results_view.model.index(0))
+        if file_path == self.thumbnail_path:
+            self.update_thumbnail(file_path)
+    
+    def show_prompt(self, segment):
+        """Select a prompt in the results list and switch to it"""
+        self.results_view.select_segment(segment)
+        self.tabs.setCurrentWidget(self.results_view)
+    
+    def show_search_hit(self, file_path, text):
+        """Select a search match if its file is in the current batch, otherwise load the file"""
+        grid_model = self.thumbnail_grid.grid_model
+        row = grid_model.rows.get(file_path)
+        segment = grid_model.first_segment(row) if row is not None else -1
+        if segment < 0:
+            # Loading the file replaces the batch, which ends a watch
+            watched_folder = self.folder_watcher.root or (self.pending_watch and self.pending_watch[0])
+            if watched_folder:
+                answer = QMessageBox.question(
+                    self, "Open Search Match",
+                    f"{os.path.basename(file_path)} is not among the watched results.\n"
+                    f"Opening it stops watching {watched_folder}. Open it anyway?"
+                )
+                if answer != QMessageBox.StandardButton.Yes:
+                    return
+            self.load_files([file_path])
+            return
+        
+        store = self.document.store
+        for prompt in store.prompt_range(store.prompt_file[segment]):
+            if store.texts[store.prompt_text[prompt]] == text:
+                segment = prompt
+                break
+        self.show_prompt(segment)
+    
+    def append_text(self, text_edit, text):
+        cursor = text_edit.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+    
+    def on_files_found(self, generation, file_paths):
+        """Add files found by a running folder scan to the batch"""
+        if not self.extraction_scheduler.is_current(generation):
+            return
+        self.current_files.extend(file_paths)
+        self.stream_results.extend([None] * len(file_paths))
+        self.thumbnail_grid.append_files(file_paths)
+        self.document.file_count = len(self.current_files)
+        self.progress.setMaximum(len(self.current_files))
+    
+    def on_extraction_batch(self, generation, batch, done, total):
+        if not self.extraction_scheduler.is_current(generation):
+            return
+        
+        for index, result in batch:
+            if index < self.stream_next_index:
+                # A file shown earlier that changed in a watched folder
+                self.replace_stream_result(index, result)
+            else:
+                self.stream_results[index] = result
+        with profiling.timer('show results'):
+            self.append_stream_results()
+        
+        if self.incremental_run:
+            return
+        self.progress.setValue(done)
+        self.status_bar.showMessage(
+            f"Processing... {done}/{total} files, {len(self.all_prompt_texts)} prompts so far"
+        )
+    
+    def on_extraction_finished(self, generation, processed, file_paths):
+        if not self.extraction_scheduler.is_current(generation):
+            return
+        
+        if self.incremental_run:
+            self.on_incremental_extraction_finished(processed)
+            return
+        
+        self.progress.hide()
+        self.cancel_btn.hide()
+        self.enable_buttons()
+        
+        cancelled = self.extraction_thread is not None and self.extraction_thread.cancelled
+        
+        # Render anything still buffered out of order
+        with profiling.timer('show results'):
+            self.append_stream_results(flush_all=True)
+        if self.profile is not None and self.profile is profiling.active():
+            self.profile.finish()
+            self.show_profile()
+        
+        if self.pending_watch is not None:
+            self.start_pending_watch()
+        
+        # Watch mode appends to the batch by index, so a cancelled batch keeps
+        # the files it did not get to instead of shrinking under the grid
+        if not self.folder_watcher.active:
+            self.current_files = file_paths
+        
+        if not file_paths and self.folder_watcher.active:
+            self.status_bar.showMessage(f"Watching {self.folder_watcher.root} for new PNG files")
+            return
+        if not file_paths and not cancelled:
+            self.status_bar.showMessage("✗ No PNG files found")
+            QMessageBox.warning(self, "Warning", "No valid PNG files found")
+            return
+        
+        total_prompts = len(self.all_prompt_texts)
+        files_with_prompts = self.stream_files_with_prompts
+        
+        # Build summary header above the streamed file list
+        summary_text = ""
+        summary_text += "EXTRACTION SUMMARY\n"
+        summary_text += "=" * 50 + "\n\n"
+        summary_text += f"Extractor mode: {self.mode_combo.currentText()}\n"
+        summary_text += f"Files processed: {processed}\n"
+        if cancelled:
+            summary_text += "Extraction cancelled before all files were processed\n"
+        summary_text += f"Files with prompts: {files_with_prompts}\n"
+        if self.stream_errors:
+            summary_text += f"Files with errors: {len(self.stream_errors)}\n"
+        summary_text += f"Total positive prompts found: {total_prompts}\n\n"
+        
+        if files_with_prompts == 0:
+            msg = "No positive prompts found in any files.\n"
+            if self.mode_combo.currentText() == "ComfyUI":
+                msg += "Make sure the PNG files contain ComfyUI workflow/prompt metadata, or switch to 'Parameters' mode (Ctrl+E)."
+            elif self.mode_combo.currentText() == "Auto":
+                msg += "The PNG files contain neither ComfyUI workflow/prompt nor 'parameters' metadata."
+            else:
+                msg += "Make sure the PNG files contain 'parameters' metadata or switch to 'ComfyUI' mode (Ctrl+E)."
+            summary_text += msg
+        else:
+            summary_text += "FILES WITH PROMPTS:\n"
+            summary_text += "-" * 30 + "\n"
+        
+        cursor = self.summary_text.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.Start)
+        cursor.insertText(summary_text)
+        
+        if self.stream_errors:
+            error_text = "\nFILES WITH ERRORS:\n"
+            error_text += "-" * 30 + "\n"
+            for result in self.stream_errors:
+                filename = result.get('file_info', {}).get('filename', 'Unknown')
+                error = result['error']
+                error_text += f"• {filename}: {error['type']}: {error['message']}\n"
+            self.append_text(self.summary_text, error_text)
+        
+        grouped = self.group_check.isChecked() and total_prompts > 0
+        # Groups still being computed are added to the summary when they are ready
+        groups = self.groups if grouped else None
+        if groups is not None:
+            self.show_group_summary(groups)
+        
+        error_suffix = f" ({len(self.stream_errors)} errors)" if self.stream_errors else ""
+        
+        if total_prompts > 0:
+            status_msg = f"✓ Extracted {total_prompts} positive prompts from {files_with_prompts} files"
+            if groups is not None:
+                status_msg += f" in {len(groups)} groups"
+            elif grouped:
+                status_msg += ", grouping..."
+            if cancelled:
+                status_msg += " (cancelled)"
+            self.status_bar.showMessage(status_msg + error_suffix)
+            self.copy_all_btn.setEnabled(True)
+            self.copy_first_btn.setEnabled(True)
+            self.save_btn.setEnabled(True)
+            
+            if HAS_TRANSLATOR:
+                self.translate_cn_btn.setEnabled(True)
+                self.translate_en_btn.setEnabled(True)
+        elif cancelled:
+            self.status_bar.showMessage("✗ Extraction cancelled")
+        else:
+            self.status_bar.showMessage("✗ No positive prompts found" + error_suffix)
+        
+        # Files that appeared in a watched folder during the initial extraction
+        self.extract_watch_queue()
+    
+    def on_incremental_extraction_finished(self, processed):
+        with profiling.timer('show results'):
+            self.append_stream_results(flush_all=True)
+        
+        if self.all_prompt_texts:
+            self.copy_all_btn.setEnabled(True)
+            self.copy_first_btn.setEnabled(True)
+            self.save_btn.setEnabled(True)
+            if HAS_TRANSLATOR:
+                self.translate_cn_btn.setEnabled(True)
+                self.translate_en_btn.setEnabled(True)
+        
+        self.status_bar.showMessage(
+            f"✓ Added {processed} new files - {len(self.all_prompt_texts)} prompts from "
+            f"{self.stream_files_with_prompts} files, watching for more"
+        )
+        self.extract_watch_queue()
+    
+    def on_extraction_error(self, generation, error_message):
+        if not self.extraction_scheduler.is_current(generation):
+            return
+        
+        self.progress.hide()
+        self.cancel_btn.hide()
+        self.enable_buttons()
+        if self.pending_watch is not None:
+            self.stop_watching()
+        
+        self.status_bar.showMessage(f"✗ Error: {error_message}")
+        QMessageBox.critical(self, "Error", f"Failed to process file(s):\n{error_message}")
+    
+    def translation_backend(self):
+        """Return (backend, cache) for the selected translator engine"""
+        engine = self.translator_combo.currentText()
+        backend = create_backend(engine, MOCK_TRANSLATOR_SPEC or "")
+        # Mock output is synthetic and must not end up in the persistent cache
+        cache = None if engine == MockBackend.name else self.translation_cache
+        return backend, cache
+    
+    def translate_to_chinese(self):
+        self.start_translation("en", "zh", "EN→CN", "Translating to Chinese...")
+    
+    def translate_to_english(self):
+        self.start_translation("zh", "en", "CN→EN", "Translating to English...")
+    
+    def start_translation(self, from_lang, to_lang, direction, status):
+        if not HAS_TRANSLATOR or not self.all_prompt_texts:
+            return
+        
+        grouped = self.group_check.isChecked()
+        document = self.document
+        source = document.layer_source(direction)
+        
+        targets = None
+        extends_layer = (source is not None and document.has_layer(source)
+                         and document.active in (source, direction)
+                         and (grouped or direction not in self.grouped_translations))
+        if extends_layer:
+            # A translation of the texts on screen is reused; only the segments
+            # added or replaced by watch updates since then are translated
+            missing = document.missing_segments(direction)
+            if not missing:
+                document.activate(direction)
+                self.results_view.model.segments_changed()
+                self.status_bar.showMessage(f"✓ Showing translated prompts ({direction})")
+                self.restore_btn.setEnabled(True)
+                return
+            source_layer = document.layer_texts(source)
+            missing_by_text = {}
+            for segment in missing:
+                missing_by_text.setdefault(source_layer[segment], []).append(segment)
+            source_texts = list(missing_by_text)
+            targets = list(missing_by_text.values())
+            document.activate(direction)
+        elif grouped:
+            # Translate one text per group; segments with the same text share its translation
+            texts = self.all_prompt_texts
+            groups = self.prompt_groups()
+            source_texts = [texts[group.representative] for group in groups]
+            targets = [[segment for segment in group.segments if texts[segment] == text]
+                       for group, text in zip(groups, source_texts)]
+            self.grouped_translations.add(direction)
+        else:
+            source_texts = list(self.all_prompt_texts)
+            self.grouped_translations.discard(direction)
+        if not extends_layer:
+            document.begin_layer(direction)
+        self.results_view.model.segments_changed()
+        
+        self.status_bar.showMessage(status)
+        self.progress.setRange(0, 0)
+        self.progress.show()
+        self.cancel_btn.show()
+        self.disable_buttons()
+        
+        self.translation_thread = TranslationThread(
+            source_texts, from_lang, to_lang, direction, *self.translation_backend(), targets=targets,
+            extends_layer=extends_layer
+        )
+        self.translation_thread.partial.connect(self.on_translation_partial)
+        self.translation_thread.finished.connect(self.on_translation_finished)
+        self.translation_thread.cancelled.connect(self.on_translation_cancelled)
+        self.translation_thread.error.connect(self.on_translation_error)
+        self.translation_thread.start()
+    
+    def apply_translation(self, direction, updates, targets=None):
+        """Replace the text of translated segments and refresh only those rows"""
+        if not self.document.has_layer(direction):
+            return
+        if targets is not None:
+            updates = {segment: text for index, text in updates.items() for segment in targets[index]}
+        changed = self.document.update_layer(direction, updates)
+        if changed and self.document.active == direction:
+            self.results_view.model.segments_changed(*changed)
+    
+    def on_translation_partial(self, updates):
+        if self.sender() is self.translation_thread:
+            self.apply_translation(self.translation_thread.direction, updates, self.translation_thread.targets)
+    
+    def on_translation_finished(self, translated_prompts, direction, stats):
+        self.progress.hide()
+        self.cancel_btn.hide()
+        self.enable_buttons()
+        
+        targets = self.translation_thread.targets
+        self.apply_translation(direction, dict(enumerate(translated_prompts)), targets)
+        # Grouped translations leave the variants of a group as they are on purpose
+        self.document.complete_layer(direction)
+        if self.translation_thread.extends_layer:
+            noun = "new prompts"
+        elif targets is not None:
+            noun = "prompt groups"
+        else:
+            noun = "prompts"
+        self.status_bar.showMessage(
+            f"✓ Translated {len(translated_prompts)} {noun} ({direction}) - "
+            f"{stats['distinct']} distinct, {stats['cached']} cached, {stats['requests']} requests"
+        )
+        
+        if HAS_TRANSLATOR:
+            self.restore_btn.setEnabled(True)
+        self.resume_watch_queue()
+    
+    def discard_translation(self):
+        """Drop the layer of an unfinished translation and show its source again.
+        
+        A layer that was only being extended keeps what was translated; its
+        remaining segments stay missing for the next translation.
+        """
+        if not self.translation_thread.extends_layer:
+            self.document.drop_layer(self.translation_thread.direction)
+            self.grouped_translations.discard(self.translation_thread.direction)
+            self.results_view.model.segments_changed()
+    
+    def on_translation_cancelled(self):
+        self.progress.hide()
+        self.cancel_btn.hide()
+        self.enable_buttons()
+        self.discard_translation()
+        
+        self.copy_all_btn.setEnabled(True)
+        self.copy_first_btn.setEnabled(True)
+        self.save_btn.setEnabled(True)
+        self.translate_cn_btn.setEnabled(True)
+        self.translate_en_btn.setEnabled(True)
+        self.restore_btn.setEnabled(self.is_translated)
+        
+        self.status_bar.showMessage("✗ Translation cancelled")
+        self.resume_watch_queue()
+    
+    def on_translation_error(self, error_message):
+        self.progress.hide()
+        self.cancel_btn.hide()
+        self.enable_buttons()
+        self.discard_translation()
+        
+        self.resume_watch_queue()
+        
+        self.status_bar.showMessage(f"✗ Translation error: {error_message}")
+        QMessageBox.critical(self, "Translation Error", f"Failed to translate prompts:\n{error_message}")
+    
+    def restore_original(self):
+        if not self.is_translated:
+            return
+        
+        self.document.activate(ORIGINAL)
+        self.results_view.model.segments_changed()
+        self.status_bar.showMessage("✓ Original prompts restored")
+        
+        if HAS_TRANSLATOR:
+            self.restore_btn.setEnabled(False)
+    
+    def copy_to_clipboard(self):
+        if self.all_prompt_texts:
+            try:
+                import pyperclip
+                
+                texts = self.all_prompt_texts
+                if self.group_check.isChecked():
+                    texts = [texts[group.representative] for group in self.prompt_groups()]
+                all_text = '\n\n'.join(texts)
+                pyperclip.copy(all_text)
+                
+                if len(texts) < len(self.all_prompt_texts):
+                    status_msg = (f"✓ {len(texts)} distinct prompts copied to clipboard "
+                                  f"({len(self.all_prompt_texts)} before grouping)!")
+                else:
+                    status_msg = f"✓ All {len(texts)} prompts copied to clipboard!"
+                if self.is_translated and self.current_translation_direction:
+                    status_msg += f" [{self.current_translation_direction}]"
+                
+                self.status_bar.showMessage(status_msg)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to copy to clipboard:\n{e}")
+    
+    def copy_first_prompt(self):
+        if self.all_prompt_texts:
+            try:
+                import pyperclip
+                
+                pyperclip.copy(self.all_prompt_texts[0])
+                
+                status_msg = "✓ First prompt copied to clipboard!"
+                if self.is_translated and self.current_translation_direction:
+                    status_msg += f" [{self.current_translation_direction}]"
+                
+                self.status_bar.showMessage(status_msg)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to copy to clipboard:\n{e}")
+    
+    def save_to_file(self):
+        if not self.all_prompt_texts:
+            return
+        
+        # Determine default filename
+        if len(self.current_files) == 1:
+            base_name = os.path.splitext(os.path.basename(self.current_files[0]))[0]
+            default_name = f"{base_name}_prompts.txt"
+        else:
+            default_name = "extracted_prompts.txt"
+        
+        if self.is_translated and self.current_translation_direction:
+            name_parts = os.path.splitext(default_name)
+            default_name = f"{name_parts[0]}_{self.current_translation_direction.replace('→', '_to_')}{name_parts[1]}"
+        
+        filters = [name for name, export_format in SAVE_FILTERS.items() if export_format != 'parquet' or HAS_PYARROW]
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Save Prompts to File",
+            default_name,
+            ";;".join(filters)
+        )
+        
+        if file_path:
+            export_format = format_for_path(file_path)
+            if export_format is None:
+                export_format = SAVE_FILTERS.get(selected_filter, 'txt')
+                if export_format != 'txt':
+                    file_path += f".{export_format}"
+            if export_format == 'parquet' and not HAS_PYARROW:
+                QMessageBox.warning(self, "Warning", "Parquet export requires pyarrow:\npip install pyarrow")
+                return
+            
+            try:
+                if export_format != 'txt':
+                    self.export_results(file_path, export_format)
+                else:
+                    self.write_report(file_path)
+                
+                status_msg = f"✓ Saved to {os.path.basename(file_path)}"
+                if self.is_translated and self.current_translation_direction:
+                    status_msg += f" [{self.current_translation_direction}]"
+                
+                self.status_bar.showMessage(status_msg)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to save file:\n{e}")
+    
+    def export_results(self, file_path, export_format):
+        """Stream the batch to a JSON Lines, CSV or Parquet file, one record per file as in cli.py"""
+        with open_output(file_path, export_format) as out:
+            writer = WRITERS[export_format](out, translated=self.is_translated)
+            for record in self.document.iter_records():
+                writer.write(record)
+            writer.close()
+    
+    def write_report(self, file_path):
+        """Write the human-readable TXT report"""
+        groups = self.prompt_groups() if self.group_check.isChecked() else None
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write("=" * 60 + "\n")
+            f.write("COMFYUI POSITIVE PROMPTS EXTRACTION\n")
+            f.write("=" * 60 + "\n\n")
+            
+            f.write(f"Extractor mode: {self.mode_combo.currentText()}\n")
+            f.write(f"Files processed: {len(self.current_files)}\n")
+            f.write(f"Total prompts: {len(self.all_prompt_texts)}\n")
+            if groups is not None:
+                f.write(f"Prompt groups: {len(groups)}\n")
+            
+            if self.is_translated and self.current_translation_direction:
+                f.write(f"Translation: {self.current_translation_direction}\n")
+            
+            f.write(f"Extraction date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write("\n" + "=" * 60 + "\n\n")
+            
+            if groups is not None:
+                blocks = self.document.iter_grouped_report_blocks(groups)
+            else:
+                blocks = self.document.iter_report_blocks()
+            for block in blocks:
+                f.write(block)
+    
+    def clear_results(self):
+        self.stop_watching()
+        self.extraction_scheduler.invalidate()
+        self.progress.hide()
+        self.cancel_btn.hide()
+        self.enable_buttons()
+        
+        self.results_view.clear()
+        self.thumbnail_grid.clear()
+        self.summary_text.clear()
+        self.reset_grouping()
+        self.summary_has_groups = False
+        self.status_bar.showMessage("Ready")
+        self.current_files = []
+        self.thumbnail_path = None
+        self.thumbnail_group.hide()
+        
+        self.copy_all_btn.setEnabled(False)
+        self.copy_first_btn.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        
+        if HAS_TRANSLATOR:
+            self.translate_cn_btn.setEnabled(False)
+            self.translate_en_btn.setEnabled(False)
+            self.restore_btn.setEnabled(False)
+    
+    def disable_buttons(self):
+        self.browse_file_btn.setEnabled(False)
+        self.browse_folder_btn.setEnabled(False)
+        self.copy_all_btn.setEnabled(False)
+        self.copy_first_btn.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        
+        if HAS_TRANSLATOR:
+            self.translate_cn_btn.setEnabled(False)
+            self.translate_en_btn.setEnabled(False)
+            self.restore_btn.setEnabled(False)
+    
+    def enable_buttons(self):
+        self.browse_file_btn.setEnabled(True)
+        self.browse_folder_btn.setEnabled(True)
+    
+    def closeEvent(self, event):
+        self.extraction_scheduler.shutdown()
+        for thread in [self.grouping_thread] + self.retired_grouping_threads:
+            if thread is not None:
+                thread.wait()
+        self.thumbnail_loader.shutdown()
+        if self.search_indexer is not None:
+            # Let queued results reach the index
+            self.search_indexer.close(timeout=10)
+        super().closeEvent(event)
+    
+    def show_about(self):
+        about_text = """ComfyUI Prompt Extractor
+Version 3.0
+
+A tool to extract positive prompts from ComfyUI-generated PNG files.
+
+Features:
+• Extraction modes: ComfyUI, Parameters and single-pass Auto
+• Batch processing support
+• Drag & drop interface
+• Image thumbnails
+• Translation support (EN ↔ CN)
+• Export to text file
+• Grouping of duplicate and near-duplicate prompts
+• Full-text search across every extracted library
+• Optional per-stage performance recording
+
+Keyboard Shortcuts:
+• Ctrl+O: Open file(s)
+• Ctrl+E: Cycle extraction mode
+• Ctrl+C: Copy all prompts
+• Ctrl+S: Save to file
+• Ctrl+L: Clear results
+
+Created with Python & PyQt6
+"""
+        QMessageBox.about(self, "About", about_text)
+
+
+def main():
+    """Main entry point"""
+    if not HAS_TRANSLATOR:
+        print("Warning: 'translators' library not found. Translation features will be disabled.")
+        print("Install with: pip install translators")
+    
+    app = QApplication(sys.argv)
+    app.setApplicationName("ComfyUI Prompt Extractor")
+    app.setOrganizationName("mamorett")
+    app.setOrganizationDomain("github.com/mamorett")
+    
+    # Set desktop file name for proper taskbar grouping and icon
+    app.setDesktopFileName("comfyui-prompt-extractor.desktop")
+    
+    # Set app icon
+    icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icon.png")
+    if os.path.exists(icon_path):
+        app.setWindowIcon(QIcon(icon_path))
+    
+    window = ComfyUIPromptExtractorUI()
+    window.show()
+    
+    sys.exit(app.exec())
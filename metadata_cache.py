@@ -0,0 +1,83 @@
+"""
+In-memory PNG metadata cache.
+
+Keeps the size, image mode and the prompts every extraction method finds
+in each file for the session (see PromptExtractor.parse_metadata), so
+re-running extraction, in any mode, neither reopens nor re-parses the
+file. Only the parsed prompts are kept, not the text chunks they came
+from, which for ComfyUI files hold the whole workflow JSON. Entries are
+tied to the file identity (path, size, mtime_ns), so a changed file is
+read again, and the least recently used entries are evicted once the
+cached text passes a byte budget.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from result_cache import FileKey
+
+# (image size, image mode, text metadata) as returned by PromptExtractor.read_metadata()
+FileMetadata = Tuple[Tuple[int, int], str, Dict[str, Any]]
+# (image size, image mode, {method: prompts}) as returned by PromptExtractor.parse_metadata()
+ParsedMetadata = Tuple[Tuple[int, int], str, Dict[str, List[Dict[str, Any]]]]
+
+DEFAULT_METADATA_CACHE_BYTES = 256 * 1024 * 1024
+
+# Rough per-entry and per-value overhead of the Python objects, in bytes
+ENTRY_OVERHEAD = 512
+VALUE_OVERHEAD = 64
+
+
+def metadata_size(parsed: ParsedMetadata) -> int:
+    """Approximate memory used by a cached entry"""
+    nbytes = ENTRY_OVERHEAD
+    for prompts in parsed[2].values():
+        for prompt_info in prompts:
+            for value in prompt_info.values():
+                nbytes += VALUE_OVERHEAD
+                if isinstance(value, str):
+                    nbytes += len(value)
+    return nbytes
+
+
+class MetadataCache:
+    """Thread-safe LRU of parsed file metadata, bounded by approximate size in bytes"""
+
+    def __init__(self, max_bytes: int = DEFAULT_METADATA_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._lock = threading.Lock()
+        # path -> (file key, metadata, size)
+        self._entries: "OrderedDict[str, Tuple[FileKey, ParsedMetadata, int]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: FileKey) -> Optional[ParsedMetadata]:
+        """Return the parsed metadata of an unchanged file, or None"""
+        with self._lock:
+            entry = self._entries.get(key[0])
+            if entry is None or entry[0] != key:
+                return None
+            self._entries.move_to_end(key[0])
+            return entry[1]
+
+    def put(self, key: FileKey, parsed: ParsedMetadata):
+        nbytes = metadata_size(parsed)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key[0], None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[key[0]] = (key, parsed, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
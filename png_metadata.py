@@ -0,0 +1,150 @@
+"""
+Lightweight PNG metadata reader.
+
+Walks the PNG chunk stream directly and stops at the first IDAT chunk, so
+reading the text metadata of a file costs a few small reads instead of a
+full PIL Image.open.
+"""
+
+import struct
+import zlib
+from typing import Dict, Any, Optional, Tuple
+
+import profiling
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Refuse to inflate compressed text chunks beyond this size (same order of
+# magnitude as PIL's MAX_TEXT_MEMORY) to guard against decompression bombs.
+MAX_TEXT_MEMORY = 64 * 1024 * 1024
+
+# (bit depth, color type) -> PIL mode, mirroring PngImagePlugin
+_MODES = {
+    (1, 0): '1',
+    (2, 0): 'L',
+    (4, 0): 'L',
+    (8, 0): 'L',
+    (16, 0): 'I;16',
+    (8, 2): 'RGB',
+    (16, 2): 'RGB',
+    (1, 3): 'P',
+    (2, 3): 'P',
+    (4, 3): 'P',
+    (8, 3): 'P',
+    (8, 4): 'LA',
+    (16, 4): 'RGBA',
+    (8, 6): 'RGBA',
+    (16, 6): 'RGBA',
+}
+
+_TEXT_CHUNKS = (b'tEXt', b'zTXt', b'iTXt')
+
+
+class PNGFormatError(ValueError):
+    """Raised when a file is not a well-formed PNG chunk stream"""
+
+
+class PNGMetadata:
+    """Result of a metadata-only PNG read"""
+    __slots__ = ('size', 'mode', 'info')
+
+    def __init__(self, size: Tuple[int, int], mode: str, info: Dict[str, Any]):
+        self.size = size
+        self.mode = mode
+        self.info = info
+
+
+def _inflate(data: bytes, budget: int) -> bytes:
+    decompressor = zlib.decompressobj()
+    out = decompressor.decompress(data, budget + 1)
+    if len(out) > budget or decompressor.unconsumed_tail:
+        raise PNGFormatError("Compressed text chunk exceeds size limit")
+    return out
+
+
+def _decode_text_chunk(cid: bytes, data: bytes, budget: int) -> Optional[Tuple[str, str]]:
+    """Decode a tEXt/zTXt/iTXt chunk into (key, value) like PIL's img.info"""
+    try:
+        key, rest = data.split(b'\0', 1)
+    except ValueError:
+        return None
+    key = key.decode('latin-1')
+
+    if cid == b'tEXt':
+        return key, rest.decode('latin-1', 'replace')
+
+    if cid == b'zTXt':
+        if not rest or rest[0] != 0:
+            return None
+        return key, _inflate(rest[1:], budget).decode('latin-1', 'replace')
+
+    # iTXt: compression flag, method, language\0, translated keyword\0, text
+    if len(rest) < 2:
+        return None
+    compressed, method = rest[0], rest[1]
+    try:
+        _lang, _tkey, text = rest[2:].split(b'\0', 2)
+    except ValueError:
+        return None
+    if compressed:
+        if method != 0:
+            return None
+        text = _inflate(text, budget)
+    return key, text.decode('utf-8', 'replace')
+
+
+def read_png_metadata(file_path: str) -> PNGMetadata:
+    """Read IHDR and text chunks of a PNG, stopping before the first IDAT"""
+    info: Dict[str, Any] = {}
+    size = None
+    mode = None
+    budget = MAX_TEXT_MEMORY
+    bytes_read = len(PNG_SIGNATURE)
+
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise PNGFormatError("File is not a PNG")
+
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise PNGFormatError("Truncated PNG chunk stream")
+            length, cid = struct.unpack('>I4s', header)
+            bytes_read += 8
+
+            if cid == b'IDAT' or cid == b'IEND':
+                break
+
+            if cid == b'IHDR' or cid in _TEXT_CHUNKS:
+                data = f.read(length)
+                crc = f.read(4)
+                bytes_read += length + 4
+                if len(data) < length or len(crc) < 4:
+                    raise PNGFormatError("Truncated PNG chunk stream")
+                if zlib.crc32(data, zlib.crc32(cid)) != struct.unpack('>I', crc)[0]:
+                    raise PNGFormatError(f"Bad CRC in {cid.decode('latin-1')} chunk")
+
+                if cid == b'IHDR':
+                    if length < 13:
+                        raise PNGFormatError("Invalid IHDR chunk")
+                    width, height, depth, color_type = struct.unpack('>IIBB', data[:10])
+                    size = (width, height)
+                    mode = _MODES.get((depth, color_type))
+                    if mode is None:
+                        raise PNGFormatError(f"Unsupported PNG mode ({depth}, {color_type})")
+                else:
+                    decoded = _decode_text_chunk(cid, data, budget)
+                    if decoded:
+                        key, value = decoded
+                        budget -= len(value)
+                        if budget < 0:
+                            raise PNGFormatError("PNG text metadata exceeds size limit")
+                        info[key] = value
+            else:
+                f.seek(length + 4, 1)
+
+    if size is None:
+        raise PNGFormatError("PNG has no IHDR chunk")
+
+    profiling.count('bytes read', bytes_read)
+    return PNGMetadata(size, mode, info)
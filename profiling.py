@@ -0,0 +1,171 @@
+"""
+Opt-in performance instrumentation.
+
+While a Profile is active, instrumented code adds the time it spends in
+each stage (folder scan, metadata read, JSON parsing, ...) and counters
+such as files, bytes read and cache hits. Nothing is recorded by default:
+timer() then returns a shared no-op context manager and count() returns
+after testing one global. Worker processes record into a Profile of their
+own and send it back with their results (see extractor._extract_chunk).
+
+This module must not import PyQt6.
+"""
+
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+# Stages in pipeline order; stages not listed follow by name
+STAGE_ORDER = (
+    'scan', 'cache lookup', 'read metadata', 'parse JSON', 'find prompts', 'cache write',
+    'write output', 'show results', 'group prompts', 'search index', 'thumbnails',
+)
+
+
+class Profile:
+    """Stage timers and counters of one run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Seconds from start to finish(), or None while the run is going on
+        self.wall: Optional[float] = None
+        # stage -> [seconds, calls]
+        self.timers: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float, calls: int = 1):
+        with self._lock:
+            timer = self.timers.get(stage)
+            if timer is None:
+                self.timers[stage] = [seconds, calls]
+            else:
+                timer[0] += seconds
+                timer[1] += calls
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, data: Dict[str, Any]):
+        """Add the stages and counters of another profile's as_dict()"""
+        for stage, timer in data['stages'].items():
+            self.add_time(stage, timer['seconds'], timer['calls'])
+        for name, amount in data['counters'].items():
+            self.count(name, amount)
+
+    def finish(self):
+        """Fix the wall time of the run; stages may still be added afterwards"""
+        if self.wall is None:
+            self.wall = time.perf_counter() - self.started
+
+    def elapsed(self) -> float:
+        return self.wall if self.wall is not None else time.perf_counter() - self.started
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = sorted(self.timers.items(),
+                            key=lambda item: (STAGE_ORDER.index(item[0]) if item[0] in STAGE_ORDER
+                                              else len(STAGE_ORDER), item[0]))
+            return {
+                'wall_seconds': self.elapsed(),
+                'stages': {stage: {'seconds': seconds, 'calls': int(calls)} for stage, (seconds, calls) in stages},
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def report(self) -> str:
+        """Plain text breakdown of the stages and counters"""
+        data = self.as_dict()
+        lines = [f"Wall time: {data['wall_seconds']:.3f} s", ""]
+        if data['stages']:
+            lines.append(f"{'Stage':16} {'Time (s)':>10} {'Calls':>9} {'ms/call':>9}")
+            for stage, timer in data['stages'].items():
+                per_call = timer['seconds'] / timer['calls'] * 1000 if timer['calls'] else 0.0
+                lines.append(f"{stage:16} {timer['seconds']:10.3f} {timer['calls']:9} {per_call:9.3f}")
+            lines.append("")
+            lines.append("Stage times are summed over threads and worker processes, so they can exceed the wall time.")
+        else:
+            lines.append("No stages recorded")
+        if data['counters']:
+            lines.append("")
+            width = max(len(name) for name in data['counters'])
+            for name, amount in data['counters'].items():
+                lines.append(f"{name:{width}} {amount:>14,}")
+        return "\n".join(lines)
+
+    def write_json(self, file_path: str):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write("\n")
+
+
+class _Timer:
+    __slots__ = ('profile', 'stage', 'start')
+
+    def __init__(self, profile: Profile, stage: str):
+        self.profile = profile
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.add_time(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+# Profile being recorded in this process, if any
+_active: Optional[Profile] = None
+
+
+def start() -> Profile:
+    """Start recording into a new Profile"""
+    global _active
+    _active = Profile()
+    return _active
+
+
+def stop() -> Optional[Profile]:
+    """Stop recording and return the finished Profile, if one was active"""
+    global _active
+    profile, _active = _active, None
+    if profile is not None:
+        profile.finish()
+    return profile
+
+
+def active() -> Optional[Profile]:
+    return _active
+
+
+def timer(stage: str):
+    """Context manager adding the time of its block to a stage"""
+    profile = _active
+    return NULL_TIMER if profile is None else _Timer(profile, stage)
+
+
+def count(name: str, amount: int = 1):
+    profile = _active
+    if profile is not None:
+        profile.count(name, amount)
+
+
+def merge(data: Optional[Dict[str, Any]]):
+    """Add a profile recorded elsewhere (e.g. in a worker process) to the active one"""
+    profile = _active
+    if profile is not None and data is not None:
+        profile.merge(data)
@@ -0,0 +1,217 @@
+"""
+Near-duplicate prompt grouping.
+
+Seed sweeps render the same prompt many times, often with small edits in
+between. PromptGrouper collapses them: identical texts share an id in the
+ResultStore text pool, and near-identical ones are found with one
+permutation MinHash signatures over the words and word pairs of each
+prompt. The signatures are bucketed by locality sensitive hashing, and a
+new text is only compared with the first text of each bucket it lands in,
+so grouping is linear in the number of distinct prompts and can be brought
+up to date as results stream in. A PromptGrouper may run in a worker
+thread on a PromptSnapshot of the store while the store keeps growing.
+"""
+
+import re
+import zlib
+import struct
+import hashlib
+from array import array
+from itertools import repeat
+from operator import eq
+from typing import Dict, List, NamedTuple, Union
+
+from result_store import InternPool, ResultStore
+from search_index import spaced_cjk
+
+# Estimated fraction of shingles two prompts must share to be grouped
+DEFAULT_SIMILARITY = 0.8
+
+# Signature bins; each shingle hash goes to the bin of its low bits, which keeps its minimum
+SIGNATURE_SIZE = 64
+BIN_MASK = SIGNATURE_SIZE - 1
+# Marks a bin no shingle fell into (short prompts); shingle hashes are never negative
+EMPTY = -1
+# Signature bins per LSH band. Prompts that agree on a whole band are
+# compared; at 0.8 similarity two prompts share one of the 16 bands with
+# a probability above 99.9%.
+BAND_SIZE = 4
+BAND_STRUCT = struct.Struct(f'>{BAND_SIZE}q')
+
+# Words, ignoring case, punctuation, underscores and digits, so a changed
+# weight such as (word:1.2) -> (word:1.3) does not make a prompt different
+WORD_RE = re.compile(r'[^\W\d_]+')
+# The same for ASCII text, as a bytes.translate() table that lower-cases
+# letters and turns everything else into spaces; much faster than the regex
+ASCII_WORDS = bytes(c | 0x20 if chr(c).isalpha() else 0x20 for c in range(128)) + b' ' * 128
+
+
+class PromptGroup(NamedTuple):
+    # Segments (prompt numbers in the store) of the group, in order
+    segments: List[int]
+    # Segment whose text stands for the group: the most frequent text, earliest first
+    representative: int
+    # Number of distinct texts in the group
+    variants: int
+
+
+class PromptSnapshot(NamedTuple):
+    """The prompt texts of a ResultStore at one moment.
+
+    The text pool is shared, not copied: it only ever grows, so the ids in
+    the copied text column stay valid while the store changes.
+    """
+    texts: InternPool
+    prompt_text: array
+
+    @classmethod
+    def of(cls, store: ResultStore) -> "PromptSnapshot":
+        return cls(store.texts, store.prompt_text[:])
+
+    @property
+    def prompt_count(self) -> int:
+        return len(self.prompt_text)
+
+
+# What a PromptGrouper reads prompts from
+PromptTexts = Union[ResultStore, PromptSnapshot]
+
+
+def prompt_words(text: str) -> List[str]:
+    """Lower-case words of a prompt, without punctuation, weights or digits"""
+    if text.isascii():
+        return text.encode('ascii').translate(ASCII_WORDS).decode('ascii').split()
+    return WORD_RE.findall(spaced_cjk(text).lower())
+
+
+def shingle_hash(shingle: str) -> int:
+    """32-bit hash of a word or word pair; unlike hash() it is the same in every process"""
+    return zlib.crc32(shingle.encode('utf-8'))
+
+
+def words_key(words: List[str]) -> bytes:
+    """Stable 64-bit digest identifying a sequence of words"""
+    return hashlib.blake2b('\0'.join(words).encode('utf-8'), digest_size=8).digest()
+
+
+def signature(words: List[str]) -> List[int]:
+    """One permutation MinHash signature of the words and adjacent word pairs of a prompt"""
+    # Words never contain spaces, so a pair cannot equal a single word
+    shingles = set(words)
+    shingles.update(map(' '.join, zip(words, words[1:])))
+    # Descending order, so the smallest hash of each bin is assigned last
+    hashes = sorted(map(shingle_hash, shingles), reverse=True)
+    bins = {h & BIN_MASK: h for h in hashes}
+    return list(map(bins.get, range(SIGNATURE_SIZE), repeat(EMPTY)))
+
+
+class PromptGrouper:
+    """Incremental exact and near-duplicate grouping of the prompts in a ResultStore"""
+
+    def __init__(self, similarity: float = DEFAULT_SIMILARITY):
+        self.similarity = similarity
+        self.clear()
+
+    def clear(self):
+        self.processed = 0
+        # text id -> parent text id (union-find over distinct texts)
+        self._parent: Dict[int, int] = {}
+        # words_key() of a text -> first text id with those words
+        self._word_keys: Dict[bytes, int] = {}
+        # Signatures of the texts that head a bucket
+        self._signatures: Dict[int, List[int]] = {}
+        # One dict per band: CRC of the band -> first text id in the bucket
+        self._buckets: List[Dict[int, int]] = [{} for _ in range(SIGNATURE_SIZE // BAND_SIZE)]
+        self._groups = None
+
+    def _find(self, text_id: int) -> int:
+        parent = self._parent
+        root = text_id
+        while parent[root] != root:
+            root = parent[root]
+        while parent[text_id] != root:
+            parent[text_id], text_id = root, parent[text_id]
+        return root
+
+    def _similar(self, values: List[int], head: int) -> bool:
+        """Estimate whether a signature and a bucket head reach the similarity threshold"""
+        head_values = self._signatures[head]
+        same = sum(map(eq, values, head_values))
+        # Bins empty in both signatures carry no information
+        both_empty = sum(map(eq, zip(values, head_values), repeat((EMPTY, EMPTY))))
+        return same - both_empty >= self.similarity * (SIGNATURE_SIZE - both_empty)
+
+    def _add_text(self, text_id: int, text: str):
+        parent = self._parent
+        words = prompt_words(text)
+        # Texts that differ only in punctuation, case or weights are duplicates
+        first = self._word_keys.setdefault(words_key(words or [text]), text_id)
+        if first != text_id:
+            parent[text_id] = first
+            return
+
+        values = signature(words or [text])
+        parent[text_id] = text_id
+        root = text_id
+        heads = False
+        # Consecutive BAND_SIZE-tuples of the signature
+        band_keys = (zlib.crc32(BAND_STRUCT.pack(*band)) for band in zip(*[iter(values)] * BAND_SIZE))
+        for buckets, key in zip(self._buckets, band_keys):
+            head = buckets.setdefault(key, text_id)
+            if head == text_id:
+                heads = True
+                continue
+            head_root = self._find(head)
+            if head_root != root and self._similar(values, head):
+                # The smaller id becomes the root of the merged group
+                parent[max(root, head_root)] = min(root, head_root)
+                root = min(root, head_root)
+        if heads:
+            self._signatures[text_id] = values
+
+    def update(self, store: PromptTexts):
+        """Add the prompts stored since the last update"""
+        if store.prompt_count < self.processed:
+            self.clear()
+        if store.prompt_count == self.processed:
+            return
+        texts = store.texts
+        for text_id in store.prompt_text[self.processed:]:
+            if text_id not in self._parent:
+                self._add_text(text_id, texts[text_id])
+        self.processed = store.prompt_count
+        self._groups = None
+
+    def resync(self, store: PromptTexts):
+        """Bring the grouping up to date after prompts were replaced in place (see ResultStore.replace)"""
+        texts = store.texts
+        for text_id in store.prompt_text:
+            if text_id not in self._parent:
+                self._add_text(text_id, texts[text_id])
+        self.processed = store.prompt_count
+        self._groups = None
+
+    def groups(self, store: PromptTexts) -> List[PromptGroup]:
+        """Bring the grouping up to date and return the groups in order of first appearance"""
+        self.update(store)
+        if self._groups is not None:
+            return self._groups
+
+        members: Dict[int, List[int]] = {}
+        text_counts: Dict[int, Dict[int, int]] = {}
+        find = self._find
+        for segment, text_id in enumerate(store.prompt_text[:self.processed]):
+            root = find(text_id)
+            members.setdefault(root, []).append(segment)
+            counts = text_counts.setdefault(root, {})
+            counts[text_id] = counts.get(text_id, 0) + 1
+
+        groups = []
+        for root, segments in members.items():
+            counts = text_counts[root]
+            # max() keeps the first of equal counts, and dicts keep insertion order
+            text_id = max(counts, key=counts.__getitem__)
+            representative = next(s for s in segments if store.prompt_text[s] == text_id)
+            groups.append(PromptGroup(segments, representative, len(counts)))
+        self._groups = groups
+        return groups
@@ -0,0 +1,250 @@
+"""
+Shared result rendering.
+
+ResultDocument is the single rendering stage for extracted prompts: it
+holds one segment per prompt and one or more text layers (the original
+prompts and any translations). The results view, the detail pane and the
+TXT report all format segments through it, and a translation only
+replaces the text of the segments that changed.
+"""
+
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from export import result_record
+from prompt_groups import PromptGroup
+from result_store import ResultStore, TextLayer
+
+ORIGINAL = "original"
+
+# Files named per prompt group in the grouped TXT report
+GROUP_FILES_SHOWN = 10
+
+
+class ResultDocument:
+    """Structured document of extraction results with switchable text layers.
+
+    Results are kept in a compact ResultStore, one entry per file (files
+    without prompts or with errors included), and every stored prompt is
+    one segment. A layer is an array of text ids into the store's text pool; the
+    original layer is the store's own text column, so a translation layer
+    costs one id per segment plus the translated strings themselves.
+    Segments added or replaced after a translation layer was started hold
+    their original text and are marked missing until they are translated.
+    """
+
+    def __init__(self):
+        self.store = ResultStore()
+        self.clear()
+
+    def clear(self):
+        self.store.clear()
+        self.layers: Dict[str, array] = {ORIGINAL: self.store.prompt_text}
+        # Layer each translation layer was derived from
+        self.sources: Dict[str, str] = {}
+        # Per translation layer, 1 for each segment that has been translated
+        self.translated: Dict[str, array] = {}
+        self.active = ORIGINAL
+        # Number of files in the batch; file headers are only shown for batches
+        self.file_count = 0
+
+    def __len__(self):
+        return self.store.prompt_count
+
+    @property
+    def texts(self) -> Sequence[str]:
+        """Prompt texts of the active layer"""
+        return self.layer_texts(self.active)
+
+    def layer_texts(self, name: str) -> Sequence[str]:
+        return TextLayer(self.store.texts, self.layers[name])
+
+    @property
+    def direction(self) -> Optional[str]:
+        """Translation direction of the active layer, or None for the original"""
+        return None if self.active == ORIGINAL else self.active
+
+    def add_result(self, result: Dict[str, Any], file_path: Optional[str] = None) -> int:
+        """Append a result, returning the number of new segments"""
+        first = len(self)
+        self.store.add(result, file_path)
+        new_ids = self.store.prompt_text[first:]
+        for name, layer in self.layers.items():
+            if name != ORIGINAL:
+                layer.extend(new_ids)
+                self.translated[name].extend(bytes(len(new_ids)))
+        return len(new_ids)
+
+    def replace_result(self, position: int, result: Dict[str, Any], file_path: Optional[str] = None):
+        """Replace the result of a stored file; its segments in translation layers revert to the original
+        and are marked missing"""
+        store = self.store
+        first = store.file_first_prompt[position]
+        old_count = store.file_prompt_count[position]
+        store.replace(position, result, file_path)
+        new_ids = store.prompt_text[first:first + store.file_prompt_count[position]]
+        for name, layer in self.layers.items():
+            if name != ORIGINAL:
+                layer[first:first + old_count] = new_ids
+                self.translated[name][first:first + old_count] = array('B', bytes(len(new_ids)))
+
+    # Layers
+
+    def begin_layer(self, name: str):
+        """Start a layer seeded with the active texts and make it active"""
+        self.layers[name] = array(self.store.prompt_text.typecode, self.layers[self.active])
+        self.translated[name] = array('B', bytes(len(self)))
+        self.sources[name] = self.active
+        self.active = name
+
+    def layer_source(self, name: str) -> Optional[str]:
+        return self.sources.get(name)
+
+    def update_layer(self, name: str, updates: Dict[int, str]) -> Optional[Tuple[int, int]]:
+        """Apply {segment: text} updates, returning the changed segment range"""
+        layer = self.layers[name]
+        translated = self.translated[name]
+        add_text = self.store.texts.add
+        changed = []
+        for i, text in updates.items():
+            text_id = add_text(text)
+            translated[i] = 1
+            if layer[i] != text_id:
+                layer[i] = text_id
+                changed.append(i)
+        if not changed:
+            return None
+        return min(changed), max(changed)
+
+    def complete_layer(self, name: str):
+        """Mark every segment of a layer as translated, including the ones deliberately left as they are"""
+        self.translated[name] = array('B', b'\x01' * len(self))
+
+    def missing_segments(self, name: str) -> List[int]:
+        """Segments of a translation layer that still hold untranslated text"""
+        flags = self.translated[name].tobytes()
+        missing = []
+        segment = flags.find(0)
+        while segment >= 0:
+            missing.append(segment)
+            segment = flags.find(0, segment + 1)
+        return missing
+
+    def activate(self, name: str):
+        self.active = name
+
+    def drop_layer(self, name: str):
+        """Discard a translation layer, falling back to the layer it came from"""
+        if name == ORIGINAL:
+            return
+        self.layers.pop(name, None)
+        self.translated.pop(name, None)
+        source = self.sources.pop(name, ORIGINAL)
+        if self.active == name:
+            self.active = source if source in self.layers else ORIGINAL
+
+    def has_layer(self, name: str) -> bool:
+        return name in self.layers
+
+    # Formatting
+
+    def segment_result(self, segment: int) -> Tuple[Dict[str, Any], int]:
+        """Return (result dict, prompt index) for a segment"""
+        position, prompt_index = self.store.prompt_position(segment)
+        return self.store.result_dict(position), prompt_index
+
+    def segment_header(self, segment: int) -> str:
+        store = self.store
+        position, prompt_index = store.prompt_position(segment)
+        header = f"{store.filename(position)} [{store.method(position)}]"
+        if store.file_prompt_count[position] > 1:
+            header += f" - Prompt {prompt_index + 1} - {store.prompt_value(segment, 'title', 'Untitled')}"
+        if self.direction:
+            header += f" [{self.direction}]"
+        return header
+
+    def segment_preview(self, segment: int, max_chars: int) -> str:
+        """Single-line preview of a segment's text"""
+        preview = " ".join(self.texts[segment][:max_chars * 2].split())
+        if len(preview) > max_chars:
+            preview = preview[:max_chars - 1] + "…"
+        return preview
+
+    def segment_detail(self, segment: int) -> str:
+        return f"=== {self.segment_header(segment)} ===\n{self.texts[segment]}"
+
+    def iter_report_blocks(self) -> Iterator[str]:
+        """Yield the blocks of the TXT report for files with prompts, using the active layer"""
+        store = self.store
+        texts = self.texts
+        first = True
+        for position in range(store.file_count):
+            segments = store.prompt_range(position)
+            if not segments:
+                continue
+            parts = []
+            if not first:
+                parts.append("\n" + "=" * 60 + "\n\n")
+            first = False
+
+            if self.file_count > 1:
+                size = store.size(position)
+                parts.append(f"FILE: {store.filename(position)}\n")
+                parts.append(f"Method: {store.method(position)}\n")
+                parts.append(f"Size: {size if size is not None else 'Unknown'}\n")
+                parts.append("-" * 60 + "\n\n")
+
+            for j, segment in enumerate(segments, 1):
+                if len(segments) > 1:
+                    parts.append(f"Prompt {j} - {store.prompt_value(segment, 'title', 'Untitled')}:\n")
+                    parts.append("-" * 40 + "\n")
+                parts.append(f"{texts[segment]}\n")
+                if j < len(segments):
+                    parts.append("\n")
+
+            yield "".join(parts)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield an export record per file, with the active layer's text as the translation.
+
+        Files without prompts or with errors are included, as in cli.py.
+        """
+        store = self.store
+        texts = self.texts if self.direction else None
+        for position in range(store.file_count):
+            translations = None
+            if texts is not None:
+                translations = [texts[segment] for segment in store.prompt_range(position)]
+            yield result_record(store.path(position), store.result_dict(position), translations)
+
+    def group_files(self, group: PromptGroup) -> List[str]:
+        """Names of the files a prompt group occurs in, in order"""
+        store = self.store
+        positions = dict.fromkeys(store.prompt_file[segment] for segment in group.segments)
+        return [store.filename(position) for position in positions]
+
+    def group_header(self, group: PromptGroup) -> str:
+        header = f"{len(group.segments)} prompts" if len(group.segments) > 1 else "1 prompt"
+        if group.variants > 1:
+            header += f", {group.variants} variants"
+        if self.direction:
+            header += f" [{self.direction}]"
+        return header
+
+    def iter_grouped_report_blocks(self, groups: List[PromptGroup]) -> Iterator[str]:
+        """Yield one TXT report block per prompt group, with the text of its representative"""
+        texts = self.texts
+        for number, group in enumerate(groups, 1):
+            files = self.group_files(group)
+            listed = ", ".join(files[:GROUP_FILES_SHOWN])
+            if len(files) > GROUP_FILES_SHOWN:
+                listed += f" (+{len(files) - GROUP_FILES_SHOWN} more)"
+            parts = [
+                f"Group {number} - {self.group_header(group)}\n",
+                f"Files: {listed}\n",
+                "-" * 40 + "\n",
+                f"{texts[group.representative]}\n",
+            ]
+            if number < len(groups):
+                parts.append("\n" + "=" * 60 + "\n\n")
+            yield "".join(parts)
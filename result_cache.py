@@ -0,0 +1,281 @@
+"""
+Persistent extraction result cache.
+
+Stores PromptExtractor result dicts in a SQLite file under the XDG cache
+directory, keyed by absolute path, file size, mtime_ns and extraction mode,
+so unchanged files are not re-read when a folder is opened again.
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import itertools
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+import profiling
+
+APP_CACHE_NAME = "comfyui-prompt-extractor"
+
+# (absolute path, size, mtime_ns)
+FileKey = Tuple[str, int, int]
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, APP_CACHE_NAME)
+
+
+def file_key(file_path: str) -> Optional[FileKey]:
+    """Return the cache identity of a file, or None if it cannot be stat'ed"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return os.path.abspath(file_path), st.st_size, st.st_mtime_ns
+
+
+def _decode_result(payload: str) -> Dict[str, Any]:
+    result = json.loads(payload)
+    # JSON has no tuples; keep file_info['size'] identical to a fresh extraction
+    file_info = result.get('file_info')
+    if file_info and isinstance(file_info.get('size'), list):
+        file_info['size'] = tuple(file_info['size'])
+    return result
+
+
+class ResultCache:
+    """SQLite-backed cache of extraction results with LRU eviction"""
+
+    # 2: Auto results without prompts report method 'auto'
+    SCHEMA_VERSION = 2
+
+    def __init__(self, db_path: Optional[str] = None,
+                 max_entries: int = 500_000, max_bytes: int = 512 * 1024 * 1024):
+        self.db_path = db_path or os.path.join(default_cache_dir(), "extraction_cache.sqlite")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS results")
+                conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    path TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    nbytes INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (path, mode)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, keys: Sequence[Optional[FileKey]], mode: str) -> Dict[int, Dict[str, Any]]:
+        """Return {index: result} for every key with a fresh cache entry"""
+        hits: Dict[int, Dict[str, Any]] = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            touched = []
+            for index, key in enumerate(keys):
+                if key is None:
+                    continue
+                path, size, mtime_ns = key
+                row = conn.execute(
+                    "SELECT size, mtime_ns, payload FROM results WHERE path = ? AND mode = ?",
+                    (path, mode)
+                ).fetchone()
+                if row and row[0] == size and row[1] == mtime_ns:
+                    try:
+                        hits[index] = _decode_result(row[2])
+                    except ValueError:
+                        continue
+                    touched.append((now, path, mode))
+            if touched:
+                conn.executemany("UPDATE results SET last_used = ? WHERE path = ? AND mode = ?", touched)
+                conn.commit()
+        return hits
+
+    def store(self, entries: Iterable[Tuple[FileKey, Dict[str, Any]]], mode: str):
+        """Insert or replace results for the given file keys"""
+        now = time.time()
+        rows = []
+        for (path, size, mtime_ns), result in entries:
+            payload = json.dumps(result, ensure_ascii=False)
+            rows.append((path, mode, size, mtime_ns, payload, len(payload), now))
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(path, mode, size, mtime_ns, payload, nbytes, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+    def evict(self):
+        """Drop least recently used entries until both size limits hold"""
+        with self._lock:
+            conn = self._connect()
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results").fetchone()
+            if count <= self.max_entries and total <= self.max_bytes:
+                return
+
+            to_delete = []
+            for path, mode, nbytes in conn.execute(
+                    "SELECT path, mode, nbytes FROM results ORDER BY last_used ASC"):
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                to_delete.append((path, mode))
+                count -= 1
+                total -= nbytes
+
+            conn.executemany("DELETE FROM results WHERE path = ? AND mode = ?", to_delete)
+            conn.commit()
+
+    def rebuild(self):
+        """Discard every cached result"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM results")
+            conn.commit()
+            conn.execute("VACUUM")
+
+    def stats(self) -> Tuple[int, int]:
+        """Return (entry count, payload bytes)"""
+        with self._lock:
+            conn = self._connect()
+            return conn.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results").fetchone()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_default_cache() -> Optional[ResultCache]:
+    """Open the per-user cache, or return None if it is unavailable"""
+    cache = ResultCache()
+    try:
+        cache.stats()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: extraction cache disabled: {e}")
+        return None
+    return cache
+
+
+# Paths looked up in the cache per query when streaming
+LOOKUP_BATCH = 256
+
+_END = object()
+
+
+def extract_with_cache(cache: Optional[ResultCache], engine, file_paths: Iterable[str], mode: str):
+    """Yield (index, result) for every file, serving fresh entries from the cache.
+
+    file_paths may be a lazy iterable such as a directory scan. Paths are
+    looked up in batches as they arrive; hits are yielded right away and
+    misses are streamed into the given ParallelExtractor, whose results
+    are written back to the cache in batches.
+    """
+    if cache is None:
+        yield from engine.iter_unordered(file_paths, mode)
+        return
+
+    output: "queue.Queue" = queue.Queue()
+    misses: "queue.Queue" = queue.Queue()
+    # Input index of each miss, by position in the engine's input
+    miss_indices: List[int] = []
+    miss_keys: Dict[int, FileKey] = {}
+
+    def look_up():
+        try:
+            indexed = enumerate(file_paths)
+            while not engine.cancelled:
+                batch = list(itertools.islice(indexed, LOOKUP_BATCH))
+                if not batch:
+                    break
+                with profiling.timer('cache lookup'):
+                    keys = [file_key(path) for _, path in batch]
+                    hits = cache.lookup(keys, mode)
+                profiling.count('result cache hits', len(hits))
+                profiling.count('result cache misses', len(batch) - len(hits))
+                for i, (index, path) in enumerate(batch):
+                    if i in hits:
+                        output.put((index, hits[i]))
+                    else:
+                        miss_indices.append(index)
+                        if keys[i] is not None:
+                            miss_keys[index] = keys[i]
+                        misses.put(path)
+        except BaseException as e:
+            output.put(e)
+        finally:
+            misses.put(_END)
+
+    def iter_misses():
+        while True:
+            path = misses.get()
+            if path is _END:
+                return
+            yield path
+
+    def extract_misses():
+        try:
+            for sub_index, result in engine.iter_unordered(iter_misses(), mode):
+                output.put((miss_indices[sub_index], result))
+        except BaseException as e:
+            output.put(e)
+        finally:
+            output.put(_END)
+
+    threads = [threading.Thread(target=look_up, name="cache-lookup", daemon=True),
+               threading.Thread(target=extract_misses, name="cache-extract", daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    pending: List[Tuple[FileKey, Dict[str, Any]]] = []
+    finished = False
+    try:
+        while True:
+            item = output.get()
+            if item is _END:
+                finished = True
+                break
+            if isinstance(item, BaseException):
+                raise item
+            index, result = item
+            # Errors are not cached so transient failures (e.g. permissions) are retried
+            if index in miss_keys and 'error' not in result:
+                pending.append((miss_keys.pop(index), result))
+                if len(pending) >= 500:
+                    with profiling.timer('cache write'):
+                        cache.store(pending, mode)
+                    pending = []
+            yield index, result
+    finally:
+        if not finished:
+            engine.cancel()
+        with profiling.timer('cache write'):
+            cache.store(pending, mode)
+            if miss_indices:
+                cache.evict()
@@ -0,0 +1,240 @@
+"""
+Compact result storage.
+
+Keeps extraction results for very large batches without a nested dict per
+file. File and prompt fields are stored in array-backed columns. Repeated
+values (image modes, methods, node types, titles, sources, prompt texts)
+are interned in pools and referenced by id, so each distinct string is
+stored once. result_dict() rebuilds the dict produced by PromptExtractor
+for code that still works with that shape.
+"""
+
+from array import array
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+# Optional keys of a prompt dict besides 'text', in the order the extractor writes them
+PROMPT_FIELDS = ('node_id', 'node_type', 'class_type', 'title', 'source')
+
+
+class InternPool:
+    """Stores each distinct hashable value once and hands out integer ids"""
+
+    __slots__ = ('values', 'ids')
+
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self.ids: Dict[Hashable, int] = {}
+
+    def add(self, value: Hashable) -> int:
+        try:
+            value_id = self.ids.get(value)
+        except TypeError:
+            # Unhashable values (e.g. a list title in odd metadata) are stored as is
+            self.values.append(value)
+            return len(self.values) - 1
+        if value_id is None:
+            value_id = len(self.values)
+            self.values.append(value)
+            self.ids[value] = value_id
+        return value_id
+
+    def __getitem__(self, value_id: int):
+        return self.values[value_id]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class TextLayer(Sequence):
+    """Read-only sequence of strings backed by an array of pool ids"""
+
+    __slots__ = ('pool', 'ids')
+
+    def __init__(self, pool: InternPool, ids: array):
+        self.pool = pool
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.pool.values[i] for i in self.ids[index]]
+        return self.pool.values[self.ids[index]]
+
+    def __iter__(self):
+        values = self.pool.values
+        return (values[i] for i in self.ids)
+
+
+class ResultStore:
+    """Columnar store of extraction results.
+
+    Files are numbered in insertion order and their prompts are numbered
+    consecutively, so a file's prompts are the range
+    file_first_prompt[f] .. file_first_prompt[f] + file_prompt_count[f].
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.texts = InternPool()
+        self.labels = InternPool()
+
+        # Per-file columns
+        self.file_names: List[str] = []
+        self.file_paths: List[Optional[str]] = []
+        self.file_width = array('l')
+        self.file_height = array('l')
+        self.file_mode = array('l')      # label id, -1 if absent
+        self.file_method = array('l')    # label id
+        self.file_first_prompt = array('L')
+        self.file_prompt_count = array('L')
+        # Errors are rare, so they are kept sparsely by file number
+        self.file_errors: Dict[int, Dict[str, str]] = {}
+
+        # Per-prompt columns
+        self.prompt_file = array('L')
+        self.prompt_text = array('L')    # text id
+        # label id + 1, 0 if the prompt dict has no such key
+        self.prompt_fields = {field: array('L') for field in PROMPT_FIELDS}
+
+    @property
+    def file_count(self) -> int:
+        return len(self.file_names)
+
+    @property
+    def prompt_count(self) -> int:
+        return len(self.prompt_file)
+
+    def add(self, result: Dict[str, Any], file_path: Optional[str] = None) -> int:
+        """Store a PromptExtractor result (and the path it was read from) and return its file number"""
+        position = len(self.file_names)
+        file_info = result.get('file_info', {})
+        size = file_info.get('size')
+        mode = file_info.get('mode')
+        prompts = result.get('positive_prompts', [])
+
+        self.file_names.append(file_info.get('filename', 'Unknown'))
+        self.file_paths.append(file_path)
+        self.file_width.append(size[0] if size else -1)
+        self.file_height.append(size[1] if size else -1)
+        self.file_mode.append(self.labels.add(mode) if mode is not None else -1)
+        self.file_method.append(self.labels.add(result.get('extraction_method', 'unknown')))
+        self.file_first_prompt.append(len(self.prompt_file))
+        self.file_prompt_count.append(len(prompts))
+        if 'error' in result:
+            self.file_errors[position] = result['error']
+
+        for prompt_info in prompts:
+            self.prompt_file.append(position)
+            self.prompt_text.append(self.texts.add(prompt_info['text']))
+            for field, column in self.prompt_fields.items():
+                value = prompt_info.get(field, column)
+                column.append(0 if value is column else self.labels.add(value) + 1)
+
+        return position
+
+    def replace(self, position: int, result: Dict[str, Any], file_path: Optional[str] = None):
+        """Replace the result stored under a file number, e.g. after the file changed.
+
+        The file keeps its number; its prompts are replaced in place, so the
+        prompts of later files are renumbered if the prompt count changed.
+        """
+        first = self.file_first_prompt[position]
+        old_count = self.file_prompt_count[position]
+        last = len(self.file_names)
+        tail = len(self.prompt_file)
+        # Store the result at the end, then move it into place
+        self.add(result, file_path)
+        new_count = self.file_prompt_count[last]
+
+        for column in (self.file_names, self.file_paths, self.file_width, self.file_height,
+                       self.file_mode, self.file_method):
+            column[position] = column.pop()
+        self.file_first_prompt.pop()
+        self.file_prompt_count.pop()
+        self.file_prompt_count[position] = new_count
+        self.file_errors.pop(position, None)
+        if last in self.file_errors:
+            self.file_errors[position] = self.file_errors.pop(last)
+
+        for column in (self.prompt_file, self.prompt_text, *self.prompt_fields.values()):
+            new = column[tail:]
+            del column[tail:]
+            column[first:first + old_count] = new
+        self.prompt_file[first:first + new_count] = array('L', [position]) * new_count
+
+        shift = new_count - old_count
+        if shift:
+            first_prompt = self.file_first_prompt
+            for later in range(position + 1, last):
+                first_prompt[later] += shift
+
+    # File accessors
+
+    def filename(self, position: int) -> str:
+        return self.file_names[position]
+
+    def path(self, position: int) -> str:
+        """Path of a stored file, or its name if the path is not known"""
+        return self.file_paths[position] or self.file_names[position]
+
+    def method(self, position: int) -> str:
+        return self.labels[self.file_method[position]]
+
+    def size(self, position: int) -> Optional[Tuple[int, int]]:
+        if self.file_width[position] < 0:
+            return None
+        return self.file_width[position], self.file_height[position]
+
+    def error(self, position: int) -> Optional[Dict[str, str]]:
+        return self.file_errors.get(position)
+
+    def prompt_range(self, position: int) -> range:
+        first = self.file_first_prompt[position]
+        return range(first, first + self.file_prompt_count[position])
+
+    # Prompt accessors
+
+    def prompt_position(self, prompt: int) -> Tuple[int, int]:
+        """Return (file number, index of the prompt within its file)"""
+        position = self.prompt_file[prompt]
+        return position, prompt - self.file_first_prompt[position]
+
+    def prompt_value(self, prompt: int, field: str, default: Any = None) -> Any:
+        label = self.prompt_fields[field][prompt]
+        return self.labels[label - 1] if label else default
+
+    def original_texts(self) -> TextLayer:
+        return TextLayer(self.texts, self.prompt_text)
+
+    # Dict adapter
+
+    def prompt_dict(self, prompt: int) -> Dict[str, Any]:
+        prompt_info = {'text': self.texts[self.prompt_text[prompt]]}
+        for field, column in self.prompt_fields.items():
+            if column[prompt]:
+                prompt_info[field] = self.labels[column[prompt] - 1]
+        return prompt_info
+
+    def result_dict(self, position: int) -> Dict[str, Any]:
+        """Rebuild the PromptExtractor result dict of a stored file"""
+        file_info: Dict[str, Any] = {'filename': self.file_names[position]}
+        size = self.size(position)
+        if size is not None:
+            file_info['size'] = size
+        if self.file_mode[position] >= 0:
+            file_info['mode'] = self.labels[self.file_mode[position]]
+        result = {
+            'file_info': file_info,
+            'positive_prompts': [self.prompt_dict(prompt) for prompt in self.prompt_range(position)],
+            'extraction_method': self.method(position),
+        }
+        if position in self.file_errors:
+            result['error'] = self.file_errors[position]
+        return result
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        return (self.result_dict(position) for position in range(self.file_count))
@@ -0,0 +1,144 @@
+"""
+Model-backed results view.
+
+Shows one row per extracted prompt in a single-column QTableView. Rows are
+formatted on demand from the ResultDocument in PromptListModel.data(), so
+only visible rows cost any work and the view scales to hundreds of
+thousands of prompts.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt6.QtWidgets import QSplitter, QTableView, QTextEdit, QAbstractItemView, QHeaderView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+from rendering import ResultDocument
+
+# Characters of prompt text shown in a list row; the full text is in the detail pane
+ROW_PREVIEW_CHARS = 240
+
+
+class PromptListModel(QAbstractListModel):
+    """List model with one row per positive prompt, backed by a ResultDocument"""
+
+    def __init__(self, document: ResultDocument, parent=None):
+        super().__init__(parent)
+        self.document = document
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.document)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.document):
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            row = index.row()
+            return f"{self.document.segment_header(row)}\n{self.document.segment_preview(row, ROW_PREVIEW_CHARS)}"
+        if role == Qt.ItemDataRole.UserRole:
+            return self.document.texts[index.row()]
+        return None
+
+    def add_results(self, results: List[Tuple[str, Dict[str, Any]]]):
+        """Append (path, result) pairs to the document with a single row insertion"""
+        count = sum(len(result.get('positive_prompts', [])) for _, result in results)
+        first = len(self.document)
+        if count:
+            self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        for file_path, result in results:
+            self.document.add_result(result, file_path)
+        if count:
+            self.endInsertRows()
+
+    def replace_result(self, position: int, file_path: str, result: Dict[str, Any]):
+        """Replace the result of a stored file, updating its rows in place"""
+        store = self.document.store
+        first = store.file_first_prompt[position]
+        old_count = store.file_prompt_count[position]
+        new_count = len(result.get('positive_prompts', []))
+        if new_count == old_count:
+            self.document.replace_result(position, result, file_path)
+            if new_count:
+                self.segments_changed(first, first + new_count - 1)
+            return
+        # Views must see a consistent document at each notification, so the
+        # old rows are removed first and the new ones inserted after
+        if old_count:
+            self.beginRemoveRows(QModelIndex(), first, first + old_count - 1)
+            self.document.replace_result(position, dict(result, positive_prompts=[]), file_path)
+            self.endRemoveRows()
+        if new_count:
+            self.beginInsertRows(QModelIndex(), first, first + new_count - 1)
+            self.document.replace_result(position, result, file_path)
+            self.endInsertRows()
+
+    def segments_changed(self, first: Optional[int] = None, last: Optional[int] = None):
+        """Notify views that segment texts changed (all segments by default)"""
+        if not len(self.document):
+            return
+        first = 0 if first is None else first
+        last = len(self.document) - 1 if last is None else last
+        self.dataChanged.emit(self.index(first), self.index(last))
+
+    def clear(self):
+        self.beginResetModel()
+        self.document.clear()
+        self.endResetModel()
+
+
+class ResultsView(QSplitter):
+    """Virtualized prompt list with a detail pane for the selected prompt"""
+
+    def __init__(self, parent=None):
+        super().__init__(Qt.Orientation.Vertical, parent)
+
+        self.document = ResultDocument()
+        self.model = PromptListModel(self.document, self)
+
+        # A table with fixed row heights only touches visible rows; QListView
+        # and QTreeView walk every row on each relayout.
+        self.prompt_view = QTableView()
+        self.prompt_view.setModel(self.model)
+        self.prompt_view.setShowGrid(False)
+        self.prompt_view.horizontalHeader().hide()
+        self.prompt_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        vertical_header = self.prompt_view.verticalHeader()
+        vertical_header.hide()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(self.fontMetrics().lineSpacing() * 2 + 8)
+        self.prompt_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.prompt_view.setWordWrap(False)
+        self.prompt_view.setTextElideMode(Qt.TextElideMode.ElideRight)
+        self.prompt_view.setAlternatingRowColors(True)
+        self.prompt_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.prompt_view.selectionModel().currentChanged.connect(self.on_current_changed)
+        self.addWidget(self.prompt_view)
+
+        self.detail_text = QTextEdit()
+        self.detail_text.setReadOnly(True)
+        self.addWidget(self.detail_text)
+
+        self.setStretchFactor(0, 3)
+        self.setStretchFactor(1, 1)
+
+        self.model.dataChanged.connect(self.refresh_detail)
+        self.model.modelReset.connect(self.detail_text.clear)
+
+    def on_current_changed(self, current, previous):
+        self.refresh_detail()
+
+    def refresh_detail(self, top_left=None, bottom_right=None, roles=None):
+        index = self.prompt_view.currentIndex()
+        if top_left is not None and index.isValid() and not top_left.row() <= index.row() <= bottom_right.row():
+            return
+        if not index.isValid():
+            self.detail_text.clear()
+            return
+        self.detail_text.setPlainText(self.document.segment_detail(index.row()))
+
+    def select_segment(self, segment: int):
+        index = self.model.index(segment)
+        self.prompt_view.setCurrentIndex(index)
+        self.prompt_view.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtTop)
+
+    def clear(self):
+        self.model.clear()
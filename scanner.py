@@ -0,0 +1,185 @@
+"""
+Streaming directory scanner.
+
+iter_files() walks folders with os.scandir and yields matching files as
+soon as they are found, so extraction can start while a large or remote
+tree is still being listed. Directories are listed in parallel by a small
+thread pool, but files come out in a fixed, sorted depth-first order.
+Matching is case-insensitive, directory symlinks are only followed on
+request and every directory is visited at most once, so symlink loops
+terminate.
+"""
+
+import os
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import profiling
+
+DEFAULT_INCLUDE = ("*.png",)
+DEFAULT_SCAN_WORKERS = 4
+
+# (device, inode) of a visited directory
+DirectoryId = Tuple[int, int]
+
+
+def _compile(patterns: Sequence[str]) -> List[str]:
+    return [pattern.lower() for pattern in patterns]
+
+
+def matches(name: str, rel_path: str, patterns: Sequence[str]) -> bool:
+    """Case-insensitive match of a file name or root-relative path against patterns"""
+    name = name.lower()
+    rel_path = rel_path.replace(os.sep, '/').lower()
+    return any(fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(rel_path, pattern)
+               for pattern in patterns)
+
+
+class DirectoryScanner:
+    """Recursive file finder; see iter_files() for the options.
+
+    With snapshot set, the scan also records what a folder watcher needs to
+    pick up from where it ended: the (mtime_ns, size) of every file found
+    and the mtime_ns of every folder listed, taken before it was listed.
+    complete is set once iter_files() has been exhausted.
+    """
+
+    def __init__(self, include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = (),
+                 max_depth: Optional[int] = None, follow_symlinks: bool = False,
+                 workers: int = DEFAULT_SCAN_WORKERS, snapshot: bool = False):
+        self.include = _compile(include)
+        self.exclude = _compile(exclude)
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self.workers = max(1, workers)
+        self.snapshot = snapshot
+        self.file_states: Dict[str, Tuple[int, int]] = {}
+        self.folder_mtimes: Dict[str, int] = {}
+        self.complete = False
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def accepts_file(self, name: str, rel_path: str) -> bool:
+        return matches(name, rel_path, self.include) and not matches(name, rel_path, self.exclude)
+
+    def _list(self, directory: str, root: str, depth: int) -> Tuple[List[str], List[Tuple[str, int]]]:
+        """List one directory: (matching files, subdirectories to descend into)"""
+        with profiling.timer('scan'):
+            files = []
+            subdirs = []
+            try:
+                if self.snapshot:
+                    # Taken first, so anything added during the listing changes it
+                    self.folder_mtimes[directory] = os.stat(directory).st_mtime_ns
+                with os.scandir(directory) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError as e:
+                print(f"Warning: cannot read folder {directory}: {e}")
+                return files, subdirs
+
+            for entry in entries:
+                rel_path = os.path.relpath(entry.path, root)
+                try:
+                    if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                        if self.max_depth is not None and depth >= self.max_depth:
+                            continue
+                        if not matches(entry.name, rel_path, self.exclude):
+                            subdirs.append((entry.path, depth + 1))
+                    elif entry.is_file() and self.accepts_file(entry.name, rel_path):
+                        if self.snapshot:
+                            st = entry.stat()
+                            self.file_states[entry.path] = (st.st_mtime_ns, st.st_size)
+                        files.append(entry.path)
+                except OSError:
+                    continue
+        profiling.count('folders scanned')
+        profiling.count('files found', len(files))
+        return files, subdirs
+
+    def _directory_id(self, directory: str) -> Optional[DirectoryId]:
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino
+
+    def iter_files(self, roots: Iterable[str]) -> Iterator[str]:
+        # Only needed when following symlinks: without them a tree has no cycles
+        visited: Set[DirectoryId] = set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan") as pool:
+            # future -> root folder it belongs to
+            pending = {}
+            # future -> (files, futures of its subdirectories), for listings not yielded yet
+            listed = {}
+
+            def descend(directory, root, depth):
+                if self.follow_symlinks:
+                    directory_id = self._directory_id(directory)
+                    if directory_id is None or directory_id in visited:
+                        return None
+                    visited.add(directory_id)
+                future = pool.submit(self._list, directory, root, depth)
+                pending[future] = root
+                return future
+
+            # Stack of root files and folder listings still to yield, the next one
+            # last. Folders are listed as soon as they are found, but a listing is
+            # only yielded once everything before it in walk order has been.
+            order = []
+            for root in roots:
+                if os.path.isdir(root):
+                    future = descend(root, root, 0)
+                    if future is not None:
+                        order.append(future)
+                elif os.path.isfile(root):
+                    order.append(root)
+            order.reverse()
+
+            try:
+                while order:
+                    if self.cancelled:
+                        return
+                    item = order[-1]
+                    if isinstance(item, str):
+                        order.pop()
+                        yield item
+                        continue
+                    if item in listed:
+                        order.pop()
+                        files, children = listed.pop(item)
+                        order.extend(reversed(children))
+                        yield from files
+                        continue
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        root = pending.pop(future)
+                        files, subdirs = future.result()
+                        children = [descend(directory, root, depth) for directory, depth in subdirs]
+                        listed[future] = (files, [child for child in children if child is not None])
+                self.complete = True
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def iter_files(roots: Iterable[str], include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = (),
+               max_depth: Optional[int] = None, follow_symlinks: bool = False,
+               workers: int = DEFAULT_SCAN_WORKERS) -> Iterator[str]:
+    """Yield files under roots as they are found.
+
+    Roots that are files are yielded as given; folders are searched
+    recursively. include/exclude are glob patterns matched, ignoring case,
+    against file names and root-relative paths; an excluded folder is not
+    entered. max_depth limits recursion (0 = only the root folder).
+    Directory symlinks are followed only if follow_symlinks is set.
+    The order is that of a sorted os.walk: roots as given, then depth
+    first, each folder's files in name order before its subfolders.
+    Folders are listed concurrently; listings that finish early wait
+    until their turn.
+    """
+    scanner = DirectoryScanner(include, exclude, max_depth, follow_symlinks, workers)
+    return scanner.iter_files(roots)
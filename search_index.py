@@ -0,0 +1,315 @@
+"""
+Persistent full-text prompt search.
+
+Extracted prompts are kept in a SQLite FTS5 index under the XDG cache
+directory, so every library that was ever extracted can be searched in
+milliseconds. Prompt text is normalized for Stable Diffusion syntax before
+indexing: weights like (word:1.2) and <lora:name:0.8>, emphasis brackets
+and underscores are stripped, each comma-separated tag is also indexed as
+a single token for exact tag matches, and CJK characters are indexed one
+by one so any run of them can be found.
+
+Query syntax (see build_match()):
+    cyberpunk rain      prompts containing both words
+    cyber*              word prefix
+    "red hair"          words in sequence
+    tag:long_hair       exact tag ("long hair", "long_hair", "(long hair:1.1)")
+    -blurry             exclude prompts containing a word
+"""
+
+import os
+import re
+import queue
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import profiling
+from result_cache import default_cache_dir, file_key
+
+DEFAULT_SEARCH_LIMIT = 500
+
+# Prompt rowids are (file id << PROMPT_BITS) + prompt number, so a file's
+# prompts form a rowid range and can be replaced without scanning the index
+PROMPT_BITS = 16
+
+# Attention weights such as ":1.2" in "(word:1.2)", "[word:0.8]" or "<lora:name:0.8>"
+WEIGHT_RE = re.compile(r':\s*-?(?:\d+\.?\d*|\.\d+)\s*(?=[)\]>,|]|$)')
+# <lora:name>, <hypernet:name>, embedding:name -> name
+NETWORK_RE = re.compile(r'<\s*[\w-]+\s*:\s*([^:>]+)[^>]*>|\bembedding:')
+# Emphasis and grouping brackets (escaped ones included) and other separators
+BRACKETS_RE = re.compile(r'\\?[()\[\]{}<>]|_')
+# BREAK keywords separate tags like commas do
+BREAK_RE = re.compile(r'\bBREAK\b')
+# Tag separators: commas, newlines and "|" alternations
+TAG_SPLIT_RE = re.compile(r'[,\n|]')
+# CJK ideographs, kana and hangul are indexed one character per token.
+# Compiled on first use: it is slow to compile and most prompts are ASCII.
+CJK_PATTERN = r'([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff])'
+# Query terms: optional "-", optional "tag:", then a quoted phrase or a bare word
+QUERY_TERM_RE = re.compile(r'(-?)(tag:)?(?:"([^"]*)"?|(\S+))', re.IGNORECASE)
+
+
+class SearchHit(NamedTuple):
+    path: str
+    text: str
+    method: str
+
+
+def prompt_tags(text: str) -> List[str]:
+    """Split a prompt into normalized, lower-case tags"""
+    if '<' in text or 'embedding:' in text:
+        text = NETWORK_RE.sub(lambda m: f" {m.group(1) or ''} ", text)
+    if ':' in text:
+        text = WEIGHT_RE.sub(' ', text)
+    if 'BREAK' in text:
+        text = BREAK_RE.sub(',', text)
+    text = BRACKETS_RE.sub(' ', text).lower()
+    tags = (' '.join(part.split()) for part in TAG_SPLIT_RE.split(text))
+    return [tag for tag in tags if tag]
+
+
+def spaced_cjk(text: str) -> str:
+    if text.isascii():
+        return text
+    return _cjk_re().sub(r' \1 ', text)
+
+
+@lru_cache(maxsize=None)
+def _cjk_re() -> "re.Pattern":
+    return re.compile(CJK_PATTERN)
+
+
+# Seed sweeps repeat the same prompt across many files
+@lru_cache(maxsize=4096)
+def index_columns(text: str) -> Tuple[str, str]:
+    """Return the (words, tags) columns indexed for a prompt"""
+    tags = prompt_tags(text)
+    words = spaced_cjk(' , '.join(tags))
+    tag_tokens = ' '.join(tag.replace(' ', '_') for tag in tags)
+    return words, tag_tokens
+
+
+def fts_string(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def build_match(query: str) -> Optional[str]:
+    """Translate the user query syntax into an FTS5 MATCH expression.
+
+    Returns None if the query has no positive term (FTS5 cannot search for
+    exclusions alone).
+    """
+    positive = []
+    negative = []
+    for m in QUERY_TERM_RE.finditer(query):
+        exclude, tag, phrase, word = m.groups()
+        raw = phrase if phrase is not None else word
+        prefix = phrase is None and raw.endswith('*')
+        if tag:
+            normalized = '_'.join(' '.join(prompt_tags(raw)).split())
+            column = 'tags'
+        else:
+            normalized = ' '.join(spaced_cjk(' '.join(prompt_tags(raw.rstrip('*')))).split())
+            column = 'words'
+        if not normalized:
+            continue
+        term = f"{column} : {fts_string(normalized)}" + (' *' if prefix else '')
+        (negative if exclude else positive).append(term)
+    if not positive:
+        return None
+    return ' AND '.join(positive) + ''.join(f" NOT {term}" for term in negative)
+
+
+def default_index_path() -> str:
+    return os.path.join(default_cache_dir(), "search.sqlite3")
+
+
+class SearchIndex:
+    """SQLite FTS5 index of extracted prompts, updated incrementally per file"""
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or default_index_path()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute("DROP TABLE IF EXISTS prompts")
+                conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    method TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS prompts USING fts5(
+                    words, tags, text UNINDEXED,
+                    tokenize = "unicode61 remove_diacritics 2 tokenchars '_'"
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _delete_file(self, conn: sqlite3.Connection, file_id: int):
+        conn.execute("DELETE FROM prompts WHERE rowid BETWEEN ? AND ?",
+                     (file_id << PROMPT_BITS, ((file_id + 1) << PROMPT_BITS) - 1))
+        conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def update(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Index (path, result) pairs and return the number of files (re)indexed.
+
+        Unchanged files are skipped. A result without prompts does not
+        replace the prompts of an unchanged file, so re-running a batch in a
+        mode that finds nothing keeps what an earlier mode found.
+        """
+        candidates = []
+        for file_path, result in entries:
+            if 'error' in result:
+                continue
+            key = file_key(file_path)
+            if key is not None:
+                texts = [prompt['text'] for prompt in result.get('positive_prompts', [])]
+                candidates.append((key, result.get('extraction_method', 'unknown'), texts[:1 << PROMPT_BITS]))
+        if not candidates:
+            return 0
+
+        with self._lock:
+            conn = self._connect()
+            stale = []
+            for (path, size, mtime_ns), method, texts in candidates:
+                row = conn.execute("SELECT size, mtime_ns, method FROM files WHERE path = ?", (path,)).fetchone()
+                unchanged = row is not None and row[0] == size and row[1] == mtime_ns
+                if not (unchanged and (row[2] == method or not texts)):
+                    stale.append(((path, size, mtime_ns), method, texts))
+        if not stale:
+            return 0
+
+        # Normalize outside the lock, so searches are not held up
+        rows = [(key, method, [(*index_columns(text), text) for text in texts]) for key, method, texts in stale]
+        with self._lock:
+            conn = self._connect()
+            for (path, size, mtime_ns), method, prompts in rows:
+                row = conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+                if row is not None:
+                    self._delete_file(conn, row[0])
+                file_id = conn.execute(
+                    "INSERT INTO files (path, size, mtime_ns, method) VALUES (?, ?, ?, ?)",
+                    (path, size, mtime_ns, method)
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO prompts (rowid, words, tags, text) VALUES (?, ?, ?, ?)",
+                    [((file_id << PROMPT_BITS) + number, *columns) for number, columns in enumerate(prompts)]
+                )
+            conn.commit()
+        return len(rows)
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[SearchHit]:
+        """Return up to limit matching prompts, most recently indexed files first"""
+        match = build_match(query)
+        if match is None:
+            return []
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT files.path, prompts.text, files.method FROM prompts "
+                    "JOIN files ON files.id = prompts.rowid >> ? "
+                    "WHERE prompts MATCH ? ORDER BY prompts.rowid DESC LIMIT ?",
+                    (PROMPT_BITS, match, limit)
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"Warning: search failed for {query!r}: {e}")
+                return []
+        return [SearchHit(*row) for row in rows]
+
+    def forget(self, file_paths: Iterable[str]):
+        """Remove files (e.g. deleted ones) from the index"""
+        with self._lock:
+            conn = self._connect()
+            for file_path in file_paths:
+                row = conn.execute("SELECT id FROM files WHERE path = ?",
+                                   (os.path.abspath(file_path),)).fetchone()
+                if row is not None:
+                    self._delete_file(conn, row[0])
+            conn.commit()
+
+    def clear(self):
+        """Remove every indexed file"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM prompts")
+            conn.execute("DELETE FROM files")
+            conn.commit()
+            conn.execute("VACUUM")
+
+    def stats(self) -> Tuple[int, int]:
+        """Return (file count, prompt count)"""
+        with self._lock:
+            conn = self._connect()
+            files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            prompts = conn.execute("SELECT COUNT(*) FROM prompts").fetchone()[0]
+            return files, prompts
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class BackgroundIndexer:
+    """Applies SearchIndex.update() batches on a worker thread, in submission order"""
+
+    def __init__(self, index: SearchIndex):
+        self.index = index
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="search-indexer", daemon=True)
+        self._thread.start()
+
+    def submit(self, entries: List[Tuple[str, Dict[str, Any]]]):
+        if entries:
+            self._queue.put(entries)
+
+    def _run(self):
+        while True:
+            entries = self._queue.get()
+            if entries is None:
+                return
+            try:
+                with profiling.timer('search index'):
+                    self.index.update(entries)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Warning: could not update the search index: {e}")
+
+    def close(self, timeout: Optional[float] = None):
+        """Finish the queued batches and stop the thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+def open_default_index() -> Optional[SearchIndex]:
+    """Open the per-user search index, or return None if FTS5 or the cache directory is unavailable"""
+    index = SearchIndex()
+    try:
+        with index._lock:
+            index._connect()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: prompt search disabled: {e}")
+        return None
+    return index
@@ -0,0 +1,130 @@
+"""
+Prompt search tab.
+
+A search box over the persistent SearchIndex. Queries run as the user
+types (debounced) and list the matching prompts with their files;
+activating a match emits hit_activated(path, prompt text).
+"""
+
+import os
+from typing import List, Optional
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QLabel, QListView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer, pyqtSignal
+
+from search_index import SearchIndex, SearchHit, DEFAULT_SEARCH_LIMIT, build_match
+
+# Delay after the last keystroke before searching
+SEARCH_DELAY_MS = 150
+# Characters of prompt text shown per match
+HIT_PREVIEW_CHARS = 240
+
+
+class SearchHitModel(QAbstractListModel):
+    """List model of search hits"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hits: List[SearchHit] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.hits)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.hits):
+            return None
+        hit = self.hits[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            text = ' '.join(hit.text.split())
+            if len(text) > HIT_PREVIEW_CHARS:
+                text = text[:HIT_PREVIEW_CHARS] + "..."
+            return f"{os.path.basename(hit.path)}  [{hit.method}]  {os.path.dirname(hit.path)}\n{text}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{hit.path}\n\n{hit.text}"
+        return None
+
+    def set_hits(self, hits: List[SearchHit]):
+        self.beginResetModel()
+        self.hits = hits
+        self.endResetModel()
+
+
+class SearchView(QWidget):
+    """Search box and match list; emits hit_activated(path, text)"""
+    hit_activated = pyqtSignal(str, str)
+
+    def __init__(self, index: Optional[SearchIndex], parent=None):
+        super().__init__(parent)
+        self.index = index
+
+        layout = QVBoxLayout(self)
+        self.query_edit = QLineEdit()
+        self.query_edit.setClearButtonEnabled(True)
+        self.query_edit.setPlaceholderText('Search all extracted prompts, e.g.  cyberpunk rain  "red hair"  '
+                                           'tag:long_hair  cyber*  -blurry')
+        layout.addWidget(self.query_edit)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.model = SearchHitModel(self)
+        self.hit_view = QListView()
+        self.hit_view.setModel(self.model)
+        self.hit_view.setUniformItemSizes(True)
+        self.hit_view.setAlternatingRowColors(True)
+        self.hit_view.setWordWrap(False)
+        self.hit_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.hit_view.activated.connect(self.on_activated)
+        self.hit_view.doubleClicked.connect(self.on_activated)
+        layout.addWidget(self.hit_view)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.query_edit.textChanged.connect(self.search_timer.start)
+        self.query_edit.returnPressed.connect(self.run_search)
+
+        if index is None:
+            self.query_edit.setEnabled(False)
+            self.status_label.setText("Search is not available (the search index could not be opened)")
+        else:
+            self.status_label.setText("Prompts are added to the index as files are extracted")
+
+    def run_search(self):
+        self.search_timer.stop()
+        query = self.query_edit.text().strip()
+        if self.index is None or not query:
+            self.model.set_hits([])
+            return
+        if build_match(query) is None:
+            self.model.set_hits([])
+            self.status_label.setText("Enter at least one word to search for")
+            return
+
+        hits = self.index.search(query, DEFAULT_SEARCH_LIMIT)
+        truncated = len(hits) >= DEFAULT_SEARCH_LIMIT
+        # Drop files deleted since they were indexed
+        missing = {hit.path for hit in hits if not os.path.exists(hit.path)}
+        if missing:
+            self.index.forget(missing)
+            hits = [hit for hit in hits if hit.path not in missing]
+        self.model.set_hits(hits)
+
+        if not hits:
+            self.status_label.setText("No matches")
+        elif truncated:
+            self.status_label.setText(f"Showing the {len(hits)} most recently extracted matches")
+        else:
+            files = len({hit.path for hit in hits})
+            self.status_label.setText(f"{len(hits)} matching prompts in {files} files")
+
+    def on_activated(self, index):
+        if index.isValid():
+            hit = self.model.hits[index.row()]
+            self.hit_activated.emit(hit.path, hit.text)
+
+    def refresh(self):
+        """Re-run the current query (e.g. after the index changed)"""
+        if self.query_edit.text().strip():
+            self.run_search()
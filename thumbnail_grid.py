@@ -0,0 +1,224 @@
+"""
+Lazily loaded thumbnail grid for multi-file batches.
+
+ThumbnailGridModel has one cell per input file. Thumbnails are requested
+from the ThumbnailLoader only when a visible cell is painted, and loads
+scheduled for cells that have scrolled out of view are cancelled. Each
+cell links to the first extracted prompt of its file.
+"""
+
+import os
+from array import array
+from typing import Dict, List, Optional
+
+from PyQt6.QtWidgets import QListView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap
+
+from rendering import ResultDocument
+from thumbnails import ThumbnailLoader, PixmapCache
+
+GRID_ICON_SIZE = 128
+GRID_CELL_SIZE = QSize(GRID_ICON_SIZE + 24, GRID_ICON_SIZE + 40)
+# Scaled icons kept for the grid (about 64 KB each)
+GRID_ICON_CACHE_SIZE = 1000
+# Delay before cancelling loads of cells that scrolled out of view
+VISIBLE_CHECK_DELAY_MS = 50
+
+
+class ThumbnailGridModel(QAbstractListModel):
+    """One cell per file; icons are loaded on demand"""
+
+    def __init__(self, loader: ThumbnailLoader, document: ResultDocument, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.document = document
+        self.icons = PixmapCache(GRID_ICON_CACHE_SIZE)
+        self.file_paths: List[str] = []
+        self.rows: Dict[str, int] = {}
+        # Store position of each file's result, -1 until it is shown
+        self.positions = array('l')
+        self.failed = set()
+        # Loads scheduled by this model, so only those are cancelled on scroll
+        self.requested = set()
+        loader.ready.connect(self.on_thumbnail_ready)
+        loader.failed.connect(self.on_thumbnail_failed)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.file_paths)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.file_paths):
+            return None
+        row = index.row()
+        file_path = self.file_paths[row]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return os.path.basename(file_path)
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.icon(file_path)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            segment = self.first_segment(row)
+            if segment < 0:
+                return f"{file_path}\nNo prompts"
+            return f"{file_path}\n{self.document.segment_preview(segment, 200)}"
+        return None
+
+    def icon(self, file_path: str) -> Optional[QPixmap]:
+        entry = self.icons.get(file_path)
+        if entry is not None:
+            return entry[0]
+        if file_path in self.failed:
+            return None
+        entry = self.loader.request(file_path)
+        if entry is not None:
+            return self.store_icon(file_path, *entry)
+        self.requested.add(file_path)
+        return None
+
+    def store_icon(self, file_path: str, pixmap: QPixmap, size) -> QPixmap:
+        icon = pixmap.scaled(GRID_ICON_SIZE, GRID_ICON_SIZE, Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+        self.icons.put(file_path, icon, size)
+        return icon
+
+    def on_thumbnail_ready(self, file_path, pixmap, size):
+        self.requested.discard(file_path)
+        row = self.rows.get(file_path)
+        if row is None:
+            return
+        self.store_icon(file_path, pixmap, size)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def on_thumbnail_failed(self, file_path, error_message):
+        self.requested.discard(file_path)
+        if file_path in self.rows:
+            self.failed.add(file_path)
+
+    def set_files(self, file_paths: List[str]):
+        self.beginResetModel()
+        self.file_paths = list(file_paths)
+        self.rows = {file_path: row for row, file_path in enumerate(self.file_paths)}
+        self.positions = array('l', [-1]) * len(self.file_paths)
+        self.failed.clear()
+        self.requested.clear()
+        self.endResetModel()
+
+    def append_files(self, file_paths: List[str]):
+        """Add cells at the end for files not in the grid yet"""
+        if not file_paths:
+            return
+        first = len(self.file_paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(file_paths) - 1)
+        for row, file_path in enumerate(file_paths, first):
+            # The file may have changed since an earlier batch showed it
+            self.icons.discard(file_path)
+            self.failed.discard(file_path)
+            self.rows[file_path] = row
+        self.file_paths.extend(file_paths)
+        self.positions.extend([-1] * len(file_paths))
+        self.endInsertRows()
+
+    def reload_files(self, file_paths: List[str]):
+        """Drop the icons of changed files in the grid so their cells load new thumbnails"""
+        for file_path in file_paths:
+            row = self.rows.get(file_path)
+            if row is None:
+                continue
+            self.icons.discard(file_path)
+            self.failed.discard(file_path)
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def link_result(self, row: int, position: int):
+        """Record the store position of the result of the file in a cell"""
+        self.positions[row] = position
+
+    def first_segment(self, row: int) -> int:
+        """First prompt segment of the file in a cell, -1 if it has none (yet)"""
+        position = self.positions[row]
+        store = self.document.store
+        if position < 0 or not store.file_prompt_count[position]:
+            return -1
+        return store.file_first_prompt[position]
+
+
+class ThumbnailGrid(QListView):
+    """Icon-mode view of a batch; activating a cell emits its first prompt segment"""
+    prompt_activated = pyqtSignal(int)
+
+    def __init__(self, loader: ThumbnailLoader, document: ResultDocument, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.grid_model = ThumbnailGridModel(loader, document, self)
+        self.setModel(self.grid_model)
+
+        # Uniform, static cells let the view lay out and paint only what is visible
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(2000)
+        self.setUniformItemSizes(True)
+        self.setIconSize(QSize(GRID_ICON_SIZE, GRID_ICON_SIZE))
+        self.setGridSize(GRID_CELL_SIZE)
+        self.setWordWrap(False)
+        self.setTextElideMode(Qt.TextElideMode.ElideMiddle)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+
+        self.visible_timer = QTimer(self)
+        self.visible_timer.setSingleShot(True)
+        self.visible_timer.setInterval(VISIBLE_CHECK_DELAY_MS)
+        self.visible_timer.timeout.connect(self.cancel_hidden_loads)
+        self.verticalScrollBar().valueChanged.connect(self.visible_timer.start)
+
+        self.activated.connect(self.on_activated)
+        self.clicked.connect(self.on_activated)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.visible_timer.start()
+
+    def visible_rows(self) -> range:
+        """Rows of the cells intersecting the viewport (cells sit on a fixed grid)"""
+        viewport = self.viewport()
+        columns = max(1, viewport.width() // GRID_CELL_SIZE.width())
+        top = self.verticalScrollBar().value()
+        first_line = top // GRID_CELL_SIZE.height()
+        last_line = (top + viewport.height()) // GRID_CELL_SIZE.height()
+        count = self.grid_model.rowCount()
+        return range(min(first_line * columns, count), min((last_line + 1) * columns, count))
+
+    def cancel_hidden_loads(self):
+        """Cancel thumbnail loads for cells that are no longer visible"""
+        model = self.grid_model
+        visible = {model.file_paths[row] for row in self.visible_rows()} if self.isVisible() else set()
+        for file_path in model.requested - visible:
+            self.loader.cancel(file_path)
+        model.requested.intersection_update(self.loader.pending_paths())
+
+    def on_activated(self, index):
+        if index.isValid():
+            segment = self.grid_model.first_segment(index.row())
+            if segment >= 0:
+                self.prompt_activated.emit(segment)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.visible_timer.start()
+
+    def set_files(self, file_paths: List[str]):
+        for file_path in self.grid_model.requested:
+            self.loader.cancel(file_path)
+        self.grid_model.set_files(file_paths)
+
+    def append_files(self, file_paths: List[str]):
+        self.grid_model.append_files(file_paths)
+
+    def reload_files(self, file_paths: List[str]):
+        self.grid_model.reload_files(file_paths)
+
+    def clear(self):
+        self.set_files([])
+        self.grid_model.icons.clear()
@@ -0,0 +1,236 @@
+"""
+Background thumbnail pipeline.
+
+Thumbnails are generated off the GUI thread by a small worker pool and
+stored in an on-disk cache laid out like the freedesktop.org thumbnail
+spec: <cache>/thumbnails/large/<md5 of file URI>.png, tagged with
+Thumb::URI, Thumb::MTime and Thumb::Size so a changed file is
+re-thumbnailed. Thumb::MTime only has whole seconds, so the nanosecond
+mtime is stored too, under an application key as the spec allows.
+Decoded thumbnails are kept as QPixmaps in an in-memory LRU.
+"""
+
+import os
+import hashlib
+import pathlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+import profiling
+from png_metadata import read_png_metadata
+from result_cache import default_cache_dir
+
+# Edge length of cached thumbnails ("large" in the freedesktop spec)
+THUMBNAIL_SIZE = 256
+THUMBNAIL_FLAVOR = "large"
+
+DEFAULT_THUMBNAIL_WORKERS = 4
+DEFAULT_PIXMAP_CACHE_SIZE = 1024
+
+# Private key holding st_mtime_ns, which tells apart rewrites within one second
+MTIME_NS_KEY = "X-ComfyUI-Prompt-Extractor-MTime-NS"
+
+
+def thumbnail_cache_dir() -> str:
+    return os.path.join(default_cache_dir(), "thumbnails", THUMBNAIL_FLAVOR)
+
+
+def file_uri(file_path: str) -> str:
+    return pathlib.Path(os.path.abspath(file_path)).as_uri()
+
+
+def cached_thumbnail_path(file_path: str) -> str:
+    digest = hashlib.md5(file_uri(file_path).encode('utf-8')).hexdigest()
+    return os.path.join(thumbnail_cache_dir(), f"{digest}.png")
+
+
+def file_tags(file_path: str, stat: os.stat_result) -> Dict[str, str]:
+    """Thumbnail tags identifying the current version of a file"""
+    return {
+        'Thumb::URI': file_uri(file_path),
+        'Thumb::MTime': str(int(stat.st_mtime)),
+        'Thumb::Size': str(stat.st_size),
+        MTIME_NS_KEY: str(stat.st_mtime_ns),
+    }
+
+
+def load_cached_thumbnail(file_path: str, stat: os.stat_result) -> Optional[Tuple[QImage, Tuple[int, int]]]:
+    """Return (image, original size) from the disk cache if it is still valid"""
+    thumb_path = cached_thumbnail_path(file_path)
+    try:
+        info = read_png_metadata(thumb_path).info
+    except (OSError, ValueError):
+        return None
+    # Thumbnails written without one of the tags (older versions, other tools) are regenerated
+    if any(info.get(key) != value for key, value in file_tags(file_path, stat).items()):
+        return None
+    image = QImage(thumb_path)
+    if image.isNull():
+        return None
+    try:
+        size = (int(info['Thumb::Image::Width']), int(info['Thumb::Image::Height']))
+    except (KeyError, ValueError):
+        size = (image.width(), image.height())
+    return image, size
+
+
+def generate_thumbnail(file_path: str, stat: os.stat_result) -> Tuple[QImage, Tuple[int, int]]:
+    """Decode a reduced-size image, store it in the disk cache and return it"""
+    from PIL import Image, PngImagePlugin
+
+    with Image.open(file_path) as img:
+        original_size = img.size
+        # draft() lets JPEG decoders scale while decoding; for PNG, thumbnail()
+        # with a reducing gap does a cheap integer reduce() before resampling.
+        img.draft('RGB', (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        thumb = img.convert('RGBA')
+
+    pnginfo = PngImagePlugin.PngInfo()
+    for key, value in file_tags(file_path, stat).items():
+        pnginfo.add_text(key, value)
+    pnginfo.add_text('Thumb::Image::Width', str(original_size[0]))
+    pnginfo.add_text('Thumb::Image::Height', str(original_size[1]))
+    thumb_path = cached_thumbnail_path(file_path)
+    temp_path = None
+    try:
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial thumbnail
+        fd, temp_path = tempfile.mkstemp(suffix='.png', dir=os.path.dirname(thumb_path))
+        with os.fdopen(fd, 'wb') as f:
+            thumb.save(f, 'PNG', pnginfo=pnginfo)
+        os.replace(temp_path, thumb_path)
+    except OSError as e:
+        print(f"Warning: could not cache thumbnail for {file_path}: {e}")
+        if temp_path is not None and os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+    data = thumb.tobytes('raw', 'RGBA')
+    image = QImage(data, thumb.width, thumb.height, thumb.width * 4, QImage.Format.Format_RGBA8888).copy()
+    return image, original_size
+
+
+def load_thumbnail(file_path: str) -> Tuple[QImage, Tuple[int, int]]:
+    """Return (thumbnail image, original size), from the disk cache when possible"""
+    with profiling.timer('thumbnails'):
+        stat = os.stat(file_path)
+        cached = load_cached_thumbnail(file_path, stat)
+        if cached is not None:
+            profiling.count('thumbnail cache hits')
+            return cached
+        profiling.count('thumbnails generated')
+        return generate_thumbnail(file_path, stat)
+
+
+class PixmapCache:
+    """LRU of thumbnail pixmaps and original image sizes, keyed by path"""
+
+    def __init__(self, max_entries: int = DEFAULT_PIXMAP_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[QPixmap, Tuple[int, int]]]" = OrderedDict()
+
+    def get(self, file_path: str) -> Optional[Tuple[QPixmap, Tuple[int, int]]]:
+        entry = self._entries.get(file_path)
+        if entry is not None:
+            self._entries.move_to_end(file_path)
+        return entry
+
+    def put(self, file_path: str, pixmap: QPixmap, size: Tuple[int, int]):
+        self._entries[file_path] = (pixmap, size)
+        self._entries.move_to_end(file_path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, file_path: str):
+        self._entries.pop(file_path, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ThumbnailLoader(QObject):
+    """Loads thumbnails on a worker pool and delivers them as QPixmaps.
+
+    request() returns a cached pixmap immediately or schedules a load and
+    returns None; ready(path, pixmap, original size) is emitted on the GUI
+    thread when the load finishes and failed(path, message) if it fails.
+    """
+    ready = pyqtSignal(str, QPixmap, tuple)
+    failed = pyqtSignal(str, str)
+    # Internal: carries worker results to the GUI thread
+    _loaded = pyqtSignal(str, QImage, tuple)
+    _load_failed = pyqtSignal(str, str)
+
+    def __init__(self, workers: int = DEFAULT_THUMBNAIL_WORKERS,
+                 cache_size: int = DEFAULT_PIXMAP_CACHE_SIZE, parent=None):
+        super().__init__(parent)
+        self.pixmaps = PixmapCache(cache_size)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+        self._pending: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._loaded.connect(self._on_loaded, Qt.ConnectionType.QueuedConnection)
+        self._load_failed.connect(self._on_load_failed, Qt.ConnectionType.QueuedConnection)
+
+    def cached(self, file_path: str) -> Optional[Tuple[QPixmap, Tuple[int, int]]]:
+        return self.pixmaps.get(file_path)
+
+    def request(self, file_path: str) -> Optional[Tuple[QPixmap, Tuple[int, int]]]:
+        """Return (pixmap, original size) if cached, otherwise schedule a load"""
+        entry = self.pixmaps.get(file_path)
+        if entry is not None:
+            return entry
+        with self._lock:
+            if file_path not in self._pending:
+                self._pending[file_path] = self._pool.submit(self._load, file_path)
+        return None
+
+    def invalidate(self, file_path: str):
+        """Forget the in-memory pixmap of a file that has changed"""
+        self.pixmaps.discard(file_path)
+
+    def pending_paths(self) -> List[str]:
+        with self._lock:
+            return list(self._pending)
+
+    def cancel(self, file_path: str):
+        """Drop a scheduled load that has not started yet"""
+        with self._lock:
+            future = self._pending.get(file_path)
+            if future is not None and future.cancel():
+                del self._pending[file_path]
+
+    def cancel_all(self):
+        with self._lock:
+            for file_path, future in list(self._pending.items()):
+                if future.cancel():
+                    del self._pending[file_path]
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False)
+
+    def _load(self, file_path: str):
+        try:
+            image, size = load_thumbnail(file_path)
+        except Exception as e:
+            self._load_failed.emit(file_path, str(e))
+            return
+        self._loaded.emit(file_path, image, tuple(size))
+
+    def _on_loaded(self, file_path: str, image: QImage, size: tuple):
+        with self._lock:
+            self._pending.pop(file_path, None)
+        pixmap = QPixmap.fromImage(image)
+        self.pixmaps.put(file_path, pixmap, size)
+        self.ready.emit(file_path, pixmap, size)
+
+    def _on_load_failed(self, file_path: str, message: str):
+        with self._lock:
+            self._pending.pop(file_path, None)
+        self.failed.emit(file_path, message)
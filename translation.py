@@ -0,0 +1,349 @@
+"""
+Prompt translation layer.
+
+Deduplicates prompts within a batch, serves repeats from a persistent cache
+keyed by (engine, from, to, text hash) and sends the remaining requests
+through a pluggable TranslationBackend, concurrently with a bounded worker
+count, per-engine rate limiting, timeouts, retries and cancellation.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from result_cache import default_cache_dir
+
+FAILED_PREFIX = "[Translation failed] "
+
+# Minimum seconds between request starts, per engine
+ENGINE_MIN_INTERVAL = {
+    'alibaba': 0.2,
+    'bing': 0.2,
+    'google': 0.2,
+    'baidu': 0.5,
+    'youdao': 0.5,
+    'deepl': 0.5,
+}
+DEFAULT_MIN_INTERVAL = 0.2
+DEFAULT_CONCURRENCY = 4
+
+# on_result(index, translation, ok), called as each text of a batch completes
+ResultCallback = Callable[[int, str, bool], None]
+
+# on_progress({prompt index: translation}), called as translations become available
+ProgressCallback = Callable[[Dict[int, str]], None]
+
+# Engines offered by the translators package
+TRANSLATORS_ENGINES = ["alibaba", "bing", "google", "baidu", "youdao", "deepl"]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class RateLimiter:
+    """Spaces out request starts by at least min_interval seconds"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self, cancel_event: Optional[threading.Event] = None):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            if cancel_event is not None:
+                cancel_event.wait(slot - now)
+            else:
+                time.sleep(slot - now)
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def rate_limiter(engine: str, min_interval: Optional[float] = None) -> RateLimiter:
+    """Return the process-wide rate limiter for an engine"""
+    with _rate_limiters_lock:
+        if engine not in _rate_limiters:
+            if min_interval is None:
+                min_interval = ENGINE_MIN_INTERVAL.get(engine, DEFAULT_MIN_INTERVAL)
+            _rate_limiters[engine] = RateLimiter(min_interval)
+        return _rate_limiters[engine]
+
+
+class TranslationCache:
+    """SQLite-backed cache of translated prompts"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(default_cache_dir(), "translation_cache.sqlite")
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    engine TEXT NOT NULL,
+                    from_lang TEXT NOT NULL,
+                    to_lang TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    translated TEXT NOT NULL,
+                    PRIMARY KEY (engine, from_lang, to_lang, text_hash)
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, engine: str, from_lang: str, to_lang: str, texts: List[str]) -> Dict[str, str]:
+        """Return {text: translation} for every cached text"""
+        hits = {}
+        with self._lock:
+            conn = self._connect()
+            for text in texts:
+                row = conn.execute(
+                    "SELECT translated FROM translations "
+                    "WHERE engine = ? AND from_lang = ? AND to_lang = ? AND text_hash = ?",
+                    (engine, from_lang, to_lang, text_hash(text))
+                ).fetchone()
+                if row:
+                    hits[text] = row[0]
+        return hits
+
+    def store(self, engine: str, from_lang: str, to_lang: str, translations: Dict[str, str]):
+        if not translations:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO translations (engine, from_lang, to_lang, text_hash, translated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(engine, from_lang, to_lang, text_hash(text), translated)
+                 for text, translated in translations.items()]
+            )
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_default_translation_cache() -> Optional[TranslationCache]:
+    """Open the per-user translation cache, or return None if it is unavailable"""
+    cache = TranslationCache()
+    try:
+        cache._connect()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: translation cache disabled: {e}")
+        return None
+    return cache
+
+
+class TranslationCancelled(Exception):
+    """Raised when a batch translation is cancelled"""
+
+
+class TranslationBackend:
+    """Base class for translation backends.
+
+    Subclasses implement translate_one(); translate_batch() adds bounded
+    concurrency, rate limiting, retries and cancellation on top of it.
+    """
+
+    name = "base"
+
+    def __init__(self, timeout: float = 10.0, retries: int = 2,
+                 max_concurrency: int = DEFAULT_CONCURRENCY, min_interval: Optional[float] = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+
+    @property
+    def cache_key(self) -> str:
+        """Engine name used in the translation cache key"""
+        return self.name
+
+    def translate_one(self, text: str, from_lang: str, to_lang: str,
+                      cancel_event: threading.Event) -> str:
+        raise NotImplementedError
+
+    def translate_batch(self, texts: List[str], from_lang: str, to_lang: str,
+                        cancel_event: Optional[threading.Event] = None,
+                        on_result: Optional[ResultCallback] = None) -> List[Tuple[str, bool]]:
+        """Translate texts, returning (translation, ok) pairs in input order.
+
+        Failed translations are returned as FAILED_PREFIX + text with ok=False.
+        on_result(index, translation, ok) is called from worker threads as
+        each text completes. Raises TranslationCancelled if cancel_event is set.
+        """
+        cancel_event = cancel_event or threading.Event()
+        limiter = rate_limiter(self.name, self.min_interval)
+
+        def attempt(text):
+            error = None
+            for _ in range(self.retries + 1):
+                if cancel_event.is_set():
+                    return text, False
+                limiter.wait(cancel_event)
+                if cancel_event.is_set():
+                    return text, False
+                try:
+                    return self.translate_one(text, from_lang, to_lang, cancel_event), True
+                except Exception as e:
+                    error = e
+            print(f"Translation error for prompt using {self.name}: {error}")
+            return f"{FAILED_PREFIX}{text}", False
+
+        def request(index):
+            translated, ok = attempt(texts[index])
+            if on_result is not None and not cancel_event.is_set():
+                on_result(index, translated, ok)
+            return translated, ok
+
+        if not texts:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(texts)))) as pool:
+            results = list(pool.map(request, range(len(texts))))
+        if cancel_event.is_set():
+            raise TranslationCancelled()
+        return results
+
+
+class TranslatorsBackend(TranslationBackend):
+    """Live web engines from the translators package"""
+
+    def __init__(self, engine: str, **options):
+        super().__init__(**options)
+        self.name = engine
+
+    def translate_one(self, text, from_lang, to_lang, cancel_event):
+        import translators as ts
+
+        return ts.translate_text(
+            query_text=text,
+            translator=self.name,
+            from_language=from_lang,
+            to_language=to_lang,
+            timeout=self.timeout,
+            if_ignore_empty_query=True,
+            if_print_warning=False
+        )
+
+
+class MockBackend(TranslationBackend):
+    """Deterministic offline backend for tests and load testing.
+
+    Returns "[to_lang] text" after a simulated latency. Latency jitter and
+    failures are derived from a hash of (seed, text, attempt), so a run is
+    reproducible; a request whose latency exceeds the timeout fails with
+    TimeoutError.
+    """
+
+    name = "mock"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0,
+                 seed: int = 0, **options):
+        options.setdefault('min_interval', 0.0)
+        super().__init__(**options)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.calls = 0
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "MockBackend":
+        """Build from a "latency=0.3,failure_rate=0.05" style string"""
+        options: Dict[str, Any] = {}
+        for item in filter(None, (part.strip() for part in spec.split(','))):
+            key, _, value = item.partition('=')
+            key = key.strip()
+            options[key] = int(value) if key in ('seed', 'retries', 'max_concurrency') else float(value)
+        return cls(**options)
+
+    def translate_one(self, text, from_lang, to_lang, cancel_event):
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts.get(text, 0)
+            self._attempts[text] = attempt + 1
+
+        rng = random.Random(f"{self.seed}:{attempt}:{text}")
+        delay = self.latency + self.jitter * rng.random()
+        if cancel_event.wait(min(delay, self.timeout)):
+            raise TranslationCancelled()
+        if delay > self.timeout:
+            raise TimeoutError(f"mock request exceeded {self.timeout}s")
+        if rng.random() < self.failure_rate:
+            raise RuntimeError("simulated mock failure")
+        return f"[{to_lang}] {text}"
+
+
+def create_backend(engine: str, mock_spec: str = "") -> TranslationBackend:
+    """Return the backend for an engine name shown in the UI"""
+    if engine == MockBackend.name:
+        return MockBackend.from_spec(mock_spec)
+    return TranslatorsBackend(engine)
+
+
+def translate_prompts(prompts: List[str], backend: TranslationBackend, from_lang: str, to_lang: str,
+                      cache: Optional[TranslationCache] = None,
+                      cancel_event: Optional[threading.Event] = None,
+                      on_progress: Optional[ProgressCallback] = None) -> Tuple[List[str], Dict[str, int]]:
+    """Translate prompts, returning (translations in input order, stats).
+
+    Identical prompts are translated once; cached translations are reused and
+    only the remaining distinct prompts are sent to the backend. Failed
+    translations are marked with FAILED_PREFIX and are not cached.
+    on_progress receives {prompt index: translation} as results arrive.
+    """
+    positions: Dict[str, List[int]] = {}
+    for index, text in enumerate(prompts):
+        positions.setdefault(text, []).append(index)
+    unique = list(positions)
+
+    engine = backend.cache_key
+    translations = cache.lookup(engine, from_lang, to_lang, unique) if cache else {}
+    missing = [text for text in unique if text not in translations]
+
+    if on_progress is not None and translations:
+        on_progress({index: translated for text, translated in translations.items() for index in positions[text]})
+
+    def on_result(missing_index, translated, ok):
+        if on_progress is not None:
+            on_progress({index: translated for index in positions[missing[missing_index]]})
+
+    fresh = {}
+    results = backend.translate_batch(missing, from_lang, to_lang, cancel_event, on_result)
+    for text, (translated, ok) in zip(missing, results):
+        translations[text] = translated
+        if ok:
+            fresh[text] = translated
+
+    if cache:
+        cache.store(engine, from_lang, to_lang, fresh)
+
+    stats = {
+        'prompts': len(prompts),
+        'distinct': len(unique),
+        'cached': len(unique) - len(missing),
+        'requests': len(missing),
+        'failed': len(missing) - len(fresh),
+    }
+    return [translations[text] for text in prompts], stats
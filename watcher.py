@@ -0,0 +1,194 @@
+"""
+Watch-folder support.
+
+FolderWatcher reports PNG files that appear or change under a folder.
+Directory change notifications come from QFileSystemWatcher (inotify on
+Linux); where it cannot watch a folder, a slow rescan timer is used
+instead. A reported file must be completely written first: its size and
+mtime must be stable between two checks and it must end with an IEND
+chunk. Nothing runs while the folder is idle and no file is in flight.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+# A complete PNG ends with an empty IEND chunk: length, type and CRC
+PNG_TRAILER = b'\x00\x00\x00\x00IEND\xaeB`\x82'
+
+# Milliseconds between completeness checks of files still being written
+SETTLE_INTERVAL_MS = 500
+# A stable file without IEND is reported anyway after this many seconds (truncated file)
+SETTLE_TIMEOUT = 10.0
+# Milliseconds to coalesce bursts of directory notifications
+CHANGE_DELAY_MS = 200
+# Milliseconds between full rescans when change notifications are unavailable
+POLL_INTERVAL_MS = 2000
+
+FileState = Tuple[int, int]  # (mtime_ns, size)
+
+
+def png_is_complete(file_path: str) -> bool:
+    """Return True if the file ends with a PNG IEND chunk"""
+    try:
+        with open(file_path, 'rb') as f:
+            f.seek(-len(PNG_TRAILER), os.SEEK_END)
+            return f.read() == PNG_TRAILER
+    except OSError:
+        return False
+
+
+def scan_directory(directory: str) -> Tuple[Dict[str, FileState], List[str]]:
+    """Return ({png path: state}, [subdirectories]) for one directory level"""
+    files = {}
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith('.png') and entry.is_file():
+                        st = entry.stat()
+                        files[entry.path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+class FolderWatcher(QObject):
+    """Emits files_ready(paths) for new or changed, completely written PNGs"""
+    files_ready = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root: Optional[str] = None
+        self.known: Dict[str, FileState] = {}
+        self.directories: Set[str] = set()
+        # Files seen changing: path -> (state at last check, first seen time)
+        self.settling: Dict[str, Tuple[FileState, float]] = {}
+        self.dirty: Set[str] = set()
+
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.directoryChanged.connect(self.on_directory_changed)
+
+        self.change_timer = QTimer(self)
+        self.change_timer.setSingleShot(True)
+        self.change_timer.setInterval(CHANGE_DELAY_MS)
+        self.change_timer.timeout.connect(self.scan_dirty)
+
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setInterval(SETTLE_INTERVAL_MS)
+        self.settle_timer.timeout.connect(self.check_settling)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(POLL_INTERVAL_MS)
+        self.poll_timer.timeout.connect(self.poll)
+
+    @property
+    def active(self) -> bool:
+        return self.root is not None
+
+    @property
+    def polling(self) -> bool:
+        return self.poll_timer.isActive()
+
+    def start(self, root: str, known_files: Dict[str, FileState], folder_mtimes: Dict[str, int]):
+        """Watch root recursively, carrying on from a scan of it (see DirectoryScanner snapshot).
+
+        Files in known_files are not reported until their state changes.
+        Folders whose mtime differs from the one recorded before they were
+        listed changed during the scan and are rescanned.
+        """
+        self.stop()
+        self.root = root
+        self.known.update(known_files)
+        for directory, mtime_ns in folder_mtimes.items():
+            self.add_directory(directory)
+            try:
+                changed = os.stat(directory).st_mtime_ns != mtime_ns
+            except OSError:
+                changed = True
+            if changed:
+                self.dirty.add(directory)
+        if self.dirty:
+            self.change_timer.start()
+
+    def stop(self):
+        self.root = None
+        self.known.clear()
+        self.settling.clear()
+        self.dirty.clear()
+        if self.directories:
+            self.fs_watcher.removePaths(list(self.directories))
+        self.directories.clear()
+        self.change_timer.stop()
+        self.settle_timer.stop()
+        self.poll_timer.stop()
+
+    def add_directory(self, directory: str):
+        if directory in self.directories:
+            return
+        self.directories.add(directory)
+        if not self.fs_watcher.addPath(directory) and not self.poll_timer.isActive():
+            # No change notifications for this folder (e.g. watch limit reached)
+            print(f"Warning: cannot watch {directory}, falling back to polling")
+            self.poll_timer.start()
+
+    def on_directory_changed(self, directory: str):
+        self.dirty.add(directory)
+        self.change_timer.start()
+
+    def poll(self):
+        self.dirty.update(self.directories)
+        self.scan_dirty()
+
+    def scan_dirty(self):
+        """Rescan changed directories and start tracking new or modified files"""
+        dirty, self.dirty = self.dirty, set()
+        now = time.monotonic()
+        for directory in dirty:
+            if not os.path.isdir(directory):
+                self.directories.discard(directory)
+                self.fs_watcher.removePath(directory)
+                continue
+            files, subdirs = scan_directory(directory)
+            for path, state in files.items():
+                if self.known.get(path) != state and path not in self.settling:
+                    self.settling[path] = (state, now)
+            for subdir in subdirs:
+                if subdir not in self.directories:
+                    self.add_directory(subdir)
+                    # Files may have landed before the new folder was watched
+                    self.dirty.add(subdir)
+        if self.dirty:
+            self.change_timer.start()
+        if self.settling and not self.settle_timer.isActive():
+            self.settle_timer.start()
+
+    def check_settling(self):
+        """Report files whose size and mtime stopped changing and that are complete"""
+        ready = []
+        now = time.monotonic()
+        for path, (state, first_seen) in list(self.settling.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self.settling[path]
+                continue
+            current = (st.st_mtime_ns, st.st_size)
+            if current != state:
+                self.settling[path] = (current, first_seen)
+                continue
+            if png_is_complete(path) or now - first_seen >= SETTLE_TIMEOUT:
+                del self.settling[path]
+                self.known[path] = current
+                ready.append(path)
+        if not self.settling:
+            self.settle_timer.stop()
+        if ready:
+            self.files_ready.emit(sorted(ready))